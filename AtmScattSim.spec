@@ -7,7 +7,7 @@ a = Analysis(
     binaries=[],
     datas=[
         ('VERSION', '.'),
-        ('data', 'data'),
+        # 历史记录等用户数据在运行时写入可执行文件旁的 data 目录，不再打包
         ('resources', 'resources')
     ],
     hiddenimports=[
@@ -28,12 +28,12 @@ a = Analysis(
 )
 pyz = PYZ(a.pure)
 
+# 以目录形式输出，依赖库作为独立文件分发，补丁版本只需增量更新变化的文件
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='AtmScattSim',
     debug=False,
     bootloader_ignore_signals=False,
@@ -49,3 +49,12 @@ exe = EXE(
     entitlements_file=None,
     icon=['resources\\icons\\rain_cloud.png'],
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='AtmScattSim',
+)
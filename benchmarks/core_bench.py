@@ -0,0 +1,338 @@
+# benchmarks/core_bench.py
+# 仿真核心的数值回归和性能基准：覆盖降雨（1-25 mm/h、250-320 K、多个频率）和
+# 雾霾（0.05-20 km 能见度、多组折射率）的代表性参数组合，记录每个用例的耗时、
+# Mie 调用次数和内存峰值，并把 alpha、beta、eff_range 和结果数组与保存的基准值按容差比较。
+# 更换或优化 Mie 计算引擎前，必须先通过本基准的数值比较。
+#
+#   python benchmarks/core_bench.py                      # 全部用例，比较基准值和历史耗时
+#   python benchmarks/core_bench.py --quick --no-record  # 每类只跑少量用例
+#   python benchmarks/core_bench.py --mie-engine fast_mie   # 用其他 Mie 引擎运行并比较
+#   python benchmarks/core_bench.py --update-golden      # 用当前实现重新生成基准值
+#
+# 基准值保存在 benchmarks/golden/core_golden.json（参数和标量）和 core_golden.npz（数组），
+# 容差和性能预算见 core_tolerances.json。耗时历史追加到 benchmarks/results/core_history.jsonl，
+# 同一主机、同一 Python 版本、同一 Mie 引擎最近几次结果的中位数作为基线。
+# 发现数值不一致或性能回退时返回 1。
+import argparse
+import importlib
+import importlib.metadata
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from startup_bench import ROOT, append_history, baseline, environment_key, git_commit, load_history
+
+sys.path.insert(0, ROOT)
+
+from core import mie
+from core.api import core_class, prepare_params
+
+BENCH_DIR = os.path.join(ROOT, 'benchmarks')
+GOLDEN_DIR = os.path.join(BENCH_DIR, 'golden')
+GOLDEN_FILE = os.path.join(GOLDEN_DIR, 'core_golden.json')
+GOLDEN_ARRAYS_FILE = os.path.join(GOLDEN_DIR, 'core_golden.npz')
+TOLERANCES_FILE = os.path.join(BENCH_DIR, 'core_tolerances.json')
+HISTORY_FILE = os.path.join(BENCH_DIR, 'results', 'core_history.jsonl')
+REFERENCE_ENGINE = 'PyMieScatt'
+
+COMPARED_SCALARS = ('alpha', 'beta', 'eff_range', 'echo_power')
+COMPARED_ARRAYS = ('r', 'p_received', 'trans', 'theta', 'phase_func', 'radii', 'size_distribution')
+
+# 用例参数网格，其余参数取 core.api.DEFAULT_PARAMS
+RAIN_RATES = (1.0, 5.0, 10.0, 25.0)              # mm/h
+TEMPERATURES = (250.0, 273.0, 293.0, 320.0)      # K
+RAIN_FREQUENCIES = (10.0, 35.0, 94.0)            # GHz
+VISIBILITIES = (0.05, 0.2, 1.0, 5.0, 20.0)       # km
+REFRACTIVE_INDICES = ((1.33, 0.0), (1.45, 0.008), (1.53, 0.05))
+
+# --quick 时使用的用例（覆盖各参数的两端和中间值）
+QUICK_RAIN = ((1.0, 250.0, 10.0), (10.0, 293.0, 35.0), (25.0, 320.0, 94.0))
+QUICK_HAZE = ((0.05, 1.33, 0.0), (1.0, 1.45, 0.008), (20.0, 1.53, 0.05))
+
+UNITS = {'seconds': 's', 'peak_mb': 'MB', 'mie_calls': '次'}
+
+
+# ---------------- 用例 ----------------
+
+def case_id(env_type, params):
+    return env_type + ''.join(f"_{key}={value:g}" for key, value in params.items())
+
+
+def make_case(env_type, params, quick):
+    return {'id': case_id(env_type, params), 'env_type': env_type, 'params': params, 'quick': quick}
+
+
+def build_cases():
+    cases = []
+    for rate in RAIN_RATES:
+        for temperature in TEMPERATURES:
+            for frequency in RAIN_FREQUENCIES:
+                params = {'rain_rate': rate, 'temperature': temperature, 'frequency': frequency}
+                cases.append(make_case('rain', params, (rate, temperature, frequency) in QUICK_RAIN))
+    for visibility in VISIBILITIES:
+        for real, imag in REFRACTIVE_INDICES:
+            params = {'visibility': visibility, 'ref_real': real, 'ref_imag': imag}
+            cases.append(make_case('haze', params, (visibility, real, imag) in QUICK_HAZE))
+    return cases
+
+
+def select_cases(cases, quick=False, env_type=None, pattern=None):
+    return [case for case in cases
+            if (not quick or case['quick'])
+            and (env_type is None or case['env_type'] == env_type)
+            and (pattern is None or pattern in case['id'])]
+
+
+# ---------------- 测量 ----------------
+
+def run_case(case, repeat):
+    """返回 (结果, 指标)；内存峰值单独运行一次测量，tracemalloc 会拖慢计算，不计入耗时"""
+    params = prepare_params(case['env_type'], case['params'])
+    core = core_class(case['env_type'])
+
+    tracemalloc.start()
+    results = core(params).run_simulation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = core(params).run_simulation()
+        times.append(time.perf_counter() - started)
+
+    counters = results['perf']['counters']
+    metrics = {
+        'seconds': statistics.median(times),
+        'peak_mb': peak / (1024 * 1024),
+        'mie_calls': counters.get('mie_calls', 0) + counters.get('angular_mie_calls', 0),
+    }
+    return results, metrics
+
+
+# ---------------- 基准值 ----------------
+
+def load_golden(path=GOLDEN_FILE, arrays_path=GOLDEN_ARRAYS_FILE):
+    """返回 {用例: {'params', 'scalars', 'arrays'}}，没有基准值文件时返回空字典"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        golden = json.load(f)['cases']
+    for entry in golden.values():
+        entry['arrays'] = {}
+    if os.path.exists(arrays_path):
+        with np.load(arrays_path) as arrays:
+            for key in arrays.files:
+                cid, field = key.rsplit('/', 1)
+                if cid in golden:
+                    golden[cid]['arrays'][field] = arrays[key]
+    return golden
+
+
+def package_versions():
+    """生成基准值的数值库版本，更换版本后结果可能在容差外变化"""
+    versions = {}
+    for name in ('numpy', 'scipy', 'PyMieScatt'):
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def save_golden(golden, engine, path=GOLDEN_FILE, arrays_path=GOLDEN_ARRAYS_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cases = {cid: {'env_type': entry['env_type'], 'params': entry['params'], 'scalars': entry['scalars']}
+             for cid, entry in sorted(golden.items())}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': git_commit(),
+            'engine': engine,
+            'python': platform.python_version(),
+            'packages': package_versions(),
+            'cases': cases,
+        }, f, ensure_ascii=False, indent=2)
+    np.savez_compressed(arrays_path, **{f"{cid}/{field}": value
+                                        for cid, entry in golden.items()
+                                        for field, value in entry['arrays'].items()})
+
+
+def golden_entry(case, results):
+    return {
+        'env_type': case['env_type'],
+        'params': case['params'],
+        'scalars': {field: float(results[field]) for field in COMPARED_SCALARS},
+        'arrays': {field: np.asarray(results[field], dtype=float) for field in COMPARED_ARRAYS},
+    }
+
+
+def max_relative_error(actual, expected):
+    scale = np.maximum(np.abs(expected), np.finfo(float).tiny)
+    return float(np.max(np.abs(actual - expected) / scale)) if expected.size else 0.0
+
+
+def compare_case(results, golden, tolerances):
+    """返回 [(字段, 说明), ...]，为空表示在容差内一致"""
+    default = tolerances.get('default', {})
+    fields = tolerances.get('fields', {})
+    mismatches = []
+    for field in COMPARED_SCALARS + COMPARED_ARRAYS:
+        tol = dict(default, **fields.get(field, {}))
+        rtol, atol = tol.get('rtol', 1e-6), tol.get('atol', 0.0)
+        actual = np.asarray(results[field], dtype=float)
+        if field in COMPARED_SCALARS:
+            expected = np.asarray(golden['scalars'][field], dtype=float)
+        elif field in golden['arrays']:
+            expected = golden['arrays'][field]
+        else:
+            mismatches.append((field, '缺少基准数组'))
+            continue
+        if actual.shape != expected.shape:
+            mismatches.append((field, f"形状 {actual.shape} != {expected.shape}"))
+        elif not np.allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True):
+            mismatches.append((field, f"最大相对误差 {max_relative_error(actual, expected):.3g}"))
+    return mismatches
+
+
+# ---------------- 性能比较 ----------------
+
+def check_performance(metrics, base, config):
+    """返回 [(指标, 当前值, 基线, 原因), ...]
+
+    指标名为 "<用例>.<seconds|peak_mb|mie_calls>"；相对基线增加超过 relative 且超过 absolute 时
+    视为回退，budgets 为按环境类型设置的硬上限。
+    """
+    regressions = []
+    for key, value in metrics.items():
+        cid, kind = key.rsplit('.', 1)
+        env_type = cid.split('_', 1)[0]
+        limit = config.get(kind, {})
+        unit = UNITS[kind]
+        budget = config.get('budgets', {}).get(env_type, {}).get(kind)
+        if budget is not None and value > budget:
+            regressions.append((key, value, base.get(key), f"超过预算 {budget:g} {unit}"))
+            continue
+        reference = base.get(key)
+        if reference is None:
+            continue
+        if value > reference * (1 + limit.get('relative', 0.25)) and value - reference > limit.get('absolute', 0.0):
+            growth = f"{(value / reference - 1) * 100:.0f}%" if reference else f"{value - reference:g} {unit}"
+            regressions.append((key, value, reference, f"比基线增加 {growth}"))
+    return regressions
+
+
+def print_report(rows, base, regressions, errors):
+    flagged = {key.rsplit('.', 1)[0] for key, *_ in regressions}
+    print(f"{'用例':<58}{'耗时 (s)':>10}{'基线 (s)':>10}{'Mie 调用':>10}{'内存峰值 (MB)':>16}  数值")
+    for cid, metrics, status in rows:
+        reference = base.get(f"{cid}.seconds")
+        reference_text = f"{reference:.4f}" if reference is not None else '-'
+        mark = '  <-- 回退' if cid in flagged else ''
+        print(f"{cid:<58}{metrics['seconds']:>10.4f}{reference_text:>10}{metrics['mie_calls']:>10d}"
+              f"{metrics['peak_mb']:>16.2f}  {status}{mark}")
+    for cid, error in errors.items():
+        print(f"{cid}: 运行失败: {error}")
+    for key, value, reference, reason in regressions:
+        print(f"回退: {key} = {value:g}，{reason}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='仿真核心数值回归和性能基准')
+    parser.add_argument('--repeat', type=int, default=3, help='每个用例计时的重复次数，取中位数')
+    parser.add_argument('--quick', action='store_true', help='每类环境只运行少量用例')
+    parser.add_argument('--env', choices=('rain', 'haze'), help='只运行一种环境的用例')
+    parser.add_argument('-k', dest='pattern', help='只运行名称包含该字符串的用例')
+    parser.add_argument('--mie-engine', help='替换 PyMieScatt 的模块名（需提供 AutoMieQ、ScatteringFunction）')
+    parser.add_argument('--update-golden', action='store_true', help='用本次结果更新基准值（只允许参考引擎）')
+    parser.add_argument('--list', action='store_true', help='列出用例后退出')
+    parser.add_argument('--history', default=HISTORY_FILE, help='历史结果文件 (JSON lines)')
+    parser.add_argument('--tolerances', default=TOLERANCES_FILE, help='数值容差和性能预算文件')
+    parser.add_argument('--no-record', action='store_true', help='不把本次结果写入历史')
+    parser.add_argument('--no-fail', action='store_true', help='性能回退时也返回 0（数值不一致仍返回 1）')
+    args = parser.parse_args(argv)
+
+    cases = select_cases(build_cases(), args.quick, args.env, args.pattern)
+    if args.list:
+        for case in cases:
+            print(case['id'])
+        return 0
+    if not cases:
+        print('没有匹配的用例')
+        return 1
+
+    engine = REFERENCE_ENGINE
+    if args.mie_engine:
+        if args.update_golden:
+            print('基准值只能由参考引擎 (PyMieScatt) 生成')
+            return 1
+        mie.use_mie_engine(importlib.import_module(args.mie_engine))
+        engine = args.mie_engine
+    mie.mie_engine()  # 引擎导入不计入第一个用例
+
+    with open(args.tolerances, 'r', encoding='utf-8') as f:
+        tolerances = json.load(f)
+    golden = load_golden()
+
+    rows, errors, metrics, mismatches = [], {}, {}, {}
+    for case in cases:
+        cid = case['id']
+        try:
+            results, case_metrics = run_case(case, max(1, args.repeat))
+        except Exception as e:
+            errors[cid] = str(e)
+            continue
+        for kind, value in case_metrics.items():
+            metrics[f"{cid}.{kind}"] = value
+
+        if args.update_golden:
+            golden[cid] = golden_entry(case, results)
+            status = '已更新'
+        elif cid not in golden:
+            mismatches[cid] = [('*', '缺少基准值，请先用 --update-golden 生成')]
+            status = '缺少基准值'
+        else:
+            mismatches[cid] = compare_case(results, golden[cid], tolerances.get('numerical', {}))
+            status = 'OK' if not mismatches[cid] else '不一致'
+        rows.append((cid, case_metrics, status))
+
+    env = environment_key()
+    history = [entry for entry in load_history(args.history) if entry.get('engine') == engine]
+    base = baseline(history, env)
+    regressions = check_performance(metrics, base, tolerances.get('performance', {}))
+    print_report(rows, base, regressions, errors)
+
+    failed = {cid: items for cid, items in mismatches.items() if items}
+    for cid, items in failed.items():
+        for field, reason in items:
+            print(f"数值不一致: {cid} {field}: {reason}")
+
+    if args.update_golden and not errors:
+        save_golden(golden, engine)
+        print(f"已更新 {len(cases)} 个用例的基准值: {GOLDEN_FILE}")
+
+    if not args.no_record:
+        append_history(args.history, {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': git_commit(),
+            'env': env,
+            'engine': engine,
+            'repeat': args.repeat,
+            'metrics': metrics,
+            'errors': errors,
+            'mismatches': sorted(failed),
+        })
+    if errors or failed:
+        return 1
+    return 1 if regressions and not args.no_fail else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
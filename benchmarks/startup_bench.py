@@ -0,0 +1,281 @@
+# benchmarks/startup_bench.py
+# 启动性能基准：core / gui / utils 的冷、热导入耗时，启动窗口和仿真窗口的构造耗时，
+# 以及首次 update_plots 的耗时。每次测量在独立子进程中进行，Qt 使用 offscreen 平台，
+# 可以在没有显示器的 Linux 机器上运行。
+#
+#   python benchmarks/startup_bench.py                 # 测量、与历史基线比较并追加到历史
+#   python benchmarks/startup_bench.py --repeat 5 --no-record
+#
+# 结果按行追加到 benchmarks/results/startup_history.jsonl；同一主机、同一 Python 版本最近
+# BASELINE_RUNS 次结果的中位数作为基线，超出 startup_thresholds.json 中的阈值时返回 1。
+import argparse
+import importlib
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, 'benchmarks')
+HISTORY_FILE = os.path.join(BENCH_DIR, 'results', 'startup_history.jsonl')
+THRESHOLDS_FILE = os.path.join(BENCH_DIR, 'startup_thresholds.json')
+BASELINE_RUNS = 5
+RESULT_MARKER = 'BENCH_RESULT '
+
+# 导入目标：包本身（子模块按需导入），以及打开仿真窗口时实际用到的子模块
+IMPORT_TARGETS = {
+    'core': ('core',),
+    'gui': ('gui',),
+    'utils': ('utils',),
+    'core_full': ('core.simulation_worker', 'core.haze_worker'),
+    'gui_full': ('gui.rain_window', 'gui.haze_window'),
+    'utils_full': ('utils.export_utils', 'utils.history_manager', 'utils.figure_export', 'utils.style_utils'),
+    'mie_engine': ('PyMieScatt',),
+}
+
+# 仿真窗口：(环境类型, 模块, 类名)
+WINDOWS = (
+    ('rain', 'gui.rain_window', 'RainSimulationWindow'),
+    ('haze', 'gui.haze_window', 'HazeSimulationWindow'),
+)
+
+
+# ---------------- 子进程中执行的测量 ----------------
+
+def probe_imports(modules):
+    started = time.perf_counter()
+    for name in modules:
+        importlib.import_module(name)
+    return {'seconds': time.perf_counter() - started}
+
+
+def sample_results(env_type, params):
+    """不做 Mie 计算，用合成的微物理量生成与仿真结果结构相同的数据"""
+    import numpy as np
+    if env_type == 'rain':
+        from core.simulation_core import RainLidarSimulationCore as Core
+    else:
+        from core.haze_core import HazeLidarSimulationCore as Core
+    radii = np.linspace(0.1, 3.0, 50)
+    theta = np.linspace(0.0, 180.0, 181)
+    return Core(params).assemble_results(1e-3, 1e-5, radii, 8000.0 * np.exp(-2.0 * radii),
+                                         theta, np.exp(-theta / 30.0))
+
+
+def probe_windows():
+    from PyQt5.QtWidgets import QApplication
+
+    timings = {}
+    started = time.perf_counter()
+    app = QApplication(sys.argv)
+    timings['qapplication'] = time.perf_counter() - started
+
+    # 不启动后台预加载，测量用户立即选择仿真环境时的最坏情况
+    from utils import startup
+    startup.PRELOAD_ENABLED = False
+
+    started = time.perf_counter()
+    from main import StartupWindow
+    startup_window = StartupWindow()
+    startup_window.show()
+    app.processEvents()
+    timings['startup_window'] = time.perf_counter() - started
+
+    for env_type, module_name, class_name in WINDOWS:
+        started = time.perf_counter()
+        window_class = getattr(importlib.import_module(module_name), class_name)
+        timings[f'{env_type}_window_import'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        window = window_class()
+        window.show()
+        app.processEvents()
+        timings[f'{env_type}_window'] = time.perf_counter() - started
+
+        params = window.left_panel.get_parameters()
+        sensitivity_watts = 10 ** ((params['sensitivity'] - 30) / 10)
+        results = sample_results(env_type, params)
+        started = time.perf_counter()
+        window.right_panel.update_plots(results, sensitivity_watts)
+        app.processEvents()
+        timings[f'{env_type}_first_update_plots'] = time.perf_counter() - started
+
+        # 不走 closeEvent（会弹出确认框）
+        window.history_manager.close()
+        window.hide()
+        window.deleteLater()
+
+    startup_window.close()
+    return timings
+
+
+def run_probe_main(argv):
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    if argv[0] == 'imports':
+        result = probe_imports(argv[1:])
+    else:
+        result = probe_windows()
+    print(RESULT_MARKER + json.dumps(result))
+
+
+# ---------------- 主进程：调度、记录和比较 ----------------
+
+def run_probe(args, cold=False):
+    """在新的解释器中运行一次测量；cold 时使用空的字节码缓存目录，所有模块重新编译"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    with tempfile.TemporaryDirectory() as cache_dir:
+        if cold:
+            env['PYTHONPYCACHEPREFIX'] = cache_dir
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--probe', *args],
+                              cwd=ROOT, env=env, capture_output=True, text=True, timeout=900)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    error = (proc.stderr.strip().splitlines() or ['未知错误'])[-1]
+    raise RuntimeError(error)
+
+
+def measure(repeat):
+    metrics, errors = {}, {}
+    for name, modules in IMPORT_TARGETS.items():
+        try:
+            metrics[f'import.{name}.cold'] = run_probe(['imports', *modules], cold=True)['seconds']
+            # 第一次热导入只用于填充字节码缓存，不计入
+            run_probe(['imports', *modules])
+            metrics[f'import.{name}.warm'] = statistics.median(
+                run_probe(['imports', *modules])['seconds'] for _ in range(repeat))
+        except Exception as e:
+            errors[f'import.{name}'] = str(e)
+
+    try:
+        runs = [run_probe(['windows']) for _ in range(repeat)]
+        for key in runs[0]:
+            metrics[f'window.{key}'] = statistics.median(run[key] for run in runs)
+    except Exception as e:
+        errors['window'] = str(e)
+    return metrics, errors
+
+
+def environment_key():
+    return {
+        'host': socket.gethostname(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path, entry):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def baseline(history, env, runs=BASELINE_RUNS):
+    """同一主机和 Python 版本最近几次结果的中位数"""
+    same_env = [entry for entry in history
+                if entry['env']['host'] == env['host'] and entry['env']['python'] == env['python']][-runs:]
+    values = {}
+    for entry in same_env:
+        for key, value in entry['metrics'].items():
+            values.setdefault(key, []).append(value)
+    return {key: statistics.median(items) for key, items in values.items()}
+
+
+def check_regressions(metrics, base, thresholds):
+    """返回 [(指标, 当前值, 基线, 原因), ...]
+
+    相对基线变慢超过 relative 且绝对值超过 absolute 秒时视为回退；
+    budget 为不依赖基线的硬上限。
+    """
+    default = thresholds.get('default', {})
+    regressions = []
+    for key, value in metrics.items():
+        limit = dict(default, **thresholds.get('metrics', {}).get(key, {}))
+        budget = limit.get('budget')
+        if budget is not None and value > budget:
+            regressions.append((key, value, base.get(key), f"超过预算 {budget:.3f} s"))
+            continue
+        reference = base.get(key)
+        if reference is None:
+            continue
+        relative = limit.get('relative', 0.25)
+        absolute = limit.get('absolute', 0.02)
+        if value > reference * (1 + relative) and value - reference > absolute:
+            regressions.append((key, value, reference, f"比基线慢 {(value / reference - 1) * 100:.0f}%"))
+    return regressions
+
+
+def print_report(metrics, errors, base, regressions):
+    flagged = {key for key, *_ in regressions}
+    print(f"{'指标':<40}{'当前 (s)':>12}{'基线 (s)':>12}")
+    for key in sorted(metrics):
+        reference = base.get(key)
+        reference_text = f"{reference:.4f}" if reference is not None else '-'
+        mark = '  <-- 回退' if key in flagged else ''
+        print(f"{key:<40}{metrics[key]:>12.4f}{reference_text:>12}{mark}")
+    for key, error in errors.items():
+        print(f"{key}: 测量失败: {error}")
+    for key, value, reference, reason in regressions:
+        print(f"回退: {key} = {value:.4f} s，{reason}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='启动性能基准')
+    parser.add_argument('--repeat', type=int, default=3, help='热导入和窗口测量的重复次数，取中位数')
+    parser.add_argument('--history', default=HISTORY_FILE, help='历史结果文件 (JSON lines)')
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE, help='回退阈值文件')
+    parser.add_argument('--no-record', action='store_true', help='不把本次结果写入历史')
+    parser.add_argument('--no-fail', action='store_true', help='发现回退时也返回 0')
+    parser.add_argument('--probe', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        run_probe_main(args.probe)
+        return 0
+
+    env = environment_key()
+    history = load_history(args.history)
+    with open(args.thresholds, 'r', encoding='utf-8') as f:
+        thresholds = json.load(f)
+
+    metrics, errors = measure(max(1, args.repeat))
+    base = baseline(history, env)
+    regressions = check_regressions(metrics, base, thresholds)
+    print_report(metrics, errors, base, regressions)
+
+    if not args.no_record:
+        append_history(args.history, {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': git_commit(),
+            'env': env,
+            'repeat': args.repeat,
+            'metrics': metrics,
+            'errors': errors,
+        })
+    return 1 if regressions and not args.no_fail else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# cli.py
+# 命令行运行仿真（不启动界面），进度和结果以 JSON lines 输出到标准输出。
+#
+#   python cli.py defaults rain
+#   python cli.py run rain --set rain_rate=25 -o result.npz
+#   python cli.py run haze --config params.yaml -o result.h5
+#   python cli.py sweep rain --sweep rain_rate=1:25:2 --sweep temperature=273,293 --workers 4 -o sweep.xlsx
+#   python cli.py serve --port 8765          # 本地仿真服务，见 utils/api_server.py
+#
+# 每行一个事件：start / progress / result / error / done，result 行包含标量结果。
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from core.api import DEFAULT_PARAMS, ENV_TYPES, prepare_params, run_simulation, run_sweep, sweep_values
+
+
+def emit(event, **fields):
+    from utils.export_utils import to_json
+    sys.stdout.write(to_json(dict(event=event, **fields)) + '\n')
+    sys.stdout.flush()
+
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def load_config(path):
+    """读取参数文件：.yaml/.yml 需要安装 PyYAML，其余按 JSON 解析"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("读取 YAML 参数文件需要安装 PyYAML")
+            config = yaml.safe_load(f)
+        else:
+            config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"参数文件格式错误: {path}")
+    return config
+
+
+def parse_assignment(text):
+    key, sep, value = text.partition('=')
+    if not sep or not key.strip():
+        raise ValueError(f"参数格式应为 key=value: {text}")
+    return key.strip(), value.strip()
+
+
+def parse_sweep(text):
+    """key=start:stop:step、key=start:stop:num 个（如 1:25:10n）或 key=v1,v2,..."""
+    key, spec = parse_assignment(text)
+    if ':' in spec:
+        parts = spec.split(':')
+        if len(parts) != 3:
+            raise ValueError(f"扫描范围格式应为 start:stop:step: {text}")
+        start, stop = float(parts[0]), float(parts[1])
+        if parts[2].endswith('n'):
+            return key, sweep_values(start, stop, num=int(parts[2][:-1]))
+        return key, sweep_values(start, stop, step=float(parts[2]))
+    return key, [parse_value(item) for item in spec.split(',') if item.strip()]
+
+
+def collect_params(args):
+    """参数文件中的参数，再用 --set 覆盖；参数文件也可以包含 env_type"""
+    params = load_config(args.config) if args.config else {}
+    params.pop('env_type', None)
+    for item in args.set or []:
+        key, value = parse_assignment(item)
+        params[key] = parse_value(value)
+    return params
+
+
+def write_output(args, env_type, entries):
+    """entries 为生成器时边计算边写入；未指定输出文件时只消耗生成器"""
+    if not args.output:
+        for _ in entries:
+            pass
+        return
+    from utils.export_utils import export_metadata, export_results
+    count = export_results(args.output, entries, export_metadata(env_type, args.description), fmt=args.format)
+    emit('saved', path=os.path.abspath(args.output), count=count)
+
+
+def result_event(index, key, params, results, info):
+    from utils.export_utils import result_scalars
+    emit('result', index=index, key=key, params=params, scalars=result_scalars(results),
+         cached=info['from_cache'], interp_error=info['interp_error'], seconds=round(info['seconds'], 4),
+         perf=results.get('perf'))
+
+
+def command_defaults(args):
+    print(json.dumps(DEFAULT_PARAMS[args.env_type], ensure_ascii=False, indent=2))
+    return 0
+
+
+def command_run(args):
+    params = collect_params(args)
+    prepare_params(args.env_type, params)  # 先检查参数，出错时不输出 start
+    emit('start', env_type=args.env_type, total=1)
+    started = time.perf_counter()
+
+    def on_progress(progress, message):
+        emit('progress', index=0, progress=progress, message=message)
+
+    def entries():
+        results, info = run_simulation(args.env_type, params, use_cache=not args.no_cache,
+                                       on_progress=on_progress, approximate=args.approximate)
+        result_event(0, args.env_type, info['params'], results, info)
+        yield args.env_type, info['params'], results
+
+    write_output(args, args.env_type, entries())
+    emit('done', completed=1, failed=0, seconds=round(time.perf_counter() - started, 4))
+    return 0
+
+
+def command_sweep(args):
+    base_params = collect_params(args)
+    sweep = dict(parse_sweep(item) for item in args.sweep)
+    prepare_params(args.env_type, dict(base_params, **{key: values[0] for key, values in sweep.items()
+                                                      if values}))
+    total = 1
+    for values in sweep.values():
+        total *= len(values)
+    emit('start', env_type=args.env_type, total=total, sweep=sweep)
+    started = time.perf_counter()
+    failed = []
+    finished = [0]
+    stop_event = threading.Event()
+
+    def entries():
+        for item in run_sweep(args.env_type, base_params, sweep, use_cache=not args.no_cache,
+                              workers=args.workers, stop_event=stop_event, approximate=args.approximate):
+            index = item['index']
+            finished[0] += 1
+            if item['error'] is not None:
+                failed.append(index)
+                emit('error', index=index, params=item['params'], message=item['error'])
+                if args.fail_fast:
+                    stop_event.set()
+                continue
+            key = f"task_{index + 1:03d}_" + '_'.join(f"{k}_{item['params'][k]:g}" for k in sweep)
+            result_event(index, key, item['params'], item['results'], item['info'])
+            emit('progress', index=index, progress=int(finished[0] * 100 / total),
+                 message=f"已完成 {finished[0]}/{total}")
+            yield key, item['params'], item['results']
+
+    write_output(args, args.env_type, entries())
+    emit('done', completed=finished[0] - len(failed), failed=len(failed),
+         seconds=round(time.perf_counter() - started, 4))
+    return 1 if failed else 0
+
+
+def command_serve(args):
+    import asyncio
+    from utils.api_server import SimulationService, serve
+    from utils.settings_manager import SettingsManager
+
+    settings = SettingsManager.instance().get('api')
+    service = SimulationService(args.host or settings['host'],
+                                int(settings['port'] if args.port is None else args.port),
+                                int(args.workers or settings['workers']),
+                                int(args.max_concurrent or settings['max_concurrent']),
+                                int(args.max_batch or settings['max_batch']))
+    asyncio.run(serve(service, on_started=lambda s: emit('listening', address=s.address, workers=s.workers,
+                                                        max_concurrent=s.max_concurrent)))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='大气散射雷达仿真命令行工具')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    defaults = sub.add_parser('defaults', help='输出默认参数')
+    defaults.add_argument('env_type', choices=ENV_TYPES)
+    defaults.set_defaults(func=command_defaults)
+
+    for name, func, help_text in (('run', command_run, '运行一次仿真'),
+                                  ('sweep', command_sweep, '参数扫描')):
+        command = sub.add_parser(name, help=help_text)
+        command.add_argument('env_type', choices=ENV_TYPES)
+        command.add_argument('--config', help='参数文件 (JSON 或 YAML)')
+        command.add_argument('--set', action='append', metavar='KEY=VALUE', help='设置参数，可重复')
+        command.add_argument('-o', '--output', help='结果文件 (.txt/.csv/.npz/.h5/.xlsx)')
+        command.add_argument('--format', choices=('txt', 'csv', 'npz', 'h5', 'xlsx'),
+                             help='导出格式，默认按扩展名')
+        command.add_argument('--description', help='写入结果文件的说明')
+        command.add_argument('--no-cache', action='store_true', help='不读写结果缓存')
+        command.add_argument('--approximate', action='store_true', help='允许使用近似缓存结果（插值）')
+        command.set_defaults(func=func)
+        if name == 'sweep':
+            command.add_argument('--sweep', action='append', required=True, metavar='KEY=RANGE',
+                                 help='扫描参数：key=start:stop:step、key=start:stop:Nn 或 key=v1,v2,...；'
+                                      '多个参数取笛卡尔积')
+            command.add_argument('--workers', type=int, default=1, help='并行进程数')
+            command.add_argument('--fail-fast', action='store_true', help='任一任务失败后停止')
+
+    serve_parser = sub.add_parser('serve', help='启动本地仿真服务，默认使用设置中的地址和并发限制')
+    serve_parser.add_argument('--host')
+    serve_parser.add_argument('--port', type=int)
+    serve_parser.add_argument('--workers', type=int, help='计算进程数')
+    serve_parser.add_argument('--max-concurrent', type=int, help='同时计算的仿真数上限')
+    serve_parser.add_argument('--max-batch', type=int, help='单个批量请求最多包含的调用数')
+    serve_parser.set_defaults(func=command_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        emit('error', message='已中断')
+        return 130
+    except Exception as e:
+        emit('error', message=str(e))
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
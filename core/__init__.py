@@ -1,11 +1,28 @@
-from .simulation_core import RainLidarSimulationCore
-from .simulation_worker import SimulationWorker
-from .haze_core import HazeLidarSimulationCore
-from .haze_worker import HazeSimulationWorker
+# 子模块在首次访问时才导入，PyMieScatt 只在第一次仿真时导入（见 core/mie.py）
+import importlib
+
+_EXPORTS = {
+    'RainLidarSimulationCore': 'simulation_core',
+    'SimulationWorker': 'simulation_worker',
+    'HazeLidarSimulationCore': 'haze_core',
+    'HazeSimulationWorker': 'haze_worker',
+    'run_simulation': 'api',
+    'run_sweep': 'api',
+}
 
 __all__ = [
     'RainLidarSimulationCore',
     'SimulationWorker',
     'HazeLidarSimulationCore',
-    'HazeSimulationWorker'
+    'HazeSimulationWorker',
+    'run_simulation',
+    'run_sweep',
 ]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
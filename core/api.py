@@ -0,0 +1,211 @@
+# core/api.py
+# 不依赖界面的仿真接口，命令行 (cli.py)、批处理和界面的计算线程共用。
+#
+#   from core.api import run_simulation, run_sweep
+#   results, info = run_simulation('rain', {'rain_rate': 10.0})
+#   for item in run_sweep('haze', {}, {'visibility': [0.5, 1.0, 2.0]}):
+#       print(item['index'], item['results']['eff_range'])
+import itertools
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from core.perf import StageTimer
+
+# 各环境的默认参数，与界面左侧面板的默认值一致
+DEFAULT_PARAMS = {
+    'rain': {
+        'avg_power': 0.1,
+        'frequency': 10.0,          # GHz
+        'pulse_width': 300,         # ns
+        'system_efficiency': 0.85,
+        'max_range': 1,             # km
+        'sensitivity': -90.0,       # dBm
+        'rain_rate': 15.0,          # mm/h
+        'temperature': 277.0,       # K
+    },
+    'haze': {
+        'avg_power': 0.1,
+        'frequency': 193548.0,      # GHz
+        'pulse_width': 300,
+        'system_efficiency': 0.85,
+        'max_range': 1,
+        'sensitivity': -90.0,
+        'visibility': 1.0,          # km
+        'ref_real': 1.45,
+        'ref_imag': 0.008,
+    },
+}
+
+ENV_TYPES = tuple(DEFAULT_PARAMS)
+
+# 由其他参数推导、不需要调用方提供的键
+DERIVED_PARAMS = ('wavelength', 'sensitivity_watts', 'env_type')
+
+
+def core_class(env_type):
+    if env_type == 'rain':
+        from core.simulation_core import RainLidarSimulationCore
+        return RainLidarSimulationCore
+    if env_type == 'haze':
+        from core.haze_core import HazeLidarSimulationCore
+        return HazeLidarSimulationCore
+    raise ValueError(f"未知的环境类型: {env_type}")
+
+
+def prepare_params(env_type, params=None):
+    """补全默认参数并计算推导量（波长、灵敏度阈值），未知参数名报错"""
+    if env_type not in DEFAULT_PARAMS:
+        raise ValueError(f"未知的环境类型: {env_type}")
+    defaults = DEFAULT_PARAMS[env_type]
+    params = dict(params or {})
+    unknown = set(params) - set(defaults) - set(DERIVED_PARAMS)
+    if unknown:
+        raise ValueError(f"未知参数: {', '.join(sorted(unknown))}")
+
+    prepared = dict(defaults)
+    for key, value in params.items():
+        if key in defaults:
+            # 与界面控件一致：脉宽、探测距离为整数，其余为浮点
+            prepared[key] = type(defaults[key])(value)
+    # 将频率(GHz)转换为波长(nm): λ(nm) = 3e8 / f(GHz)
+    prepared['wavelength'] = 3e8 / prepared['frequency']
+    prepared['sensitivity_watts'] = 10 ** ((prepared['sensitivity'] - 30) / 10)
+    return prepared
+
+
+class _ProgressSignal:
+    """让仿真核心的 worker.progress.emit(进度, 信息) 调用回调函数"""
+
+    def __init__(self, callback):
+        self.emit = callback
+
+
+class _ProgressReporter:
+    def __init__(self, callback):
+        self.progress = _ProgressSignal(callback)
+
+
+def run_simulation(env_type, params=None, use_cache=True, on_progress=None, approximate=True):
+    """运行一次仿真
+
+    params 可以只包含需要修改的参数，其余使用默认值。
+    on_progress(进度百分比, 信息) 在计算过程中调用。
+    approximate 为 True 时允许用相近参数的缓存插值出近似结果。
+    返回 (结果字典, 信息)，信息包含 params（补全后的参数）、from_cache、interp_error 和 seconds；
+    结果字典的 'perf' 为各阶段耗时和计数（见 core/perf.py）。
+    """
+    started = time.perf_counter()
+    params = prepare_params(env_type, params)
+    info = {'params': params, 'from_cache': False, 'interp_error': None}
+    cls = core_class(env_type)
+
+    def report(progress, message):
+        if on_progress is not None:
+            on_progress(progress, message)
+
+    cache = None
+    timer = StageTimer()
+    if use_cache:
+        from utils.result_cache import ResultCache
+        cache = ResultCache.instance()
+        with timer.stage('cache_lookup'):
+            results = cache.get(params, env_type)
+        if results is not None:
+            timer.count('cache_hit')
+            results['perf'] = timer.as_dict()
+            info['from_cache'] = True
+            report(100, "命中结果缓存")
+            info['seconds'] = time.perf_counter() - started
+            return results, info
+
+    sim = cls(params, _ProgressReporter(report) if on_progress is not None else None)
+    sim.timer = timer
+    approx = None
+    if cache is not None and approximate:
+        with timer.stage('cache_lookup'):
+            approx = cache.get_approximate(params, env_type, cls.MICROPHYSICS_PARAMS)
+    if approx is not None:
+        # 复用相近参数的微物理量，只重新计算雷达信号
+        fields, interp_error = approx
+        timer.count('approx_hit')
+        results = sim.assemble_results(fields['alpha'], fields['beta'], fields['radii'],
+                                       fields['size_distribution'], fields['theta'],
+                                       fields['phase_func'])
+        results['interp_error'] = interp_error
+        info['from_cache'] = True
+        info['interp_error'] = interp_error
+        report(100, "使用近似缓存结果")
+    else:
+        results = sim.run_simulation()
+        if cache is not None:
+            with timer.stage('cache_store'):
+                cache.put(params, env_type, results)
+            results['perf'] = timer.as_dict()
+    info['seconds'] = time.perf_counter() - started
+    return results, info
+
+
+def run_task(env_type, params, use_cache=True, approximate=False):
+    """进程池中执行的单个任务（模块级函数，便于序列化）"""
+    return run_simulation(env_type, params, use_cache, approximate=approximate)
+
+
+def sweep_values(start, stop, step=None, num=None):
+    """扫描取值：给定步长时包含终点（允许浮点误差），给定个数时等间距"""
+    if num is not None:
+        return [float(v) for v in np.linspace(start, stop, int(num))]
+    if not step or step <= 0:
+        raise ValueError("扫描步长必须大于 0")
+    count = int(math.floor((stop - start) / step + 1e-9)) + 1
+    return [float(start + i * step) for i in range(max(count, 0))]
+
+
+def sweep_tasks(base_params, sweep):
+    """sweep: {参数名: [取值, ...]}，多个参数时取笛卡尔积，返回参数字典列表"""
+    keys = list(sweep)
+    tasks = []
+    for combo in itertools.product(*(sweep[key] for key in keys)):
+        params = dict(base_params or {})
+        params.update(zip(keys, combo))
+        tasks.append(params)
+    return tasks
+
+
+def run_sweep(env_type, base_params, sweep, use_cache=True, workers=1, stop_event=None,
+              approximate=False):
+    """依次（或在进程池中并行）运行扫描任务，每完成一个产生一项：
+
+    {'index', 'params', 'results', 'info', 'error'}，出错时 results 为 None。
+    并行时按完成顺序产生。stop_event 被设置后不再开始新任务。
+    """
+    tasks = sweep_tasks(base_params, sweep)
+    if workers <= 1 or len(tasks) <= 1:
+        for index, params in enumerate(tasks):
+            if stop_event is not None and stop_event.is_set():
+                break
+            yield _sweep_item(index, params, lambda p=params: run_task(env_type, p, use_cache, approximate))
+        return
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as executor:
+        futures = {executor.submit(run_task, env_type, params, use_cache, approximate): (index, params)
+                   for index, params in enumerate(tasks)}
+        for future in as_completed(futures):
+            if stop_event is not None and stop_event.is_set():
+                for pending in futures:
+                    pending.cancel()
+                break
+            index, params = futures[future]
+            yield _sweep_item(index, params, future.result)
+
+
+def _sweep_item(index, params, compute):
+    try:
+        results, info = compute()
+        return {'index': index, 'params': info['params'], 'results': results, 'info': info, 'error': None}
+    except Exception as e:
+        return {'index': index, 'params': params, 'results': None, 'info': None, 'error': str(e)}
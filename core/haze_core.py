@@ -1,13 +1,19 @@
 # core/haze_core.py
 import numpy as np
-import PyMieScatt as PMS
+
+from core.mie import mie_engine
+from core.perf import StageTimer
 
 
 class HazeLidarSimulationCore:
     """核心仿真逻辑类 - 雾霾环境"""
 
+    # 决定散射系数、粒子谱和相函数的参数，其余参数只影响雷达方程
+    MICROPHYSICS_PARAMS = ('visibility', 'ref_real', 'ref_imag', 'frequency')
+
     def __init__(self, params, worker=None):
         self.worker = worker
+        self.timer = StageTimer()
         self.visibility = params['visibility'] * 1000  # km -> m
         self.refractive_index = complex(params['ref_real'], params['ref_imag'])
         self.wavelength = params['wavelength']
@@ -45,39 +51,45 @@ class HazeLidarSimulationCore:
         return radii_um, diameters_nm, n_r, r_step, beta_ext_target  # 返回radii_um用于绘图
 
     def calculate_scattering_properties(self):
-        radii_um, diameters_nm, n_r_dist, r_step, beta_ext_target = self.generate_aerosol_distribution()
-        q_exts, q_backs = [], []
-
-        for d in diameters_nm:
-            try:
-                q_ext, q_sca, q_abs, g, q_pr, q_back, q_ratio = PMS.AutoMieQ(
-                    m=self.refractive_index, wavelength=self.wavelength, diameter=d
-                )
-                q_exts.append(q_ext)
-                q_backs.append(q_back)
-            except:
-                q_exts.append(0.0)
-                q_backs.append(0.0)
-
-        q_exts = np.array(q_exts)
-        q_backs = np.array(q_backs)
-        area_m2 = np.pi * ((diameters_nm * 1e-9) / 2) ** 2
-
-        # 归一化粒子数密度分布
-        n_r_normalized = n_r_dist / np.sum(n_r_dist * r_step)
-
-        # 计算单位浓度下的消光系数
-        alpha_per_particle = np.sum(q_exts * area_m2 * n_r_normalized * r_step)
-
-        # 根据能见度调整粒子总浓度
-        N_total = beta_ext_target / alpha_per_particle if alpha_per_particle > 0 else 1e6
-
-        # 实际粒子数密度
-        n_i = n_r_normalized * N_total * r_step
-
-        # 计算消光系数和后向散射系数
-        alpha_ext = np.sum(q_exts * area_m2 * n_i)
-        beta_back = np.sum((q_backs * area_m2 / (4 * np.pi)) * n_i)
+        PMS = mie_engine()
+        with self.timer.stage('distribution'):
+            radii_um, diameters_nm, n_r_dist, r_step, beta_ext_target = self.generate_aerosol_distribution()
+        self.timer.size('size_bins', diameters_nm)
+
+        with self.timer.stage('mie'):
+            q_exts, q_backs = [], []
+            for d in diameters_nm:
+                self.timer.count('mie_calls')
+                try:
+                    q_ext, q_sca, q_abs, g, q_pr, q_back, q_ratio = PMS.AutoMieQ(
+                        m=self.refractive_index, wavelength=self.wavelength, diameter=d
+                    )
+                    q_exts.append(q_ext)
+                    q_backs.append(q_back)
+                except:
+                    self.timer.count('mie_errors')
+                    q_exts.append(0.0)
+                    q_backs.append(0.0)
+
+            q_exts = np.array(q_exts)
+            q_backs = np.array(q_backs)
+            area_m2 = np.pi * ((diameters_nm * 1e-9) / 2) ** 2
+
+            # 归一化粒子数密度分布
+            n_r_normalized = n_r_dist / np.sum(n_r_dist * r_step)
+
+            # 计算单位浓度下的消光系数
+            alpha_per_particle = np.sum(q_exts * area_m2 * n_r_normalized * r_step)
+
+            # 根据能见度调整粒子总浓度
+            N_total = beta_ext_target / alpha_per_particle if alpha_per_particle > 0 else 1e6
+
+            # 实际粒子数密度
+            n_i = n_r_normalized * N_total * r_step
+
+            # 计算消光系数和后向散射系数
+            alpha_ext = np.sum(q_exts * area_m2 * n_i)
+            beta_back = np.sum((q_backs * area_m2 / (4 * np.pi)) * n_i)
 
         # 返回粒子谱分布数据
         return alpha_ext, beta_back, radii_um, n_i
@@ -93,6 +105,7 @@ class HazeLidarSimulationCore:
 
     def calculate_angular_scattering(self):
         """计算角度散射函数"""
+        PMS = mie_engine()
         rep_radii_um = [0.1, 0.5, 2.0]  # 代表性粒子半径
         v = 3.0  # Junge指数
         total_su = None
@@ -102,6 +115,7 @@ class HazeLidarSimulationCore:
             d_nm = r_um * 2000  # μm -> nm
             weight = r_um ** (-v)
             try:
+                self.timer.count('angular_mie_calls')
                 measure = PMS.ScatteringFunction(self.refractive_index,
                                                  self.wavelength, d_nm,
                                                  angularResolution=1.0)
@@ -127,17 +141,29 @@ class HazeLidarSimulationCore:
         self._report_progress(20, "生成气溶胶分布...")
         alpha, beta, radii_um, size_dist = self.calculate_scattering_properties()  # 获取新增数据
 
-        self._report_progress(50, "计算雷达信号...")
-        r, p_received, trans = self.calculate_lidar_signal(alpha, beta)
-
-        valid_indices = np.where(p_received > self.sensitivity_threshold)[0]
-        eff_range = r[valid_indices[-1]] if len(valid_indices) > 0 else 0.0
-        echo_power = p_received[-1]
+        self._report_progress(50, "计算角度散射...")
+        with self.timer.stage('angular'):
+            theta, phase_func = self.calculate_angular_scattering()
 
-        self._report_progress(80, "计算角度散射...")
-        theta, phase_func = self.calculate_angular_scattering()
+        self._report_progress(80, "计算雷达信号...")
+        results = self.assemble_results(alpha, beta, radii_um, size_dist, theta, phase_func)
 
         self._report_progress(100, "完成仿真计算...")
+        return results
+
+    def assemble_results(self, alpha, beta, radii_um, size_dist, theta, phase_func):
+        """由微物理量（散射系数、粒子谱、相函数）计算雷达信号并组装结果
+
+        雷达信号只依赖系统参数，不需要 Mie 计算，近似缓存复用微物理量时也调用此方法。
+        """
+        with self.timer.stage('lidar'):
+            r, p_received, trans = self.calculate_lidar_signal(alpha, beta)
+
+            valid_indices = np.where(p_received > self.sensitivity_threshold)[0]
+            eff_range = r[valid_indices[-1]] if len(valid_indices) > 0 else 0.0
+            echo_power = p_received[-1]
+        self.timer.size('range_points', r)
+        self.timer.size('angle_points', theta)
 
         return {
             'alpha': alpha,
@@ -151,5 +177,6 @@ class HazeLidarSimulationCore:
             'phase_func': phase_func,
             # 新增粒子谱分布数据
             'radii': radii_um,  # 粒子半径 (μm)
-            'size_distribution': size_dist  # 粒子数密度分布
+            'size_distribution': size_dist,  # 粒子数密度分布
+            'perf': self.timer.as_dict(),  # 各阶段耗时和计数
         }
@@ -0,0 +1,21 @@
+# core/mie.py
+# PyMieScatt（连带 scipy）导入较慢，只在第一次仿真计算时导入
+_engine = None
+
+
+def mie_engine():
+    """返回 PyMieScatt 模块，首次调用时导入"""
+    global _engine
+    if _engine is None:
+        import PyMieScatt
+        _engine = PyMieScatt
+    return _engine
+
+
+def use_mie_engine(engine):
+    """替换 Mie 计算引擎，engine 需提供与 PyMieScatt 相同的 AutoMieQ 和 ScatteringFunction
+
+    用于在基准测试中验证新引擎（benchmarks/core_bench.py --mie-engine）。
+    """
+    global _engine
+    _engine = engine
@@ -0,0 +1,81 @@
+# core/perf.py
+# 仿真各阶段的耗时和计数，随结果保存在 results['perf'] 中（历史记录、导出和性能面板使用）
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# 阶段显示名，按计算顺序排列
+STAGE_LABELS = {
+    'cache_lookup': '缓存查询',
+    'distribution': '粒子谱',
+    'mie': 'Mie 散射',
+    'angular': '角散射',
+    'lidar': '雷达方程',
+    'cache_store': '缓存写入',
+}
+
+COUNTER_LABELS = {
+    'mie_calls': 'Mie 调用次数',
+    'mie_errors': 'Mie 计算失败',
+    'angular_mie_calls': '角散射 Mie 调用',
+    'cache_hit': '缓存命中',
+    'approx_hit': '近似缓存命中',
+    'size_bins': '粒径分档数',
+    'angle_points': '散射角点数',
+    'range_points': '距离点数',
+}
+
+
+class StageTimer:
+    """累计各阶段耗时 (秒) 和计数，开销只有每个阶段两次 perf_counter"""
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def size(self, name, array):
+        """记录数组大小"""
+        self.counters[name] = int(np.size(array))
+
+    def as_dict(self):
+        return {
+            'stages': dict(self.stages),
+            'counters': dict(self.counters),
+            'total': sum(self.stages.values()),
+        }
+
+
+def perf_rows(perf):
+    """[(显示名, 文本), ...]，阶段在前、计数在后，用于界面显示"""
+    if not isinstance(perf, dict):
+        return []
+    stages = perf.get('stages', {})
+    total = perf.get('total') or sum(stages.values())
+    order = list(STAGE_LABELS)
+    rows = []
+    for name in sorted(stages, key=lambda n: order.index(n) if n in order else len(order)):
+        seconds = stages[name]
+        share = f"  ({seconds / total * 100:.0f}%)" if total > 0 else ''
+        rows.append((STAGE_LABELS.get(name, name), f"{seconds * 1000:.1f} ms{share}"))
+    if stages:
+        rows.append(('合计', f"{total * 1000:.1f} ms"))
+    for name, value in perf.get('counters', {}).items():
+        rows.append((COUNTER_LABELS.get(name, name), str(value)))
+    if perf.get('profile_dir'):
+        rows.append(('深度分析结果', perf['profile_dir']))
+    return rows
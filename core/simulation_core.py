@@ -1,13 +1,19 @@
 # core/simulation_core.py
 import numpy as np
-import PyMieScatt as PMS
+
+from core.mie import mie_engine
+from core.perf import StageTimer
 
 
 class RainLidarSimulationCore:
     """核心仿真逻辑类"""
 
+    # 决定散射系数、粒子谱和相函数的参数，其余参数只影响雷达方程
+    MICROPHYSICS_PARAMS = ('rain_rate', 'temperature', 'frequency')
+
     def __init__(self, params, worker=None):
         self.worker = worker
+        self.timer = StageTimer()
         self.rain_rate = params['rain_rate']
         self.temperature = params['temperature']  # 温度 (K)
         self.frequency = params['frequency']  # 频率 (GHz)
@@ -76,23 +82,28 @@ class RainLidarSimulationCore:
         return radii_um, diameters_nm, nd, d_step
 
     def calculate_scattering_properties(self):
-        radii_um, diameters_nm, nd_dist, d_step = self.generate_raindrop_distribution()
-        q_exts, q_backs = [], []
-
-        for d in diameters_nm:
-            q_ext, q_sca, q_abs, g, q_pr, q_back, q_ratio = PMS.AutoMieQ(
-                m=self.refractive_index, wavelength=self.wavelength, diameter=d
-            )
-            q_exts.append(q_ext)
-            q_backs.append(q_back)
-
-        q_exts = np.array(q_exts)
-        q_backs = np.array(q_backs)
-        area_m2 = np.pi * ((diameters_nm * 1e-9) / 2) ** 2
-        n_i = nd_dist * d_step
-
-        alpha_ext = np.sum(q_exts * area_m2 * n_i)
-        beta_back = np.sum(q_backs * area_m2* n_i)
+        PMS = mie_engine()
+        with self.timer.stage('distribution'):
+            radii_um, diameters_nm, nd_dist, d_step = self.generate_raindrop_distribution()
+        self.timer.size('size_bins', diameters_nm)
+
+        with self.timer.stage('mie'):
+            q_exts, q_backs = [], []
+            for d in diameters_nm:
+                q_ext, q_sca, q_abs, g, q_pr, q_back, q_ratio = PMS.AutoMieQ(
+                    m=self.refractive_index, wavelength=self.wavelength, diameter=d
+                )
+                self.timer.count('mie_calls')
+                q_exts.append(q_ext)
+                q_backs.append(q_back)
+
+            q_exts = np.array(q_exts)
+            q_backs = np.array(q_backs)
+            area_m2 = np.pi * ((diameters_nm * 1e-9) / 2) ** 2
+            n_i = nd_dist * d_step
+
+            alpha_ext = np.sum(q_exts * area_m2 * n_i)
+            beta_back = np.sum(q_backs * area_m2* n_i)
 
         return alpha_ext, beta_back, radii_um, n_i
 
@@ -106,6 +117,7 @@ class RainLidarSimulationCore:
         return r, p_received, transmittance_two_way
 
     def calculate_angular_scattering(self):
+        PMS = mie_engine()
         rep_diams_mm = [0.5, 1.0, 2.0]
         d_intervals = [0.5, 1.0, 1.0]  # 每个代表性粒径对应的粒径间隔
         Lambda = 4.1 * (self.rain_rate ** -0.21)
@@ -116,6 +128,7 @@ class RainLidarSimulationCore:
             d_nm = d_mm * 1e6
             weight = 8000.0 * np.exp(-Lambda * d_mm) * d_step  # 加上粒径间隔
             try:
+                self.timer.count('angular_mie_calls')
                 measure = PMS.ScatteringFunction(self.refractive_index,
                                                  self.wavelength, d_nm,
                                                  angularResolution=1.0)
@@ -144,17 +157,29 @@ class RainLidarSimulationCore:
         self._report_progress(30, "计算散射特性...")
         alpha, beta, radii_um, size_dist = self.calculate_scattering_properties()
 
-        self._report_progress(60, "计算雷达信号...")
-        r, p_received, trans = self.calculate_lidar_signal(alpha, beta)
+        self._report_progress(60, "计算角度散射...")
+        with self.timer.stage('angular'):
+            theta, phase_func = self.calculate_angular_scattering()
 
-        valid_indices = np.where(p_received > self.sensitivity_threshold)[0]
-        eff_range = r[valid_indices[-1]] if len(valid_indices) > 0 else 0.0
-        echo_power = p_received[-1]
-
-        self._report_progress(80, "计算角度散射...")
-        theta, phase_func = self.calculate_angular_scattering()
+        self._report_progress(80, "计算雷达信号...")
+        results = self.assemble_results(alpha, beta, radii_um, size_dist, theta, phase_func)
 
         self._report_progress(100, "完成仿真计算...")
+        return results
+
+    def assemble_results(self, alpha, beta, radii_um, size_dist, theta, phase_func):
+        """由微物理量（散射系数、粒子谱、相函数）计算雷达信号并组装结果
+
+        雷达信号只依赖系统参数，不需要 Mie 计算，近似缓存复用微物理量时也调用此方法。
+        """
+        with self.timer.stage('lidar'):
+            r, p_received, trans = self.calculate_lidar_signal(alpha, beta)
+
+            valid_indices = np.where(p_received > self.sensitivity_threshold)[0]
+            eff_range = r[valid_indices[-1]] if len(valid_indices) > 0 else 0.0
+            echo_power = p_received[-1]
+        self.timer.size('range_points', r)
+        self.timer.size('angle_points', theta)
 
         return {
             'alpha': alpha,
@@ -168,5 +193,6 @@ class RainLidarSimulationCore:
             'phase_func': phase_func,
             # 新增粒子谱分布数据
             'radii': radii_um,  # 粒子半径 (μm)
-            'size_distribution': size_dist  # 粒子数密度分布
+            'size_distribution': size_dist,  # 粒子数密度分布
+            'perf': self.timer.as_dict(),  # 各阶段耗时和计数
         }
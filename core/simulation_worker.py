@@ -1,6 +1,7 @@
 # core/simulation_worker.py
 from PyQt5.QtCore import QThread, pyqtSignal
-from core.simulation_core import RainLidarSimulationCore
+from core.api import run_simulation
+from utils.profiling import profile_if
 
 class SimulationWorker(QThread):
     """后台计算线程，防止界面卡死"""
@@ -11,13 +12,21 @@ class SimulationWorker(QThread):
     def __init__(self, params):
         super().__init__()
         self.params = params
+        self.from_cache = False
+        self.interp_error = None  # 近似缓存结果的插值误差估计
+        self.profile_name = None  # 设置后本次运行进行深度分析（见 utils/profiling.py）
+        self.profile = None       # 分析结果摘要
 
     def run(self):
         try:
-            # 预先计算 Watts 阈值方便绘图使用
-            self.params['sensitivity_watts'] = 10 ** ((self.params['sensitivity'] - 30) / 10)
-            sim = RainLidarSimulationCore(self.params, self)
-            results = sim.run_simulation()
+            with profile_if(self.profile_name) as capture:
+                results, info = run_simulation('rain', self.params, on_progress=self.progress.emit)
+            if capture is not None:
+                self.profile = capture.summary
+            # 补全后的参数包含 Watts 阈值，方便绘图使用
+            self.params.update(info['params'])
+            self.from_cache = info['from_cache']
+            self.interp_error = info['interp_error']
             self.finished.emit(results)
         except Exception as e:
             self.error.emit(str(e))
@@ -1,15 +1,30 @@
-from .rain_window import RainSimulationWindow
-from .haze_window import HazeSimulationWindow
-from .right_panel import RightPanel
-from .menu_bar import MenuBarManager
-from .rain_left_panel import RainLeftPanel
-from .haze_left_panel import HazeLeftPanel
+# 子模块在首次访问时才导入，导入 gui 包（如 gui.export_progress）不会加载 matplotlib 等依赖
+import importlib
+
+_EXPORTS = {
+    'RainSimulationWindow': 'rain_window',
+    'HazeSimulationWindow': 'haze_window',
+    'RightPanel': 'right_panel',
+    'create_result_panel': 'plot_backend',
+    'MenuBarManager': 'menu_bar',
+    'RainLeftPanel': 'rain_left_panel',
+    'HazeLeftPanel': 'haze_left_panel',
+}
 
 __all__ = [
     'RainSimulationWindow',
     'HazeSimulationWindow',
     'RightPanel',
+    'create_result_panel',
     'MenuBarManager',
     'RainLeftPanel',
     'HazeLeftPanel'
 ]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
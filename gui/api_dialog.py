@@ -0,0 +1,174 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QGroupBox, QLabel,
+                             QLineEdit, QSpinBox, QPushButton, QMessageBox)
+
+from utils import api_server
+from utils.settings_manager import SettingsManager
+
+ENDPOINTS_TEXT = (
+    "POST /rpc            JSON-RPC 2.0（数组为批量请求）\n"
+    "POST /run            单次仿真\n"
+    "POST /sweep          参数扫描，JSON lines 流式返回\n"
+    "GET  /cache-status   结果缓存和服务状态\n"
+    "GET  /history        查询历史记录\n"
+    "GET  /health         服务是否可用"
+)
+
+
+class ApiSettingsDialog(QDialog):
+    """本地仿真服务设置（地址、计算进程数和并发限制），重新启动服务后生效"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = SettingsManager.instance()
+        self.initUI()
+
+    def initUI(self):
+        self.setWindowTitle('数据接口设置')
+        self.setMinimumWidth(360)
+        layout = QVBoxLayout(self)
+        api = self.settings.get('api')
+
+        group = QGroupBox('本地仿真服务')
+        g_layout = QGridLayout(group)
+
+        g_layout.addWidget(QLabel('监听地址'), 0, 0)
+        self.host_edit = QLineEdit(str(api['host']))
+        g_layout.addWidget(self.host_edit, 0, 1)
+
+        g_layout.addWidget(QLabel('端口'), 1, 0)
+        self.port_spin = QSpinBox()
+        self.port_spin.setRange(1, 65535)
+        self.port_spin.setValue(int(api['port']))
+        g_layout.addWidget(self.port_spin, 1, 1)
+
+        g_layout.addWidget(QLabel('计算进程数'), 2, 0)
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(int(api['workers']))
+        g_layout.addWidget(self.workers_spin, 2, 1)
+
+        g_layout.addWidget(QLabel('最大并发仿真数'), 3, 0)
+        self.concurrent_spin = QSpinBox()
+        self.concurrent_spin.setRange(1, 256)
+        self.concurrent_spin.setValue(int(api['max_concurrent']))
+        g_layout.addWidget(self.concurrent_spin, 3, 1)
+
+        g_layout.addWidget(QLabel('批量请求最大调用数'), 4, 0)
+        self.batch_spin = QSpinBox()
+        self.batch_spin.setRange(1, 10000)
+        self.batch_spin.setValue(int(api['max_batch']))
+        g_layout.addWidget(self.batch_spin, 4, 1)
+
+        hint = QLabel('监听 127.0.0.1 时只有本机程序可以访问；修改后重新启动服务生效。')
+        hint.setWordWrap(True)
+        hint.setStyleSheet("color: #7f8c8d;")
+        g_layout.addWidget(hint, 5, 0, 1, 2)
+        layout.addWidget(group)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        save_btn = QPushButton('保存')
+        save_btn.clicked.connect(self.save)
+        button_layout.addWidget(save_btn)
+        cancel_btn = QPushButton('取消')
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+
+    def save(self):
+        host = self.host_edit.text().strip()
+        if not host:
+            QMessageBox.warning(self, '警告', '监听地址不能为空')
+            return
+        self.settings.update_section('api', {
+            'host': host,
+            'port': self.port_spin.value(),
+            'workers': self.workers_spin.value(),
+            'max_concurrent': self.concurrent_spin.value(),
+            'max_batch': self.batch_spin.value(),
+        })
+        self.accept()
+
+
+class ApiServiceDialog(QDialog):
+    """外部 API：启动、停止本地仿真服务并显示运行状态"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.initUI()
+        # 服务线程中的计数器只读取，不需要加锁
+        self.status_timer = QTimer(self)
+        self.status_timer.timeout.connect(self.update_status)
+        self.status_timer.start(1000)
+        self.update_status()
+
+    def initUI(self):
+        self.setWindowTitle('外部API')
+        self.setMinimumWidth(460)
+        layout = QVBoxLayout(self)
+
+        status_group = QGroupBox('服务状态')
+        s_layout = QVBoxLayout(status_group)
+        self.state_label = QLabel()
+        s_layout.addWidget(self.state_label)
+        self.stats_label = QLabel()
+        self.stats_label.setStyleSheet("color: #7f8c8d;")
+        s_layout.addWidget(self.stats_label)
+        layout.addWidget(status_group)
+
+        endpoints_group = QGroupBox('接口')
+        e_layout = QVBoxLayout(endpoints_group)
+        endpoints = QLabel(ENDPOINTS_TEXT)
+        endpoints.setStyleSheet("font-family: Consolas, monospace;")
+        e_layout.addWidget(endpoints)
+        layout.addWidget(endpoints_group)
+
+        button_layout = QHBoxLayout()
+        self.toggle_btn = QPushButton()
+        self.toggle_btn.clicked.connect(self.toggle_service)
+        button_layout.addWidget(self.toggle_btn)
+        settings_btn = QPushButton('设置...')
+        settings_btn.clicked.connect(self.open_settings)
+        button_layout.addWidget(settings_btn)
+        button_layout.addStretch()
+        close_btn = QPushButton('关闭')
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+    def update_status(self):
+        thread = api_server.service_thread()
+        if thread is None:
+            self.state_label.setText('未运行')
+            self.stats_label.setText('')
+            self.toggle_btn.setText('启动服务')
+            return
+        service = thread.service
+        self.toggle_btn.setText('停止服务')
+        if service.started_at is None:
+            self.state_label.setText('正在启动...')
+            self.stats_label.setText('')
+            return
+        stats = service.service_status()
+        self.state_label.setText(f"运行中: {stats['address']}")
+        self.stats_label.setText(
+            f"请求 {stats['requests']} 次，仿真 {stats['simulations']} 次"
+            f"（缓存命中 {stats['cache_hits']}，合并 {stats['shared']}，失败 {stats['errors']}）\n"
+            f"正在计算 {stats['active']}，排队 {max(stats['pending'] - stats['active'], 0)}，"
+            f"计算进程 {stats['workers']}，并发上限 {stats['max_concurrent']}")
+
+    def toggle_service(self):
+        if api_server.service_thread() is None:
+            thread = api_server.start_service()
+            thread.server_error.connect(self.on_server_error)
+        else:
+            api_server.stop_service()
+        self.update_status()
+
+    def on_server_error(self, message):
+        QMessageBox.warning(self, '外部API', f"本地仿真服务启动失败: {message}")
+        self.update_status()
+
+    def open_settings(self):
+        ApiSettingsDialog(self).exec_()
@@ -6,7 +6,15 @@ from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QColor
 import numpy as np
 from datetime import datetime
+import os
 import json
+from core.api import run_simulation
+from utils.profiling import profile_if
+from utils.figure_export import FigureExportWorker, build_bulk_jobs
+from utils.export_utils import (BatchResultSink, DataExportWorker, EXPORT_FILTERS, export_format,
+                                export_metadata)
+from utils.settings_manager import get_data_dir
+from gui.export_progress import start_export, ask_bulk_export_target
 
 
 class BatchSimulationDialog(QDialog):
@@ -16,9 +24,11 @@ class BatchSimulationDialog(QDialog):
         self.env_type = getattr(main_window, 'env_type', 'rain')
         self.tasks = []
         self.current_task_index = 0
-        self.results = []
+        self.task_results = {}  # 任务序号 -> 结果
+        self.sink_path = None   # 用户指定的结果汇总文件，None 时自动生成
         self.worker = None
         self.initUI()
+        self.restore_outputs()
 
     def initUI(self):
         self.setWindowTitle('批处理仿真')
@@ -34,6 +44,19 @@ class BatchSimulationDialog(QDialog):
         
         layout.addWidget(tab_widget)
 
+        # 结果汇总文件：运行时每完成一个任务追加一行
+        sink_layout = QHBoxLayout()
+        self.sink_check = QCheckBox('运行时写入结果汇总 (CSV)')
+        self.sink_check.setChecked(True)
+        sink_layout.addWidget(self.sink_check)
+        self.sink_path_label = QLabel('自动保存到数据目录')
+        self.sink_path_label.setStyleSheet("color: #7f8c8d;")
+        sink_layout.addWidget(self.sink_path_label, 1)
+        sink_browse_btn = QPushButton('位置...')
+        sink_browse_btn.clicked.connect(self.select_sink_path)
+        sink_layout.addWidget(sink_browse_btn)
+        layout.addLayout(sink_layout)
+
         button_layout = QHBoxLayout()
         button_layout.addStretch()
         
@@ -98,6 +121,13 @@ class BatchSimulationDialog(QDialog):
         self.export_btn.clicked.connect(self.export_results)
         self.export_btn.setEnabled(False)
         button_layout.addWidget(self.export_btn)
+
+        self.export_fig_btn = QPushButton('导出图表')
+        self.export_fig_btn.setFixedWidth(120)
+        self.export_fig_btn.setStyleSheet(self.export_btn.styleSheet())
+        self.export_fig_btn.clicked.connect(self.export_figures)
+        self.export_fig_btn.setEnabled(False)
+        button_layout.addWidget(self.export_fig_btn)
         
         layout.addLayout(button_layout)
 
@@ -318,6 +348,7 @@ class BatchSimulationDialog(QDialog):
         values = np.arange(start, end + step, step)
         
         self.tasks = []
+        self.reset_results()
         for i, value in enumerate(values):
             task = {
                 'type': 'scan',
@@ -344,6 +375,7 @@ class BatchSimulationDialog(QDialog):
             return
         
         self.tasks = []
+        self.reset_results()
         for i, (param_key, param_name, value) in enumerate(selected_params):
             task = {
                 'type': 'multi',
@@ -382,7 +414,10 @@ class BatchSimulationDialog(QDialog):
             param_text = f"{task['param_name']}: {task['value']:.2f}"
             self.queue_table.setItem(i, 2, QTableWidgetItem(param_text))
             
-            status_item = QTableWidgetItem(task['status'])
+            status_text = task['status']
+            if task['status'] == 'completed' and task.get('cached'):
+                status_text = 'completed (cached)'
+            status_item = QTableWidgetItem(status_text)
             if task['status'] == 'pending':
                 status_item.setForeground(QColor('#7f8c8d'))
             elif task['status'] == 'running':
@@ -401,11 +436,26 @@ class BatchSimulationDialog(QDialog):
         self.run_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.export_btn.setEnabled(False)
+        self.export_fig_btn.setEnabled(False)
         
         self.current_task_index = 0
-        self.results = []
+        self.task_results = {}
+
+        # 参数在界面线程中读取一次，工作线程不访问界面控件
+        base_params = self.main_window.left_panel.get_parameters()
+        sink = None
+        if self.sink_check.isChecked():
+            path = self.sink_path or os.path.join(
+                get_data_dir(), 'batch_results',
+                f"batch_{self.env_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+            try:
+                sink = BatchResultSink(path, base_params.keys())
+                self.sink_path_label.setText(path)
+            except OSError as e:
+                QMessageBox.warning(self, '警告', f'无法创建结果汇总文件: {e}')
         
-        self.worker = BatchSimulationWorker(self.tasks, self.main_window, self.env_type)
+        self.worker = BatchSimulationWorker(self.tasks, base_params, self.env_type, sink)
+        self.worker.profile_name = self.main_window.menu_manager.take_profile_request(f"{self.env_type}_batch")
         self.worker.progress_updated.connect(self.on_progress_updated)
         self.worker.task_completed.connect(self.on_task_completed)
         self.worker.all_completed.connect(self.on_all_completed)
@@ -426,16 +476,22 @@ class BatchSimulationDialog(QDialog):
     def on_task_completed(self, task_index, result):
         if task_index < len(self.tasks):
             self.tasks[task_index]['status'] = 'completed'
-            self.results.append(result)
+            self.task_results[task_index] = result
             self.update_queue_table()
 
     def on_all_completed(self):
         self.run_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.export_btn.setEnabled(True)
+        self.export_fig_btn.setEnabled(bool(self.task_results))
+        # 保存到窗口上，可随项目一起保存，重新打开批处理对话框时恢复
+        self.main_window.batch_outputs = {'tasks': self.tasks, 'task_results': self.task_results}
         self.status_label.setText('所有任务已完成')
         self.progress_bar.setValue(100)
-        QMessageBox.information(self, '完成', f'批处理仿真完成，共完成 {len(self.results)} 个任务')
+        QMessageBox.information(self, '完成', f'批处理仿真完成，共完成 {len(self.task_results)} 个任务')
+        if self.worker.profile is not None:
+            from gui.profile_dialog import ProfileReportDialog
+            ProfileReportDialog(self.worker.profile, self).exec_()
 
     def on_error_occurred(self, task_index, error_msg):
         if task_index < len(self.tasks):
@@ -444,49 +500,86 @@ class BatchSimulationDialog(QDialog):
         QMessageBox.critical(self, '错误', f'任务 {task_index + 1} 执行失败: {error_msg}')
 
     def export_results(self):
-        if not self.results:
+        if not self.task_results:
             QMessageBox.warning(self, '警告', '没有可导出的结果')
             return
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"batch_simulation_{self.env_type}_{timestamp}.txt"
+        default_filename = f"batch_simulation_{self.env_type}_{timestamp}.csv"
         
-        filepath, _ = QFileDialog.getSaveFileName(
+        filepath, selected_filter = QFileDialog.getSaveFileName(
             self,
             "保存批处理结果",
             default_filename,
-            "Text Files (*.txt);;All Files (*.*)"
+            EXPORT_FILTERS
         )
         
         if not filepath:
             return
-        
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write("=" * 80 + "\n")
-                f.write("批处理仿真结果\n")
-                f.write("=" * 80 + "\n")
-                f.write(f"导出时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"环境类型: {self.env_type}\n")
-                f.write(f"任务总数: {len(self.results)}\n")
-                f.write("=" * 80 + "\n\n")
-                
-                for i, (task, result) in enumerate(zip(self.tasks, self.results)):
-                    f.write(f"任务 {i + 1}:\n")
-                    f.write("-" * 40 + "\n")
-                    f.write(f"类型: {task['type']}\n")
-                    f.write(f"参数: {task['param_name']} = {task['value']:.2f}\n")
-                    f.write(f"状态: {task['status']}\n")
-                    f.write(f"结果:\n")
-                    f.write(f"  有效探测距离: {result.get('eff_range', 0):.2f} m\n")
-                    f.write(f"  消光系数: {result.get('alpha', 0) * 1000:.4f} 1/km\n")
-                    f.write(f"  后向散射系数: {result.get('beta', 0) * 1000:.4f} 1/km\n")
-                    f.write(f"  回波功率: {result.get('echo_power', 0):.6e} W\n")
-                    f.write("\n")
-            
-            QMessageBox.information(self, '导出成功', f'结果已保存到:\n{filepath}')
-        except Exception as e:
-            QMessageBox.critical(self, '导出失败', f'保存文件失败: {str(e)}')
+        if export_format(filepath) is None:
+            filepath += selected_filter.split('*')[1].split()[0].rstrip(')')
+
+        metadata = export_metadata(self.env_type, f"批处理仿真结果，共 {len(self.task_results)} 个任务")
+        # 任务名和参数在界面线程中取出，导出期间重新生成任务列表不影响导出；
+        # 导出器逐个任务写出，不需要同时持有所有结果的展开数据
+        entries = [(self.task_name(index), dict(self.tasks[index].get('params', {})),
+                    self.task_results[index])
+                   for index in sorted(self.task_results)]
+        worker = DataExportWorker(filepath, entries, metadata, total=len(self.task_results))
+        start_export(self, worker, '正在导出批处理结果...', filepath)
+
+    def reset_results(self):
+        """重新生成任务后旧结果的任务序号不再对应"""
+        self.task_results = {}
+        self.export_btn.setEnabled(False)
+        self.export_fig_btn.setEnabled(False)
+
+    def restore_outputs(self):
+        """恢复上次运行（或打开的项目中）的任务和结果"""
+        outputs = getattr(self.main_window, 'batch_outputs', None)
+        if not outputs:
+            return
+        self.tasks = outputs['tasks']
+        self.task_results = outputs['task_results']
+        self.update_queue_table()
+        self.export_btn.setEnabled(bool(self.task_results))
+        self.export_fig_btn.setEnabled(bool(self.task_results))
+
+    def select_sink_path(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath, _ = QFileDialog.getSaveFileName(
+            self,
+            "结果汇总文件",
+            f"batch_{self.env_type}_{timestamp}.csv",
+            "CSV 表格 (*.csv)"
+        )
+        if filepath:
+            if not filepath.lower().endswith('.csv'):
+                filepath += '.csv'
+            self.sink_path = filepath
+            self.sink_path_label.setText(filepath)
+            self.sink_check.setChecked(True)
+
+    def task_name(self, index):
+        task = self.tasks[index]
+        return f"task_{index + 1:03d}_{task['param_key']}_{task['value']:g}"
+
+    def export_figures(self):
+        """每个完成的任务导出一组图表，各自保存在单独的子目录中"""
+        if not self.task_results:
+            QMessageBox.warning(self, '警告', '没有可导出的结果')
+            return
+        target = ask_bulk_export_target(self)
+        if target is None:
+            return
+        directory, fmt = target
+
+        entries = []
+        for index in sorted(self.task_results):
+            entries.append((self.task_name(index), self.task_results[index],
+                            self.tasks[index].get('sensitivity_watts')))
+        jobs = build_bulk_jobs(entries, directory, fmt)
+        start_export(self, FigureExportWorker(jobs), f'正在导出 {len(entries)} 个任务的图表...', directory)
 
 
 class BatchSimulationWorker(QThread):
@@ -495,41 +588,66 @@ class BatchSimulationWorker(QThread):
     all_completed = pyqtSignal()
     error_occurred = pyqtSignal(int, str)
 
-    def __init__(self, tasks, main_window, env_type):
+    def __init__(self, tasks, base_params, env_type, sink=None):
         super().__init__()
         self.tasks = tasks
-        self.main_window = main_window
+        self.base_params = base_params
         self.env_type = env_type
+        self.sink = sink  # 每个任务结束时写入一行的结果汇总
         self.running = True
+        self.profile_name = None  # 设置后整个批处理进行深度分析（见 utils/profiling.py）
+        self.profile = None
 
     def run(self):
-        for i, task in enumerate(self.tasks):
-            if not self.running:
-                break
-            
-            task['status'] = 'running'
-            self.progress_updated.emit(i, len(self.tasks))
-            
-            try:
-                result = self.execute_task(task)
-                self.task_completed.emit(i, result)
-            except Exception as e:
-                self.error_occurred.emit(i, str(e))
-        
+        with profile_if(self.profile_name) as capture:
+            self.run_tasks()
+        if capture is not None:
+            self.profile = capture.summary
         self.all_completed.emit()
 
+    def run_tasks(self):
+        try:
+            for i, task in enumerate(self.tasks):
+                if not self.running:
+                    break
+
+                task['status'] = 'running'
+                task.pop('cached', None)
+                self.progress_updated.emit(i, len(self.tasks))
+
+                try:
+                    result = self.execute_task(task)
+                except Exception as e:
+                    self._sink_write(self.sink.append_failure if self.sink else None,
+                                     i, task, task.get('params'), e)
+                    self.error_occurred.emit(i, str(e))
+                    continue
+                self._sink_write(self.sink.append if self.sink else None,
+                                 i, task, task['params'], result)
+                self.task_completed.emit(i, result)
+        finally:
+            if self.sink is not None:
+                self.sink.close()
+
+    def _sink_write(self, write, *args):
+        if write is None:
+            return
+        try:
+            write(*args)
+        except Exception as e:
+            print(f"写入结果汇总失败: {e}")
+
     def execute_task(self, task):
-        params = self.main_window.left_panel.get_parameters()
+        params = dict(self.base_params)
         params[task['param_key']] = task['value']
-        
-        if self.env_type == 'rain':
-            from core.simulation_core import RainLidarSimulationCore
-            sim = RainLidarSimulationCore(params)
-        else:
-            from core.haze_core import HazeLidarSimulationCore
-            sim = HazeLidarSimulationCore(params)
-        
-        result = sim.run_simulation()
+        task['params'] = params
+
+        # 批量结果用于比较，不使用近似缓存；扫描频率时由 prepare_params 重新计算波长
+        result, info = run_simulation(self.env_type, params, approximate=False)
+        task['params'] = info['params']
+        task['sensitivity_watts'] = info['params']['sensitivity_watts']
+        if info['from_cache']:
+            task['cached'] = True
         return result
 
     def stop(self):
@@ -0,0 +1,68 @@
+# gui/export_progress.py
+# 后台导出任务的进度对话框：不阻塞窗口，可随时取消
+import os
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QProgressDialog, QMessageBox, QInputDialog, QFileDialog
+
+# 正在运行的导出线程，保持引用避免线程对象在运行中被回收
+running_exports = []
+
+
+def start_export(parent, worker, label, target):
+    """启动导出线程并显示进度
+
+    worker 需提供 progress(int, int)、export_finished(list, list) 信号和 cancel() 方法；
+    target 为完成提示中显示的保存位置。
+    """
+    dialog = QProgressDialog(label, '取消', 0, 0, parent)
+    dialog.setWindowTitle('导出')
+    dialog.setWindowModality(Qt.NonModal)
+    dialog.setMinimumDuration(300)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+
+    def on_progress(done, total):
+        dialog.setMaximum(total)
+        dialog.setValue(done)
+        dialog.setLabelText(f"{label} ({done}/{total})")
+
+    def on_finished(saved, errors):
+        dialog.close()
+        running_exports.remove(worker)
+        if worker.cancelled:
+            QMessageBox.information(parent, '导出已取消', f"已导出 {len(saved)} 个文件到:\n{target}")
+        elif errors:
+            details = '\n'.join(errors[:5])
+            QMessageBox.warning(parent, '导出完成',
+                                f"成功导出 {len(saved)} 个文件，{len(errors)} 个失败:\n{details}")
+        elif saved:
+            QMessageBox.information(parent, '导出成功', f"成功导出 {len(saved)} 个文件到:\n{target}")
+        else:
+            QMessageBox.warning(parent, '导出失败', '没有导出任何文件')
+
+    worker.progress.connect(on_progress)
+    worker.export_finished.connect(on_finished)
+    dialog.canceled.connect(worker.cancel)
+    running_exports.append(worker)
+    worker.start()
+    return worker
+
+
+def cancel_running_exports(wait_ms=5000):
+    """关闭程序前取消并等待正在进行的导出"""
+    for worker in list(running_exports):
+        worker.cancel()
+        worker.wait(wait_ms)
+
+
+def ask_bulk_export_target(parent, title='批量导出图表'):
+    """选择批量导出的图片格式和目录，取消时返回 None"""
+    formats = ['png', 'jpg', 'pdf', 'svg']
+    fmt, ok = QInputDialog.getItem(parent, title, '图片格式:', [f.upper() for f in formats], 0, False)
+    if not ok:
+        return None
+    directory = QFileDialog.getExistingDirectory(parent, '选择保存目录', os.path.expanduser("~"))
+    if not directory:
+        return None
+    return directory, fmt.lower()
@@ -1,9 +1,102 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget, 
-                             QListWidgetItem, QPushButton, QLabel, QFrame, QMessageBox,
-                             QToolTip, QScrollArea)
-from PyQt5.QtCore import Qt, pyqtSignal, QPoint
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListView,
+                             QAbstractItemView, QPushButton, QLabel, QFrame, QMessageBox,
+                             QToolTip, QScrollArea, QMenu)
+from PyQt5.QtCore import Qt, pyqtSignal, QPoint, QAbstractListModel, QModelIndex
 from PyQt5.QtGui import QFont
 
+from gui.export_progress import start_export, ask_bulk_export_target
+from utils.figure_export import FigureExportWorker, build_bulk_jobs, record_export_entries
+
+
+class HistoryListModel(QAbstractListModel):
+    """历史记录列表模型
+
+    只保存记录引用（最新的在前），行数据按可见范围分批取出，
+    新增/删除记录时增量更新，不重建整个列表。
+    """
+    FETCH_BATCH = 200
+
+    def __init__(self, history_manager, parent=None):
+        super().__init__(parent)
+        self.history_manager = history_manager
+        self.records = []
+        self.loaded_count = 0
+        self._rows = {}  # 记录 id -> 行号缓存，增删后失效
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.loaded_count
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.loaded_count < len(self.records)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_BATCH, len(self.records) - self.loaded_count)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded_count, self.loaded_count + count - 1)
+        self.loaded_count += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded_count:
+            return None
+        record = self.records[index.row()]
+        if role == Qt.DisplayRole:
+            summary = self.history_manager.get_summary(record)
+            pin_mark = "[固定] " if record.get('pinned') else ""
+            return f"{pin_mark}#{record['id']} - {record['timestamp']}\n{summary}"
+        if role == Qt.UserRole:
+            return record
+        return None
+
+    def set_records(self, records):
+        """整体替换数据（仅在切换环境类型等场景使用）"""
+        self.beginResetModel()
+        self.records = list(reversed(records))
+        self.loaded_count = min(self.FETCH_BATCH, len(self.records))
+        self._rows = {}
+        self.endResetModel()
+
+    def prepend_record(self, record):
+        """新记录插入到第一行"""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.records.insert(0, record)
+        self.loaded_count += 1
+        self._rows = {}
+        self.endInsertRows()
+
+    def row_of(self, record_id):
+        if not self._rows:
+            self._rows = {r['id']: i for i, r in enumerate(self.records)}
+        return self._rows.get(record_id, -1)
+
+    def remove_records(self, record_ids):
+        """按 id 删除若干行，从后往前删除以保持行号有效"""
+        rows = sorted((self.row_of(rid) for rid in record_ids), reverse=True)
+        for row in rows:
+            if row < 0:
+                continue
+            if row < self.loaded_count:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.records[row]
+                self.loaded_count -= 1
+                self.endRemoveRows()
+            else:
+                del self.records[row]
+        self._rows = {}
+
+    def refresh_record(self, record_id):
+        row = self.row_of(record_id)
+        if 0 <= row < self.loaded_count:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
 
 class HistoryPanel(QWidget):
     record_selected = pyqtSignal(dict)
@@ -15,7 +108,14 @@ class HistoryPanel(QWidget):
         self.env_type = env_type
         self.selected_records = []
         self.tooltip_widget = None
+        self.hovered_record_id = None
+        self.tooltip_cache = {}  # 记录 id -> 提示框 HTML
         self.initUI()
+        self.history_manager.record_added.connect(self.on_record_added)
+        # 后台保留策略淘汰记录后只移除对应的行
+        self.history_manager.records_evicted.connect(self.on_records_removed)
+        # 历史文件在后台读取，读取完成后重建列表
+        self.history_manager.history_loaded.connect(self.refresh_list)
 
     def initUI(self):
         layout = QVBoxLayout(self)
@@ -27,26 +127,32 @@ class HistoryPanel(QWidget):
         header.setStyleSheet("color: #2c3e50; padding: 5px;")
         layout.addWidget(header)
 
-        self.list_widget = QListWidget()
-        self.list_widget.setSelectionMode(QListWidget.ExtendedSelection)
+        self.model = HistoryListModel(self.history_manager, self)
+        self.list_widget = QListView()
+        self.list_widget.setModel(self.model)
+        self.list_widget.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        # 所有行高度一致，滚动时不需要逐行计算尺寸
+        self.list_widget.setUniformItemSizes(True)
         self.list_widget.setMouseTracking(True)
         self.list_widget.viewport().installEventFilter(self)
+        self.list_widget.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.list_widget.customContextMenuRequested.connect(self.show_context_menu)
         self.list_widget.setStyleSheet("""
-            QListWidget {
+            QListView {
                 border: 1px solid #bdc3c7;
                 border-radius: 5px;
                 background-color: white;
                 font-size: 9px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
                 border-bottom: 1px solid #ecf0f1;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #3498db;
                 color: white;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: #d5dbdb;
             }
         """)
@@ -116,29 +222,36 @@ class HistoryPanel(QWidget):
 
         layout.addLayout(button_layout)
 
-        self.list_widget.itemSelectionChanged.connect(self.on_selection_changed)
+        self.list_widget.selectionModel().selectionChanged.connect(self.on_selection_changed)
 
     def refresh_list(self, env_type=None):
-        self.list_widget.clear()
+        """完整重建列表（初始化时调用，运行结束后请使用增量更新）"""
+        if env_type:
+            self.env_type = env_type
         records = self.history_manager.get_all_records()
-        
-        current_env_type = env_type or self.env_type
-        if current_env_type:
-            records = [r for r in records if r['env_type'] == current_env_type]
+        if self.env_type:
+            records = [r for r in records if r['env_type'] == self.env_type]
+        self.model.set_records(records)
+        self.on_selection_changed()
 
-        for record in reversed(records):
-            summary = self.history_manager.get_summary(record)
-            item = QListWidgetItem(f"#{record['id']} - {record['timestamp']}\n{summary}")
-            item.setData(Qt.UserRole, record)
-            self.list_widget.addItem(item)
+    def on_record_added(self, record):
+        if self.env_type and record['env_type'] != self.env_type:
+            return
+        self.model.prepend_record(record)
 
-    def on_selection_changed(self):
-        selected_items = self.list_widget.selectedItems()
-        self.selected_records = [item.data(Qt.UserRole) for item in selected_items]
+    def on_records_removed(self, record_ids):
+        for record_id in record_ids:
+            self.tooltip_cache.pop(record_id, None)
+        self.model.remove_records(record_ids)
+        self.on_selection_changed()
+
+    def on_selection_changed(self, *args):
+        indexes = self.list_widget.selectionModel().selectedIndexes()
+        self.selected_records = [index.data(Qt.UserRole) for index in indexes]
         
-        has_selection = len(selected_items) > 0
-        self.view_btn.setEnabled(len(selected_items) == 1)
-        self.compare_btn.setEnabled(len(selected_items) >= 2)
+        has_selection = len(indexes) > 0
+        self.view_btn.setEnabled(len(indexes) == 1)
+        self.compare_btn.setEnabled(len(indexes) >= 2)
         self.delete_btn.setEnabled(has_selection)
 
     def on_view_clicked(self):
@@ -161,9 +274,38 @@ class HistoryPanel(QWidget):
         )
 
         if reply == QMessageBox.Yes:
-            for record in self.selected_records:
-                self.history_manager.delete_record(record['id'])
-            self.refresh_list()
+            record_ids = [record['id'] for record in self.selected_records]
+            self.history_manager.delete_records(record_ids)
+            self.on_records_removed(record_ids)
+
+    def show_context_menu(self, pos):
+        index = self.list_widget.indexAt(pos)
+        if not index.isValid():
+            return
+        record = index.data(Qt.UserRole)
+
+        menu = QMenu(self)
+        if record.get('pinned'):
+            pin_action = menu.addAction('取消固定')
+        else:
+            pin_action = menu.addAction('固定（不被自动清理）')
+        records = self.selected_records if record in self.selected_records else [record]
+        export_action = menu.addAction(f'导出图表（{len(records)} 条记录）...')
+        action = menu.exec_(self.list_widget.viewport().mapToGlobal(pos))
+        if action == pin_action:
+            self.history_manager.set_pinned(record['id'], not record.get('pinned'))
+            self.model.refresh_record(record['id'])
+        elif action == export_action:
+            self.export_record_figures(records)
+
+    def export_record_figures(self, records):
+        """每条记录导出一组图表，各自保存在单独的子目录中"""
+        target = ask_bulk_export_target(self)
+        if target is None:
+            return
+        directory, fmt = target
+        jobs = build_bulk_jobs(record_export_entries(records), directory, fmt)
+        start_export(self, FigureExportWorker(jobs), f'正在导出 {len(records)} 条记录的图表...', directory)
 
     def eventFilter(self, obj, event):
         if obj == self.list_widget.viewport():
@@ -174,35 +316,40 @@ class HistoryPanel(QWidget):
         return super().eventFilter(obj, event)
 
     def on_mouse_move(self, event):
-        item = self.list_widget.itemAt(event.pos())
-        if item:
-            record = item.data(Qt.UserRole)
-            if record:
-                self.show_tooltip(event.globalPos(), record)
-            else:
-                self.hide_tooltip()
+        index = self.list_widget.indexAt(event.pos())
+        record = index.data(Qt.UserRole) if index.isValid() else None
+        if record:
+            self.show_tooltip(event.globalPos(), record)
         else:
             self.hide_tooltip()
 
     def show_tooltip(self, pos, record):
-        if self.tooltip_widget:
-            self.tooltip_widget.hide()
-            self.tooltip_widget.deleteLater()
+        if self.tooltip_widget is None:
+            self.tooltip_widget = RecordTooltip(self)
+
+        # 鼠标仍在同一条记录上时只移动提示框，不重建内容
+        if self.hovered_record_id != record['id']:
+            content = self.tooltip_cache.get(record['id'])
+            if content is None:
+                content = RecordTooltip.build_content(record)
+                self.tooltip_cache[record['id']] = content
+            self.tooltip_widget.setText(content)
+            self.tooltip_widget.adjustSize()
+            self.hovered_record_id = record['id']
 
-        self.tooltip_widget = RecordTooltip(record, self)
         self.tooltip_widget.move(pos.x() + 15, pos.y() + 15)
-        self.tooltip_widget.show()
+        if not self.tooltip_widget.isVisible():
+            self.tooltip_widget.show()
 
     def hide_tooltip(self):
         if self.tooltip_widget:
             self.tooltip_widget.hide()
-            self.tooltip_widget = None
+        self.hovered_record_id = None
 
 
 class RecordTooltip(QLabel):
-    def __init__(self, record, parent=None):
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.record = record
         self.initUI()
 
     def initUI(self):
@@ -218,12 +365,8 @@ class RecordTooltip(QLabel):
             }
         """)
 
-        content = self._build_tooltip_content()
-        self.setText(content)
-        self.adjustSize()
-
-    def _build_tooltip_content(self):
-        record = self.record
+    @classmethod
+    def build_content(cls, record):
         html = f"<div style='font-weight: bold; margin-bottom: 8px;'>记录 #{record['id']} - {record['timestamp']}</div>"
         
         # 环境参数
@@ -251,17 +394,18 @@ class RecordTooltip(QLabel):
         if 'params' in record:
             params = record['params']
             html += "<div style='margin-top: 10px; font-weight: bold;'>系统参数:</div>"
-            html += self._format_system_params(params)
+            html += cls._format_system_params(params)
 
         # 系统输出
         if 'results' in record:
             results = record['results']
             html += "<div style='margin-top: 10px; font-weight: bold;'>系统输出:</div>"
-            html += self._format_system_output(results)
+            html += cls._format_system_output(results)
 
         return html
 
-    def _format_system_params(self, params):
+    @staticmethod
+    def _format_system_params(params):
         html = "<div style='margin-left: 10px;'>"
         
         # 系统参数（与参数设置界面中的标签对应）
@@ -289,7 +433,8 @@ class RecordTooltip(QLabel):
         html += "</div>"
         return html
 
-    def _format_system_output(self, results):
+    @staticmethod
+    def _format_system_output(results):
         html = "<div style='margin-left: 10px;'>"
         
         # 系统输出参数（与参数设置界面中的标签对应）
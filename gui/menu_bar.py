@@ -1,7 +1,6 @@
 # gui/menu_bar.py
 import os
 from datetime import datetime
-import numpy as np
 import json
 from PyQt5.QtCore import QThread, pyqtSignal
 
@@ -15,6 +14,14 @@ import matplotlib.pyplot as plt
 import matplotlib
 from PyQt5.QtCore import QTimer
 
+from gui.export_progress import start_export
+from utils.figure_export import FigureExportWorker, build_view_jobs
+from utils.figure_render import CHART_CONFIG, chart_snapshot
+from utils.export_utils import (DataExportWorker, EXPORT_FILTERS, export_format,
+                                export_metadata)
+from utils.project_file import ProjectSaveWorker, build_project, open_project_file
+from utils.settings_manager import SettingsManager
+
 
 class MenuBarManager:
     """菜单栏管理器"""
@@ -171,6 +178,14 @@ class MenuBarManager:
         batch_sim_action.triggered.connect(self.batch_simulation)
         run_menu.addAction(batch_sim_action)
 
+        run_menu.addSeparator()
+
+        # 深度分析：下一次单次仿真或批处理记录函数耗时和内存分配
+        self.profile_action = QAction('分析下一次运行', self.main_window)
+        self.profile_action.setCheckable(True)
+        self.profile_action.setToolTip('用 cProfile 和 tracemalloc 记录下一次仿真，结果保存在 data/profiles')
+        run_menu.addAction(self.profile_action)
+
     def create_plot_menu(self):
         """创建绘图菜单"""
         plot_menu = self.menubar.addMenu('绘图')
@@ -320,14 +335,57 @@ class MenuBarManager:
 
         if file_path:
             try:
-                # 这里可以添加实际的项目文件加载逻辑
-                QMessageBox.information(self.main_window, "打开项目", f"已打开项目文件: {file_path}")
-                # TODO: 实际加载项目文件的实现
+                # 只读取目录和 JSON，数组在绘图/导出时才按需映射
+                project = open_project_file(file_path)
             except Exception as e:
                 QMessageBox.critical(self.main_window, "错误", f"打开文件失败: {str(e)}")
+                return
+
+            env_type = getattr(self.main_window, 'env_type', 'rain')
+            if project.env_type == env_type:
+                self.load_project(self.main_window, project)
+            else:
+                # 环境类型不同时在对应类型的新窗口中打开
+                QTimer.singleShot(0, lambda: self._open_project_in_new_window(project))
+
+    def _open_project_in_new_window(self, project):
+        self._create_new_window_safely(project.env_type)
+        new_window = self.windows[-1]
+        if getattr(new_window, 'env_type', None) == project.env_type:
+            new_window.menu_manager.load_project(new_window, project)
+
+    def load_project(self, window, project):
+        """把项目内容载入到窗口"""
+        try:
+            window.menu_manager._apply_parameters(project.params)
+            plot_settings = project.settings.get('plot')
+            if plot_settings:
+                SettingsManager.instance().update_section('plot', plot_settings)
+
+            results = project.results()
+            if results is not None:
+                window.simulation_results = results
+                window.menu_manager.set_simulation_results(results)
+                window.left_panel.update_outputs(results)
+                window.right_panel.update_plots(results, project.params.get('sensitivity_watts', 1e-12))
+
+            tasks, task_results = project.batch()
+            window.batch_outputs = {'tasks': tasks, 'task_results': task_results} if tasks else None
+            window.project_path = project.path
+            window.status_label.setText(f"已打开项目: {os.path.basename(project.path)}")
+        except Exception as e:
+            QMessageBox.critical(window, "错误", f"加载项目失败: {str(e)}")
 
     def save_project(self):
-        """保存项目"""
+        """保存项目（已打开的项目直接保存到原文件）"""
+        file_path = getattr(self.main_window, 'project_path', None)
+        if not file_path:
+            self.save_as_project()
+            return
+        self._save_project_to(file_path)
+
+    def save_as_project(self):
+        """另存为项目"""
         file_path, _ = QFileDialog.getSaveFileName(
             self.main_window,
             "保存项目",
@@ -336,19 +394,32 @@ class MenuBarManager:
         )
 
         if file_path:
-            try:
-                # 这里可以添加实际的项目文件保存逻辑
-                QMessageBox.information(self.main_window, "保存项目", f"项目已保存到: {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self.main_window, "错误", f"保存文件失败: {str(e)}")
-
-    def save_as_project(self):
-        """另存为项目"""
-        self.save_project()
+            if not file_path.lower().endswith('.sim'):
+                file_path += '.sim'
+            self._save_project_to(file_path)
+
+    def _save_project_to(self, file_path):
+        params = dict(self.main_window.left_panel.get_parameters())
+        # 与仿真线程相同的换算，打开项目时用于绘制噪声阈值
+        params['sensitivity_watts'] = 10 ** ((params['sensitivity'] - 30) / 10)
+        batch_outputs = getattr(self.main_window, 'batch_outputs', None) or {}
+        settings = SettingsManager.instance()
+        project = build_project(
+            getattr(self.main_window, 'env_type', 'rain'),
+            params,
+            results=self.main_window.simulation_results,
+            batch_tasks=batch_outputs.get('tasks'),
+            batch_results=batch_outputs.get('task_results'),
+            settings={'plot': settings.get('plot')},
+        )
+        worker = ProjectSaveWorker(file_path, project)
+        worker.export_finished.connect(
+            lambda saved, errors: setattr(self.main_window, 'project_path', file_path) if saved else None)
+        start_export(self.main_window, worker, '正在保存项目...', file_path)
 
     def export_figures(self):
         """导出图表"""
-        if not self.main_window.simulation_results:
+        if not self.has_figures():
             QMessageBox.warning(self.main_window, "警告", "请先运行仿真后再导出图表")
             return
 
@@ -454,6 +525,7 @@ class MenuBarManager:
         # 获取选择的图表
         selected_charts = []
         chart_mapping = {
+            "particle_distribution": "粒子谱分布",
             "backscatter": "后向散射回波强度",
             "transmittance": "双程路径透过率",
             "angular_scatter": "仰角-散射强度 (对数)",
@@ -468,189 +540,60 @@ class MenuBarManager:
             QMessageBox.warning(dialog, "警告", "请至少选择一个图表")
             return
 
-        # 导出图表
-        success_count = 0
+        chart_names = [chart_mapping[chart_id] for chart_id in selected_charts]
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # 界面线程只复制数据快照，绘制和保存在后台进行
+        jobs = build_view_jobs(self.figure_export_snapshot(chart_names), save_dir, selected_format,
+                               name_pattern=f"chart_{{chart_id}}_{timestamp}")
+        dialog.accept()
+        start_export(self.main_window, FigureExportWorker(jobs), '正在导出图表...', save_dir)
 
-        for chart_id in selected_charts:
-            chart_name = chart_mapping[chart_id]
-            if hasattr(self.main_window, 'right_panel') and chart_name in self.main_window.right_panel.figures:
-                filename = f"chart_{chart_id}_{timestamp}.{selected_format}"
-                filepath = os.path.join(save_dir, filename)
-
-                try:
-                    self.main_window.right_panel.figures[chart_name].savefig(
-                        filepath,
-                        dpi=300,
-                        bbox_inches='tight',
-                        facecolor='white'
-                    )
-                    success_count += 1
-                except Exception as e:
-                    print(f"保存图表 {chart_name} 失败: {e}")
+    def _panel_has_figures(self):
+        """结果面板是否正在显示单次结果或对比图"""
+        right_panel = getattr(self.main_window, 'right_panel', None)
+        return right_panel is not None and bool(right_panel.last_results or right_panel.mode == 'compare')
 
-        dialog.accept()
+    def has_figures(self):
+        return self._panel_has_figures() or bool(self.main_window.simulation_results)
 
-        if success_count > 0:
-            QMessageBox.information(
-                self.main_window,
-                "导出成功",
-                f"成功导出 {success_count} 个图表到:\n{save_dir}"
-            )
-        else:
-            QMessageBox.warning(self.main_window, "导出失败", "图表导出失败")
+    def figure_export_snapshot(self, titles=None):
+        """界面上当前显示的图表快照（单次结果、叠加对比或统计对比，含缩放后的坐标轴范围）"""
+        if self._panel_has_figures():
+            return self.main_window.right_panel.export_views(titles)
+        results = self.main_window.simulation_results or {}
+        return [chart_snapshot(title, results) for title in titles or CHART_CONFIG]
 
     def export_data(self):
-        """导出数据"""
+        """导出完整分辨率的仿真数据"""
         if not self.main_window.simulation_results:
             QMessageBox.warning(self.main_window, "警告", "请先运行仿真后再导出数据")
             return
 
-        # 根据环境类型设置不同的标题
         env_type = getattr(self.main_window, 'env_type', 'rain')
-        env_name = "降雨" if env_type == 'rain' else "雾霾"
-
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         default_filename = f"lidar_simulation_{env_type}_{timestamp}.txt"
 
-        filepath, _ = QFileDialog.getSaveFileName(
+        filepath, selected_filter = QFileDialog.getSaveFileName(
             self.main_window,
             "保存数据文件",
             os.path.join(os.path.expanduser("~"), default_filename),
-            "Text Files (*.txt);;All Files (*.*)"
+            EXPORT_FILTERS
         )
 
         if not filepath:
             return
 
-        if not filepath.lower().endswith('.txt'):
-            filepath += '.txt'
-
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                # 写入文件头部信息
-                f.write("=" * 60 + "\n")
-                f.write(f"{env_name}环境下激光散射-传输建模与仿真数据\n")  # 更新标题
-                f.write("=" * 60 + "\n")
-                f.write(f"导出时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 60 + "\n\n")
-
-                # 1. 写入输入参数
-                f.write("一、输入参数\n")
-                f.write("-" * 40 + "\n")
-
-                # 获取参数
-                params = self.main_window.left_panel.get_parameters()
-
-                # 根据环境类型写入不同的环境参数
-                if env_type == 'rain':
-                    f.write("[降雨环境]\n")
-                    f.write(f"  降雨率: {params['rain_rate']} mm/h\n")
-                    f.write(f"  温度: {params['temperature']} K\n")
-                    f.write(f"  雨滴谱: Marshall-Palmer\n\n")
-                else:
-                    f.write("[雾霾环境]\n")
-                    f.write(f"  能见度: {params['visibility']} km\n")
-                    f.write(f"  折射率: {params['ref_real']} + j{params['ref_imag']}\n")
-                    f.write(f"  气溶胶谱: Junge分布\n\n")
-
-                # 系统参数
-                f.write("[系统参数]\n")
-                params_mapping = {
-                    'avg_power': '发射功率',
-                    'frequency': '工作频率',
-                    'rep_rate': '重复频率',
-                    'pulse_width': '脉宽',
-                    'aperture_dia': '接收口径',
-                    'system_efficiency': '系统效率',
-                    'max_range': '探测距离',
-                    'sensitivity': '灵敏度'
-                }
-
-                for key, display_name in params_mapping.items():
-                    value = params.get(key, 'N/A')
-                    unit = ""
-                    if key == 'avg_power':
-                        unit = " W"
-                    elif key == 'frequency':
-                        unit = " GHz"
-                    elif key == 'rep_rate':
-                        unit = " kHz"
-                    elif key == 'pulse_width':
-                        unit = " ns"
-                    elif key == 'aperture_dia':
-                        unit = " mm"
-                    elif key == 'max_range':
-                        unit = " km"
-                    elif key == 'sensitivity':
-                        unit = " dBm"
-
-                    f.write(f"  {display_name}: {value}{unit}\n")
-
-                f.write("\n" + "=" * 60 + "\n\n")
-
-                # 2. 写入输出结果
-                f.write("二、仿真结果\n")
-                f.write("-" * 40 + "\n")
-
-                output_widgets = self.main_window.left_panel.output_widgets
-                f.write(f"有效探测距离: {output_widgets['eff_range'].text()} m\n")
-                f.write(f"消光系数: {output_widgets['alpha'].text()} 1/km\n")
-                f.write(f"后向散射系数: {output_widgets['beta'].text()} 1/(km\n")
-                f.write(f"回波功率: {output_widgets['echo_power'].text()} W\n\n")
-
-                # 3. 写入详细数据
-                results = self.main_window.simulation_results
-                if results:
-                    f.write("三、详细数据\n")
-                    f.write("-" * 40 + "\n")
-
-                    f.write("[回波强度数据 - 关键点]\n")
-                    r_data = results['r']
-                    p_data = results['p_received']
-
-                    f.write("距离(m)     功率(W)\n")
-                    f.write("-" * 25 + "\n")
-
-                    # 前5个点
-                    for i in range(min(5, len(r_data))):
-                        f.write(f"{r_data[i]:<10.2f} {p_data[i]:<10.2e}\n")
-
-                    f.write("...\n")
-
-                    # 最后5个点
-                    for i in range(max(0, len(r_data) - 5), len(r_data)):
-                        f.write(f"{r_data[i]:<10.2f} {p_data[i]:<10.2e}\n")
-
-                    f.write("\n")
-
-                    # 写入透过率数据
-                    f.write("[透过率数据 - 关键点]\n")
-                    trans_data = results['trans']
-                    f.write("距离(m)     透过率\n")
-                    f.write("-" * 25 + "\n")
-
-                    # 均匀采样10个点
-                    indices = np.linspace(0, len(r_data) - 1, 10, dtype=int)
-                    for idx in indices:
-                        f.write(f"{r_data[idx]:<10.2f} {trans_data[idx]:<10.4f}\n")
-
-                f.write("\n" + "=" * 60 + "\n")
-                f.write("数据导出完成\n")
-                f.write("=" * 60 + "\n")
+        # 未写扩展名时按所选文件类型补全
+        if export_format(filepath) is None:
+            extension = selected_filter.split('*')[1].split()[0].rstrip(')')
+            filepath += extension
 
-            QMessageBox.information(
-                self.main_window,
-                "导出成功",
-                f"数据已成功保存到:\n{filepath}"
-            )
-
-        except Exception as e:
-            QMessageBox.critical(
-                self.main_window,
-                "导出失败",
-                f"保存文件时发生错误:\n{str(e)}"
-            )
+        params = dict(self.main_window.left_panel.get_parameters())
+        env_name = "降雨" if env_type == 'rain' else "雾霾"
+        metadata = export_metadata(env_type, f"{env_name}环境下激光散射-传输建模与仿真数据")
+        entries = [('结果', params, self.main_window.simulation_results)]
+        worker = DataExportWorker(filepath, entries, metadata, total=1)
+        start_export(self.main_window, worker, '正在导出数据...', filepath)
 
     def reset_parameters(self):
         """重置参数"""
@@ -870,6 +813,13 @@ class MenuBarManager:
         if hasattr(self.main_window, 'on_run_clicked'):
             self.main_window.on_run_clicked()
 
+    def take_profile_request(self, name):
+        """勾选了"分析下一次运行"时返回分析名称并取消勾选，否则返回 None"""
+        if not self.profile_action.isChecked():
+            return None
+        self.profile_action.setChecked(False)
+        return name
+
     def stop_simulation(self):
         """停止仿真"""
         if hasattr(self.main_window, 'worker') and self.main_window.worker.isRunning():
@@ -881,8 +831,13 @@ class MenuBarManager:
 
     def simulation_settings(self):
         """仿真设置"""
-        QMessageBox.information(self.main_window, "仿真设置", "仿真参数设置对话框")
-        # TODO: 实际仿真设置对话框的实现
+        from gui.settings_dialog import SettingsDialog
+
+        dialog = SettingsDialog(self.main_window)
+        if dialog.exec_() == QDialog.Accepted:
+            # 立即按新的保留策略清理历史记录
+            if hasattr(self.main_window, 'history_manager'):
+                self.main_window.history_manager.save_history()
 
     def batch_simulation(self):
         """批处理仿真"""
@@ -904,6 +859,10 @@ class MenuBarManager:
         matplotlib.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'SimHei', 'Arial', 'sans-serif']
         matplotlib.rcParams['axes.unicode_minus'] = False
 
+        # 持久图元不会自动应用新样式，需要重建
+        if hasattr(self.main_window, 'right_panel'):
+            self.main_window.right_panel.refresh_style()
+
         # 刷新图表
         self.refresh_plots()
         QMessageBox.information(self.main_window, "图表样式", f"已设置为{style}样式")
@@ -911,11 +870,7 @@ class MenuBarManager:
     def toggle_grid(self, show):
         """切换网格显示"""
         if hasattr(self.main_window, 'right_panel'):
-            for ax in self.main_window.right_panel.axes.values():
-                ax.grid(show)
-
-            for canvas in self.main_window.right_panel.canvases.values():
-                canvas.draw_idle()
+            self.main_window.right_panel.set_grid(show)
 
     def save_current_plot(self):
         """保存当前图表"""
@@ -923,7 +878,7 @@ class MenuBarManager:
             QMessageBox.warning(self.main_window, "警告", "无法访问图表面板")
             return
         
-        if not hasattr(self.main_window.right_panel, 'figures') or not self.main_window.right_panel.figures:
+        if not self.has_figures() or not self.main_window.right_panel.chart_titles():
             QMessageBox.warning(self.main_window, "警告", "没有可保存的图表")
             return
         
@@ -939,7 +894,7 @@ class MenuBarManager:
         # 创建图表选择列表
         chart_checkboxes = {}
         chart_group = QVBoxLayout()
-        for title in self.main_window.right_panel.figures.keys():
+        for title in self.main_window.right_panel.chart_titles():
             checkbox = QCheckBox(title)
             checkbox.setChecked(True)
             chart_checkboxes[title] = checkbox
@@ -1011,18 +966,11 @@ class MenuBarManager:
                 )
                 
                 if file_path:
-                    try:
-                        self.main_window.right_panel.figures[selected_charts[0]].savefig(
-                            file_path, dpi=300, bbox_inches='tight', facecolor='white'
-                        )
-                        QMessageBox.information(
-                            self.main_window,
-                            "保存成功",
-                            f"图表已保存到:\n{file_path}"
-                        )
-                        dialog.accept()
-                    except Exception as e:
-                        QMessageBox.critical(self.main_window, "保存失败", f"保存图表失败: {str(e)}")
+                    job = build_view_jobs(self.figure_export_snapshot(selected_charts[:1]),
+                                          os.path.dirname(file_path), selected_format)[0]
+                    job['path'] = file_path
+                    dialog.accept()
+                    start_export(self.main_window, FigureExportWorker([job]), '正在保存图表...', file_path)
             else:
                 # 多个图表选择目录
                 directory = QFileDialog.getExistingDirectory(
@@ -1030,26 +978,13 @@ class MenuBarManager:
                     "选择保存目录",
                     os.path.expanduser("~")
                 )
-                
+
                 if directory:
-                    success_count = 0
-                    for title in selected_charts:
-                        try:
-                            file_path = os.path.join(directory, f"{title}_{timestamp}.{selected_format}")
-                            self.main_window.right_panel.figures[title].savefig(
-                                file_path, dpi=300, bbox_inches='tight', facecolor='white'
-                            )
-                            success_count += 1
-                        except Exception as e:
-                            print(f"保存图表 {title} 失败: {e}")
-                    
-                    QMessageBox.information(
-                        self.main_window,
-                        "保存完成",
-                        f"成功保存 {success_count}/{len(selected_charts)} 个图表到:\n{directory}"
-                    )
+                    jobs = build_view_jobs(self.figure_export_snapshot(selected_charts), directory,
+                                           selected_format, name_pattern=f"{{title}}_{timestamp}")
                     dialog.accept()
-        
+                    start_export(self.main_window, FigureExportWorker(jobs), '正在保存图表...', directory)
+
         save_btn.clicked.connect(on_save_clicked)
         cancel_btn.clicked.connect(dialog.reject)
         
@@ -1061,13 +996,13 @@ class MenuBarManager:
         matplotlib.rcParams['axes.unicode_minus'] = False
 
         if hasattr(self.main_window, 'right_panel'):
-            for canvas in self.main_window.right_panel.canvases.values():
-                canvas.draw()
+            self.main_window.right_panel.redraw()
 
     def data_interface_settings(self):
-        """数据接口设置"""
-        QMessageBox.information(self.main_window, "数据接口", "数据接口设置")
-        # TODO: 实际数据接口设置的实现
+        """数据接口设置（本地仿真服务的地址和并发限制）"""
+        from gui.api_dialog import ApiSettingsDialog
+
+        ApiSettingsDialog(self.main_window).exec_()
 
     def hardware_interface(self):
         """硬件接口"""
@@ -1075,9 +1010,10 @@ class MenuBarManager:
         # TODO: 实际硬件接口设置的实现
 
     def external_api(self):
-        """外部API"""
-        QMessageBox.information(self.main_window, "外部API", "外部API接口")
-        # TODO: 实际外部API设置的实现
+        """外部API：启动或停止本地仿真服务"""
+        from gui.api_dialog import ApiServiceDialog
+
+        ApiServiceDialog(self.main_window).exec_()
 
     def show_user_manual(self):
         """显示使用说明"""
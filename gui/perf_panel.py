@@ -0,0 +1,38 @@
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QAbstractItemView)
+
+from core.perf import perf_rows
+
+
+class PerformancePanel(QWidget):
+    """显示最近一次仿真（或选中的历史记录）各阶段耗时和计数"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel('尚无耗时数据')
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(['项目', '数值'])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        layout.addWidget(self.table)
+
+        hint = QLabel('耗时不含界面绘图；缓存结果只包含查询耗时。')
+        hint.setWordWrap(True)
+        hint.setStyleSheet("color: #7f8c8d;")
+        layout.addWidget(hint)
+
+    def update_perf(self, perf, title='最近一次仿真'):
+        rows = perf_rows(perf)
+        self.summary_label.setText(title if rows else f"{title}：没有耗时数据（旧版本记录）")
+        self.table.setRowCount(len(rows))
+        for row, (label, text) in enumerate(rows):
+            self.table.setItem(row, 0, QTableWidgetItem(label))
+            self.table.setItem(row, 1, QTableWidgetItem(text))
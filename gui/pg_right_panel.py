@@ -0,0 +1,287 @@
+# gui/pg_right_panel.py
+# 基于 pyqtgraph 的结果图表面板，与 RightPanel 接口一致，适合超长序列和频繁刷新
+import numpy as np
+import pyqtgraph as pg
+
+from PyQt5.QtWidgets import QWidget, QGridLayout, QFrame, QVBoxLayout
+
+from gui.right_panel import RightPanel
+from utils.ensemble_stats import ensemble_statistics
+from utils.figure_render import band_view, chart_snapshot, overlay_view
+from utils.settings_manager import SettingsManager
+
+
+class PgRightPanel(QWidget):
+    """pyqtgraph 结果面板
+
+    曲线使用持久的 PlotDataItem，更新时只调用 setData；
+    开启 peak 降采样和视图裁剪，缩放/平移时由 pyqtgraph 按像素自动抽取。
+    """
+    PLOT_CONFIG = RightPanel.PLOT_CONFIG
+    HOVER_FORMATS = RightPanel.HOVER_FORMATS
+
+    # matplotlib 格式串颜色 -> pyqtgraph 颜色
+    COLORS = {'b': '#1f77b4', 'g': '#2ca02c', 'r': '#d62728'}
+    COMPARE_COLORS = ['#3498db', '#e74c3c', '#27ae60', '#f39c12', '#9b59b6', '#1abc9c']
+    BAND_COLOR = (52, 152, 219)
+
+    def __init__(self):
+        super().__init__()
+        self.plots = {}         # 图表 -> PlotItem
+        self.widgets = {}       # 图表 -> PlotWidget
+        self.curves = {}        # 图表 -> 单次结果模式下的持久曲线
+        self.hover_labels = {}  # 图表 -> 悬停提示 TextItem
+        self.hover_data = {}    # 图表 -> (x, y, x 是否有序)
+        self.mouse_proxies = []
+        self.threshold_line = None
+        self.placeholder_text = None
+        self.show_grid = True
+        self.mode = None        # 'single' 单次结果 / 'compare' 对比
+        self.compare_views = {}  # 图表 -> 对比模式下显示内容的快照（导出图表用）
+        self.last_results = None
+        self.last_sensitivity = None
+        self.initUI()
+
+    def initUI(self):
+        pg.setConfigOptions(antialias=True, background='w', foreground='k')
+        layout = QGridLayout(self)
+        layout.setSpacing(10)
+
+        for i, title in enumerate(self.PLOT_CONFIG):
+            widget = pg.PlotWidget()
+            plot = widget.getPlotItem()
+            plot.setTitle(title)
+
+            frame = QFrame()
+            frame.setFrameStyle(QFrame.Box | QFrame.Plain)
+            frame.setStyleSheet("""
+                QFrame {
+                    background-color: white;
+                    border: 2px solid #bdc3c7;
+                    border-radius: 5px;
+                }
+            """)
+            f_layout = QVBoxLayout(frame)
+            f_layout.setContentsMargins(5, 5, 5, 5)
+            f_layout.addWidget(widget)
+            layout.addWidget(frame, i // 2, i % 2)
+
+            self.widgets[title] = widget
+            self.plots[title] = plot
+
+            # 鼠标移动按屏幕刷新率限流
+            proxy = pg.SignalProxy(widget.scene().sigMouseMoved, rateLimit=60,
+                                   slot=lambda args, t=title: self.on_mouse_moved(t, args[0]))
+            self.mouse_proxies.append(proxy)
+
+        layout.setRowStretch(0, 1)
+        layout.setRowStretch(1, 1)
+
+    def chart_titles(self):
+        return list(self.PLOT_CONFIG)
+
+    def export_views(self, titles=None):
+        """导出图表用的快照：当前显示模式的完整分辨率数据和坐标轴范围"""
+        views = []
+        for title in titles or self.PLOT_CONFIG:
+            if self.mode == 'compare' and title in self.compare_views:
+                view = dict(self.compare_views[title], show_grid=self.show_grid)
+            else:
+                view = chart_snapshot(title, self.last_results or {}, self.last_sensitivity, self.show_grid)
+            if self.mode is not None:
+                (x_min, x_max), (y_min, y_max) = self.plots[title].viewRange()
+                if self.PLOT_CONFIG[title]['logy']:
+                    # 对数坐标下视图范围为 log10 值
+                    y_min, y_max = 10 ** y_min, 10 ** y_max
+                view['xlim'] = (x_min, x_max)
+                view['ylim'] = (y_min, y_max)
+            views.append(view)
+        return views
+
+    def _reset_plot(self, title, label_title):
+        cfg = self.PLOT_CONFIG[title]
+        plot = self.plots[title]
+        plot.clear()
+        # 图例只创建一次，之后只清空条目
+        if plot.legend is None:
+            plot.addLegend(offset=(-10, 10))
+        else:
+            plot.legend.clear()
+        plot.setTitle(label_title)
+        plot.setLabel('bottom', cfg['xlabel'])
+        plot.setLabel('left', cfg['ylabel'])
+        plot.setLogMode(x=False, y=cfg['logy'])
+        plot.showGrid(x=self.show_grid, y=self.show_grid, alpha=0.3)
+        plot.setDownsampling(auto=True, mode='peak')
+        plot.setClipToView(True)
+
+        label = pg.TextItem(anchor=(0, 1), color='k', fill=pg.mkBrush(255, 255, 255, 200),
+                            border=pg.mkPen('gray'))
+        label.setZValue(100)
+        label.hide()
+        plot.addItem(label, ignoreBounds=True)
+        self.hover_labels[title] = label
+        self.hover_data.pop(title, None)
+        return plot
+
+    def _setup_single_items(self):
+        """创建单次结果模式下的持久曲线"""
+        for title, cfg in self.PLOT_CONFIG.items():
+            plot = self._reset_plot(title, cfg['title'])
+            pen = pg.mkPen(self.COLORS.get(cfg['fmt'][0], '#1f77b4'), width=1.5)
+            self.curves[title] = plot.plot([], [], pen=pen, connect='finite')
+
+        plot1 = self.plots['粒子谱分布']
+        self.placeholder_text = pg.TextItem('粒子谱数据\n未提供', anchor=(0.5, 0.5), color='k')
+        plot1.addItem(self.placeholder_text, ignoreBounds=True)
+        self.placeholder_text.hide()
+
+        plot2 = self.plots['后向散射回波强度']
+        self.threshold_line = pg.InfiniteLine(angle=0, movable=False,
+                                              pen=pg.mkPen('r', width=1.5, style=pg.QtCore.Qt.DashLine))
+        plot2.addItem(self.threshold_line)
+        plot2.legend.addItem(pg.PlotDataItem(pen=self.threshold_line.pen), '噪声阈值')
+        self.mode = 'single'
+
+    def update_plots(self, results, sensitivity_watts):
+        self.last_results = results
+        self.last_sensitivity = sensitivity_watts
+        if self.mode != 'single':
+            self._setup_single_items()
+
+        # 对数坐标下 InfiniteLine 的位置使用 log10 值
+        if sensitivity_watts > 0:
+            self.threshold_line.setValue(np.log10(sensitivity_watts))
+
+        for title, cfg in self.PLOT_CONFIG.items():
+            x = results.get(cfg['x'])
+            y = results.get(cfg['y'])
+            if x is None or y is None:
+                self.curves[title].setData([], [])
+                self.hover_data.pop(title, None)
+                continue
+            x = np.asarray(x, dtype=float)
+            y = np.asarray(y, dtype=float)
+            self.curves[title].setData(x, y)
+            self._set_hover_data(title, x, y)
+
+        has_size_dist = 'size_distribution' in results and 'radii' in results
+        self.placeholder_text.setVisible(not has_size_dist)
+        if not has_size_dist:
+            view_range = self.plots['粒子谱分布'].viewRange()
+            self.placeholder_text.setPos(np.mean(view_range[0]), np.mean(view_range[1]))
+
+        for plot in self.plots.values():
+            plot.enableAutoRange()
+
+    def compare_plots(self, records, compare_mode=None):
+        """对比多条记录；记录较多时改用统计分位带"""
+        settings = SettingsManager.instance()
+        compare_mode = compare_mode or settings.get('plot', 'compare_mode')
+        if compare_mode == 'band' or \
+                (compare_mode == 'auto' and len(records) > int(settings.get('plot', 'band_threshold'))):
+            self.compare_bands(records)
+        else:
+            self.compare_overlay(records)
+
+    def compare_overlay(self, records):
+        """逐条叠加显示"""
+        self.mode = 'compare'
+        for title, cfg in self.PLOT_CONFIG.items():
+            plot = self._reset_plot(title, f"{cfg['title']}（对比）")
+            self.compare_views[title] = overlay_view(title, records)
+            for i, record in enumerate(records):
+                results = record['results']
+                if cfg['x'] not in results or cfg['y'] not in results:
+                    continue
+                pen = pg.mkPen(self.COMPARE_COLORS[i % len(self.COMPARE_COLORS)], width=1.5)
+                plot.plot(np.asarray(results[cfg['x']], dtype=float),
+                          np.asarray(results[cfg['y']], dtype=float),
+                          pen=pen, connect='finite', name=f"记录#{record['id']}")
+            plot.enableAutoRange()
+
+    def compare_bands(self, records):
+        """统计对比：极值包络、分位带、中位数和均值"""
+        self.mode = 'compare'
+        for title, cfg in self.PLOT_CONFIG.items():
+            curves = [(record['results'][cfg['x']], record['results'][cfg['y']]) for record in records
+                      if cfg['x'] in record['results'] and cfg['y'] in record['results']]
+            stats = ensemble_statistics(curves, log=cfg['logy']) if curves else None
+            count = stats['count'] if stats is not None else 0
+            self.compare_views[title] = band_view(title, stats)
+            plot = self._reset_plot(title, f"{cfg['title']}（{count} 条记录统计）")
+            if stats is None:
+                continue
+
+            grid = stats['grid']
+            bands = stats['percentiles']
+            edge_pen = pg.mkPen((0, 0, 0, 0))
+            for lower, upper, alpha, name in ((stats['min'], stats['max'], 30, '最小-最大'),
+                                              (bands[10], bands[90], 56, 'P10-P90'),
+                                              (bands[25], bands[75], 90, 'P25-P75')):
+                # 边界曲线加入坐标轴，才能跟随对数坐标变换
+                low_item = plot.plot(grid, lower, pen=edge_pen, connect='finite')
+                high_item = plot.plot(grid, upper, pen=edge_pen, connect='finite')
+                plot.addItem(pg.FillBetweenItem(low_item, high_item, brush=pg.mkBrush(*self.BAND_COLOR, alpha)))
+                # FillBetweenItem 不能直接作为图例样本，用同色粗线代替
+                plot.legend.addItem(pg.PlotDataItem(pen=pg.mkPen((*self.BAND_COLOR, alpha * 2), width=8)), name)
+            plot.plot(grid, bands[50], pen=pg.mkPen('#1a5276', width=1.5), connect='finite', name='中位数')
+            plot.plot(grid, stats['mean'], pen=pg.mkPen('#e74c3c', width=1.2, style=pg.QtCore.Qt.DashLine),
+                      connect='finite', name='均值')
+            self._set_hover_data(title, grid, bands[50])
+            plot.enableAutoRange()
+
+    def _set_hover_data(self, title, x, y):
+        is_sorted = x.size < 2 or bool(np.all(np.diff(x) >= 0))
+        self.hover_data[title] = (x, y, is_sorted)
+
+    def on_mouse_moved(self, title, pos):
+        """显示鼠标附近数据点的提示"""
+        plot = self.plots[title]
+        label = self.hover_labels.get(title)
+        if label is None:
+            return
+        if title not in self.hover_data or not plot.sceneBoundingRect().contains(pos):
+            label.hide()
+            return
+        x, y, is_sorted = self.hover_data[title]
+        if x.size == 0:
+            label.hide()
+            return
+
+        x_query = plot.vb.mapSceneToView(pos).x()
+        if is_sorted:
+            idx = int(np.clip(np.searchsorted(x, x_query), 1, x.size - 1)) if x.size > 1 else 0
+            if idx > 0 and (x_query - x[idx - 1]) <= (x[idx] - x_query):
+                idx -= 1
+        else:
+            idx = int(np.argmin(np.abs(x - x_query)))
+        x_val, y_val = x[idx], y[idx]
+        if not np.isfinite(y_val):
+            label.hide()
+            return
+
+        y_pos = y_val
+        if self.PLOT_CONFIG[title]['logy']:
+            if y_val <= 0:
+                label.hide()
+                return
+            y_pos = np.log10(y_val)
+        label.setText(self.HOVER_FORMATS[title].format(x=x_val, y=y_val))
+        label.setPos(x_val, y_pos)
+        label.show()
+
+    def refresh_style(self):
+        """图表样式变化后重建图元"""
+        self.mode = None
+        if self.last_results is not None:
+            self.update_plots(self.last_results, self.last_sensitivity)
+
+    def set_grid(self, show):
+        self.show_grid = show
+        for plot in self.plots.values():
+            plot.showGrid(x=show, y=show, alpha=0.3)
+
+    def redraw(self):
+        for widget in self.widgets.values():
+            widget.update()
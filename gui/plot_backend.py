@@ -0,0 +1,29 @@
+# gui/plot_backend.py
+# 结果图表后端选择：matplotlib（默认）或 pyqtgraph
+from gui.right_panel import RightPanel
+from utils.settings_manager import SettingsManager
+
+PLOT_BACKENDS = {
+    'matplotlib': 'Matplotlib（默认，样式与导出更完整）',
+    'pyqtgraph': 'PyQtGraph（长序列和频繁刷新更流畅）',
+}
+
+
+def pyqtgraph_available():
+    try:
+        import pyqtgraph  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_result_panel(backend=None):
+    """按设置创建结果图表面板，pyqtgraph 不可用时退回 matplotlib"""
+    backend = backend or SettingsManager.instance().get('plot', 'backend')
+    if backend == 'pyqtgraph':
+        try:
+            from gui.pg_right_panel import PgRightPanel
+            return PgRightPanel()
+        except ImportError as e:
+            print(f"加载 pyqtgraph 图表后端失败，改用 matplotlib: {e}")
+    return RightPanel()
@@ -0,0 +1,61 @@
+# gui/plot_lod.py
+# 绘图降采样工具：长序列按像素列做 min/max 抽取，每一列只保留最小值和最大值两个点，
+# 折线外形与原始数据逐像素一致，绘制的点数只与画布宽度有关。
+import numpy as np
+
+# 画布尚未布局时使用的最小列数
+MIN_COLUMNS = 200
+
+
+def column_budget(canvas):
+    """根据画布的物理像素宽度确定列数"""
+    try:
+        width = canvas.width() * canvas.devicePixelRatioF()
+    except Exception:
+        width = 0
+    return max(int(width), MIN_COLUMNS)
+
+
+def visible_slice(x, x_min, x_max):
+    """有序 x 中位于 [x_min, x_max] 的下标范围，两端各多保留一个点保证线段连续"""
+    start = max(int(np.searchsorted(x, x_min, side='left')) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_max, side='right')) + 1, x.size)
+    return start, stop
+
+
+def minmax_decimate(x, y, n_columns):
+    """按列取最小值/最大值降采样，x 需为升序
+
+    返回的点保持原始顺序，首尾点总是保留。
+    """
+    n = x.size
+    if n <= 2 * n_columns:
+        return x, y
+
+    x_start, x_end = x[0], x[-1]
+    if not x_end > x_start:
+        return x, y
+
+    columns = ((x - x_start) * ((n_columns - 1) / (x_end - x_start))).astype(np.intp)
+    # 非有限值不参与极值比较，放到每列末尾之外
+    y_key = np.where(np.isfinite(y), y, np.nan)
+    finite = np.isfinite(y_key)
+
+    # 先按列、再按 y 排序，每组第一个即最小值，最后一个有限值即最大值
+    order = np.lexsort((y_key, columns))
+    sorted_columns = columns[order]
+    starts = np.flatnonzero(np.r_[True, sorted_columns[1:] != sorted_columns[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    finite_count = np.add.reduceat(finite[order].astype(np.intp), starts)
+    last_finite = np.where(finite_count > 0, starts + finite_count - 1, ends)
+
+    keep = np.unique(np.concatenate((order[starts], order[last_finite], [0, n - 1])))
+    return x[keep], y[keep]
+
+
+def decimate_for_view(x, y, x_min, x_max, n_columns, is_sorted=True):
+    """取可见范围内的数据并降采样；无序数据只做整体降采样判断"""
+    if not is_sorted:
+        return x, y
+    start, stop = visible_slice(x, x_min, x_max)
+    return minmax_decimate(x[start:stop], y[start:stop], n_columns)
@@ -0,0 +1,75 @@
+from PyQt5.QtCore import QUrl
+from PyQt5.QtGui import QDesktopServices
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTabWidget, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView, QPushButton)
+
+
+def _format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class ProfileReportDialog(QDialog):
+    """深度分析结果：自身耗时最多的函数、累计耗时最多的函数和内存分配最多的代码行"""
+
+    def __init__(self, summary, parent=None):
+        super().__init__(parent)
+        self.summary = summary
+        self.initUI()
+
+    def initUI(self):
+        self.setWindowTitle('性能分析结果')
+        self.resize(760, 520)
+        layout = QVBoxLayout(self)
+
+        summary = self.summary
+        info = QLabel(f"运行耗时 {summary['seconds']:.3f} s，内存峰值 {_format_bytes(summary['peak_memory'])}\n"
+                      f"分析文件: {summary['directory']}")
+        info.setWordWrap(True)
+        layout.addWidget(info)
+
+        tabs = QTabWidget()
+        tabs.addTab(self._function_table(summary['hotspots']), '热点函数（自身耗时）')
+        tabs.addTab(self._function_table(summary['cumulative']), '累计耗时')
+        tabs.addTab(self._allocation_table(summary['allocations']), '内存分配')
+        layout.addWidget(tabs)
+
+        hint = QLabel('run.prof 可用 snakeviz 或 python -m pstats 查看，memory.snapshot 可用 tracemalloc 读取。')
+        hint.setWordWrap(True)
+        hint.setStyleSheet("color: #7f8c8d;")
+        layout.addWidget(hint)
+
+        button_layout = QHBoxLayout()
+        open_btn = QPushButton('打开目录')
+        open_btn.clicked.connect(lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(summary['directory'])))
+        button_layout.addWidget(open_btn)
+        button_layout.addStretch()
+        close_btn = QPushButton('关闭')
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+    def _table(self, headers, rows):
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        for column in range(1, len(headers)):
+            table.horizontalHeader().setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(value))
+        return table
+
+    def _function_table(self, functions):
+        rows = [(f['function'], str(f['calls']), f"{f['tottime'] * 1000:.1f}", f"{f['cumtime'] * 1000:.1f}")
+                for f in functions]
+        return self._table(['函数', '调用次数', '自身耗时 (ms)', '累计耗时 (ms)'], rows)
+
+    def _allocation_table(self, allocations):
+        rows = [(a['location'], _format_bytes(a['size']), str(a['count'])) for a in allocations]
+        return self._table(['代码位置', '分配大小', '块数'], rows)
@@ -10,11 +10,13 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QApplication
 from gui.rain_left_panel import RainLeftPanel
-from gui.right_panel import RightPanel
+from gui.plot_backend import create_result_panel
 from gui.history_panel import HistoryPanel
+from gui.perf_panel import PerformancePanel
 from gui.menu_bar import MenuBarManager
 from core.simulation_worker import SimulationWorker
 from utils.style_utils import setup_chinese_font
+from utils.profiling import link_history_record
 from utils.history_manager import HistoryManager
 from main import StartupWindow
 
@@ -183,9 +185,12 @@ class RainSimulationWindow(QMainWindow):
         left_tab_widget.addTab(history_scroll_area, "历史记录")
         self.history_panel.refresh_list()
 
+        self.perf_panel = PerformancePanel()
+        left_tab_widget.addTab(self.perf_panel, "性能")
+
         content_splitter.addWidget(left_tab_widget)
 
-        self.right_panel = RightPanel()
+        self.right_panel = create_result_panel()
         content_splitter.addWidget(self.right_panel)
 
         content_splitter.setStretchFactor(0, 1)
@@ -215,6 +220,7 @@ class RainSimulationWindow(QMainWindow):
 
         # 4. 启动后台线程
         self.worker = SimulationWorker(params)
+        self.worker.profile_name = self.menu_manager.take_profile_request(self.env_type)
         self.worker.finished.connect(self.on_simulation_finished)
         self.worker.error.connect(self.on_simulation_error)
         self.worker.progress.connect(self.on_progress_update)
@@ -232,7 +238,16 @@ class RainSimulationWindow(QMainWindow):
 
         # 隐藏进度条
         self.progress_bar.setVisible(False)
-        self.status_label.setText("仿真计算完成")
+        if self.worker.interp_error is not None:
+            errors = [e for e in self.worker.interp_error.values() if np.isfinite(e)]
+            if errors:
+                self.status_label.setText(f"仿真计算完成（近似结果，插值误差 ≈ {max(errors) * 100:.2f}%）")
+            else:
+                self.status_label.setText("仿真计算完成（近似结果，误差未知）")
+        elif self.worker.from_cache:
+            self.status_label.setText("仿真计算完成（缓存结果）")
+        else:
+            self.status_label.setText("仿真计算完成")
 
         self.simulation_results = results
         self.menu_manager.set_simulation_results(results)
@@ -245,11 +260,25 @@ class RainSimulationWindow(QMainWindow):
 
         self.right_panel.update_plots(results, self.worker.params['sensitivity_watts'])
 
-        self.history_manager.add_record(self.worker.params, results, self.env_type)
-        self.history_panel.refresh_list(self.env_type)
+        profile = self.worker.profile
+        if profile is not None and isinstance(results.get('perf'), dict):
+            # 历史记录中保存分析结果目录
+            results['perf']['profile_dir'] = profile['directory']
+        self.perf_panel.update_perf(results.get('perf'))
+
+        # 历史面板通过 record_added 信号增量插入新记录
+        record_id = self.history_manager.add_record(self.worker.params, results, self.env_type)
+
+        if profile is not None:
+            from gui.profile_dialog import ProfileReportDialog
+            link_history_record(profile, record_id, self.env_type)
+            ProfileReportDialog(profile, self).exec_()
 
     def on_history_record_selected(self, record):
+        self.history_manager.mark_viewed(record['id'])
         self.left_panel.update_outputs(record['results'])
+        self.perf_panel.update_perf(record['results'].get('perf'),
+                                    f"历史记录 {record['timestamp']}")
         
         if 'radii' in record['results'] and 'size_distribution' in record['results']:
             self.right_panel.update_plots(record['results'], 
@@ -261,6 +290,8 @@ class RainSimulationWindow(QMainWindow):
                                       record['params'].get('sensitivity_watts', 1e-12))
 
     def on_compare_records(self, records):
+        for record in records:
+            self.history_manager.mark_viewed(record['id'])
         self.right_panel.compare_plots(records)
 
     def on_simulation_error(self, error_msg):
@@ -280,6 +311,8 @@ class RainSimulationWindow(QMainWindow):
                                      '确定要退出仿真吗？',
                                      QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
+            # 等待后台线程把历史记录写完
+            self.history_manager.close()
             event.accept()
             # 从菜单管理器的窗口列表中移除
             if hasattr(self, 'menu_manager') and hasattr(self.menu_manager, 'remove_window'):
@@ -7,13 +7,72 @@ from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as Navigatio
 from matplotlib.figure import Figure
 from matplotlib.ticker import ScalarFormatter
 import numpy as np
+import time
 
 from PyQt5.QtWidgets import QWidget, QGridLayout, QFrame, QVBoxLayout, QSizePolicy, QApplication
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QCursor
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QCursor, QPainter, QResizeEvent
+
+from gui.plot_lod import column_budget, minmax_decimate, decimate_for_view
+from utils.ensemble_stats import ensemble_statistics
+from utils.figure_render import CHART_CONFIG, band_view, chart_snapshot, overlay_view
+from utils.settings_manager import SettingsManager
+
+
+class DebouncedFigureCanvas(FigureCanvas):
+    """缩放时延迟重绘的画布
+
+    拖动窗口边缘时只拉伸上一帧的位图，停止缩放一段时间后才按最终尺寸完整重绘。
+    """
+    RESIZE_DEBOUNCE_MS = 150
+
+    def __init__(self, figure):
+        super().__init__(figure)
+        self._snapshot = None
+        self._resize_pending = False
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.timeout.connect(self._apply_resize)
+
+    def resizeEvent(self, event):
+        if not self.isVisible() or getattr(self, 'renderer', None) is None:
+            # 首次显示前直接按正常流程处理
+            super().resizeEvent(event)
+            return
+        if not self._resize_pending:
+            # 缩放开始时保存当前画面，中间帧拉伸显示
+            self._snapshot = self.grab()
+            self._resize_pending = True
+        self._resize_timer.start(self.RESIZE_DEBOUNCE_MS)
+
+    def _apply_resize(self):
+        self._resize_pending = False
+        self._snapshot = None
+        # 用最终尺寸构造事件，交给 matplotlib 调整图形大小并重绘
+        super().resizeEvent(QResizeEvent(self.size(), self.size()))
+
+    def paintEvent(self, event):
+        if self._resize_pending and self._snapshot is not None:
+            painter = QPainter(self)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+            painter.drawPixmap(self.rect(), self._snapshot)
+            painter.end()
+            return
+        super().paintEvent(event)
 
 
 class RightPanel(QWidget):
+    # 单次结果图表配置，键为图表标识（与 figures/canvases/axes 的键一致）
+    PLOT_CONFIG = CHART_CONFIG
+
+    # 悬停提示文本格式
+    HOVER_FORMATS = {
+        '粒子谱分布': '半径: {x:.3f} μm\n密度: {y:.2e}',
+        '后向散射回波强度': '距离: {x:.0f} m\n功率: {y:.2e} W',
+        '双程路径透过率': '距离: {x:.0f} m\n透过率: {y:.4f}',
+        '仰角-散射强度 (对数)': '散射角: {x:.1f}°\n强度: {y:.2e}',
+    }
+
     def __init__(self):
         super().__init__()
         self.figures = {}
@@ -21,8 +80,36 @@ class RightPanel(QWidget):
         self.axes = {}
         self.toolbars = {}
         self.tooltips = {}
+        self.lines = {}         # 图表 -> 持久的数据曲线 Line2D
+        self.lod_series = {}    # 图表 -> [(Line2D, 完整 x, 完整 y, x 是否有序)]，用于按视图降采样
+        self.series = {}        # 图表 -> 当前显示的 (x, y) 数据
+        self.data_bounds = {}   # 图表 -> 当前数据范围，范围不变时不重新计算坐标轴
+        self.threshold_line = None
+        self.threshold_value = None
+        self.placeholder_text = None
+        self.mode = None        # 'single' 单次结果 / 'compare' 对比
+        self.compare_views = {}  # 图表 -> 对比模式下显示内容的快照（导出图表用）
+        self.show_grid = True
+        self.last_results = None
+        self.last_sensitivity = None
+        # 悬停提示：每个图表一个可复用的提示框，通过 blit 绘制
+        self.hover_data = {}           # 图表 -> (x, y, x 是否有序)
+        self.hover_annotations = {}
+        self.hover_backgrounds = {}
+        self.pending_hover = None
+        self.last_hover_time = 0.0
+        self.hover_interval = 1.0 / self._screen_refresh_rate()
+        self.hover_timer = QTimer(self)
+        self.hover_timer.setSingleShot(True)
+        self.hover_timer.timeout.connect(self._process_hover)
         self.initUI()
 
+    @staticmethod
+    def _screen_refresh_rate():
+        screen = QApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 0
+        return rate if rate and rate > 0 else 60.0
+
     def initUI(self):
         layout = QGridLayout(self)
         layout.setSpacing(10)
@@ -36,7 +123,7 @@ class RightPanel(QWidget):
 
         for title, row, col in titles:
             fig = Figure(figsize=(5, 4), dpi=100)
-            canvas = FigureCanvas(fig)
+            canvas = DebouncedFigureCanvas(fig)
             canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
             ax = fig.add_subplot(111)
 
@@ -80,208 +167,386 @@ class RightPanel(QWidget):
 
             # 启用交互功能
             canvas.mpl_connect('motion_notify_event', lambda event, t=title: self.on_motion(event, t))
+            canvas.mpl_connect('draw_event', lambda event, t=title: self.on_draw(event, t))
+            canvas.mpl_connect('figure_leave_event', lambda event, t=title: self.on_figure_leave(t))
+            canvas.mpl_connect('resize_event', lambda event, t=title: self._refresh_lod(t))
 
         layout.setRowStretch(0, 1)
         layout.setRowStretch(1, 1)
 
-    def update_plots(self, results, sensitivity_watts):
+    def _setup_single_artists(self):
+        """创建单次结果模式下的持久图元，之后的更新只修改数据"""
+        for title, cfg in self.PLOT_CONFIG.items():
+            ax = self.axes[title]
+            ax.clear()
+            self._reset_lod(title)
+            if cfg['logy']:
+                ax.set_yscale('log')
+            line, = ax.plot([], [], cfg['fmt'], linewidth=1.5, marker=cfg['marker'], markersize=1)
+            self.lines[title] = line
+            ax.set_title(cfg['title'], fontsize=11, fontweight='bold', pad=10)
+            ax.set_xlabel(cfg['xlabel'], fontsize=9)
+            ax.set_ylabel(cfg['ylabel'], fontsize=9)
+            ax.tick_params(labelsize=8)
+            ax.grid(True, linestyle='--', alpha=0.7)
+
         ax1 = self.axes['粒子谱分布']
-        ax1.clear()
-        if 'size_distribution' in results and 'radii' in results:
-            radii = results['radii']
-            size_dist = results['size_distribution']
-            # 保存数据以便在on_motion中使用
-            self.radii_data = radii
-            self.size_dist_data = size_dist
-            ax1.semilogy(radii, size_dist, 'b-', linewidth=1.5, marker='o', markersize=1)
-            ax1.set_title('粒子谱分布', fontsize=11, fontweight='bold', pad=10)
-            ax1.set_xlabel('粒子半径 (μm)', fontsize=9)
-            ax1.set_ylabel('相对数量密度', fontsize=9)
-            ax1.tick_params(labelsize=8)
-        else:
-            ax1.text(0.5, 0.5, '粒子谱数据\n未提供',
-                    horizontalalignment='center', verticalalignment='center',
-                    transform=ax1.transAxes, fontsize=12)
-        ax1.grid(True, linestyle='--', alpha=0.7)
-        self.canvases['粒子谱分布'].draw()
+        self.placeholder_text = ax1.text(0.5, 0.5, '粒子谱数据\n未提供',
+                                         horizontalalignment='center', verticalalignment='center',
+                                         transform=ax1.transAxes, fontsize=12, visible=False)
 
         ax2 = self.axes['后向散射回波强度']
-        ax2.clear()
-        distance = results['r']
-        power = results['p_received']
-        # 保存数据以便在on_motion中使用
-        self.distance_data = distance
-        self.power_data = power
-        ax2.semilogy(distance, power, 'b-', linewidth=1.5, marker='s', markersize=1)
-        ax2.axhline(y=sensitivity_watts, color='r', linestyle='--', linewidth=1.5, label='噪声阈值')
-        ax2.set_title('后向散射回波强度', fontsize=11, fontweight='bold', pad=10)
-        ax2.set_xlabel('距离 (m)', fontsize=9)
-        ax2.set_ylabel('功率 (W)', fontsize=9)
-        ax2.tick_params(labelsize=8)
+        self.threshold_line = ax2.axhline(y=1.0, color='r', linestyle='--', linewidth=1.5, label='噪声阈值')
         ax2.legend(fontsize=8, loc='upper right')
-        ax2.grid(True, linestyle='--', alpha=0.7)
-        self.canvases['后向散射回波强度'].draw()
 
-        ax3 = self.axes['双程路径透过率']
-        ax3.clear()
-        trans = results['trans']
-        # 保存数据以便在on_motion中使用
-        self.trans_data = trans
-        ax3.plot(distance, trans, 'g-', linewidth=1.5, marker='^', markersize=1)
-        ax3.set_title('双程路径透过率', fontsize=11, fontweight='bold', pad=10)
-        ax3.set_xlabel('距离 (m)', fontsize=9)
-        ax3.set_ylabel('透过率', fontsize=9)
-        ax3.tick_params(labelsize=8)
-        ax3.grid(True, linestyle='--', alpha=0.7)
-        self.canvases['双程路径透过率'].draw()
-
-        ax4 = self.axes['仰角-散射强度 (对数)']
-        ax4.clear()
-        theta = results['theta']
-        phase_func = results['phase_func']
+        self.series = {}
+        self.data_bounds = {}
+        self.threshold_value = None
+        self.mode = 'single'
+
+    def _set_series(self, title, x, y):
+        """更新一条曲线的数据，返回图表是否需要重绘"""
+        previous = self.series.get(title)
+        if previous is not None and previous[0] is x and previous[1] is y:
+            return False
+        if (previous is not None and x is not None and y is not None
+                and np.array_equal(previous[0], x) and np.array_equal(previous[1], y)):
+            self.series[title] = (x, y)
+            return False
+
+        line = self.lines[title]
+        if x is None or y is None:
+            line.set_data([], [])
+            self.lod_series[title] = []
+            self.series[title] = (None, None)
+            return True
+
+        self._set_lod_data(title, line, x, y)
+        self.series[title] = (x, y)
+
+        x_arr = np.asarray(x, dtype=float)
+        y_arr = np.asarray(y, dtype=float)
+        if self.PLOT_CONFIG[title]['logy']:
+            y_arr = y_arr[y_arr > 0]
+        if x_arr.size and y_arr.size:
+            bounds = (np.nanmin(x_arr), np.nanmax(x_arr), np.nanmin(y_arr), np.nanmax(y_arr))
+        else:
+            bounds = None
+        if bounds != self.data_bounds.get(title):
+            # 数据范围变化时才重新计算坐标轴范围
+            ax = self.axes[title]
+            ax.relim(visible_only=True)
+            ax.autoscale_view()
+            self.data_bounds[title] = bounds
+            # 重置工具栏的视图历史，"主页"按钮回到新的范围
+            self.toolbars[title].update()
+        return True
+
+    def _reset_lod(self, title):
+        """清空坐标轴后重新登记降采样曲线和视图回调（ax.clear 会重置回调）"""
+        self.lod_series[title] = []
+        ax = self.axes[title]
+        ax.callbacks.connect('xlim_changed', lambda changed_ax, t=title: self._refresh_lod(t))
+
+    def _decimate(self, title, x, y, is_sorted, x_range=None):
+        if not is_sorted:
+            return x, y
+        n_columns = column_budget(self.canvases[title])
+        if x_range is None:
+            return minmax_decimate(x, y, n_columns)
+        return decimate_for_view(x, y, x_range[0], x_range[1], n_columns)
+
+    def _prepare_lod(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        is_sorted = x.size < 2 or bool(np.all(np.diff(x) >= 0))
+        return x, y, is_sorted
+
+    def _add_lod_line(self, title, plot_func, x, y, **kwargs):
+        """按画布宽度降采样后绘制，并保存完整数据供缩放时重新抽取"""
+        x, y, is_sorted = self._prepare_lod(x, y)
+        line, = plot_func(*self._decimate(title, x, y, is_sorted), **kwargs)
+        self.lod_series[title].append((line, x, y, is_sorted))
+        return line
+
+    def _set_lod_data(self, title, line, x, y):
+        x, y, is_sorted = self._prepare_lod(x, y)
+        self.lod_series[title] = [(line, x, y, is_sorted)]
+        # 数据整体降采样（不按当前视图裁剪），保证重新计算坐标轴范围时包含全部数据
+        line.set_data(*self._decimate(title, x, y, is_sorted))
+
+    def _refresh_lod(self, title):
+        """缩放/平移或画布尺寸变化后按当前视图重新降采样"""
+        entries = self.lod_series.get(title)
+        if not entries:
+            return
+        x_range = self.axes[title].get_xlim()
+        for line, x, y, is_sorted in entries:
+            line.set_data(*self._decimate(title, x, y, is_sorted, x_range))
+
+    def update_plots(self, results, sensitivity_watts):
+        self.last_results = results
+        self.last_sensitivity = sensitivity_watts
+        if self.mode != 'single':
+            self._setup_single_artists()
+            changed = set(self.PLOT_CONFIG)
+        else:
+            changed = set()
+
+        # 先更新噪声阈值，坐标轴范围需要包含阈值线
+        threshold_changed = sensitivity_watts != self.threshold_value
+        if threshold_changed:
+            self.threshold_line.set_ydata([sensitivity_watts, sensitivity_watts])
+            self.threshold_value = sensitivity_watts
+
+        for title, cfg in self.PLOT_CONFIG.items():
+            x = results.get(cfg['x'])
+            y = results.get(cfg['y'])
+            if self._set_series(title, x, y):
+                changed.add(title)
+
+        if threshold_changed:
+            ax2 = self.axes['后向散射回波强度']
+            ax2.relim(visible_only=True)
+            ax2.autoscale_view()
+            changed.add('后向散射回波强度')
+
+        has_size_dist = 'size_distribution' in results and 'radii' in results
+        if self.placeholder_text.get_visible() == has_size_dist:
+            self.placeholder_text.set_visible(not has_size_dist)
+            changed.add('粒子谱分布')
+
         # 保存数据以便在on_motion中使用
-        self.theta_data = theta
-        self.phase_func_data = phase_func
-        ax4.semilogy(theta, phase_func, 'r-', linewidth=1.5, marker='d', markersize=1)
-        ax4.set_title('仰角-散射强度', fontsize=11, fontweight='bold', pad=10)
-        ax4.set_xlabel('散射角 (度)', fontsize=9)
-        ax4.set_ylabel('归一化强度', fontsize=9)
-        ax4.tick_params(labelsize=8)
-        ax4.grid(True, linestyle='--', alpha=0.7)
-        self.canvases['仰角-散射强度 (对数)'].draw()
+        for title, cfg in self.PLOT_CONFIG.items():
+            if title in changed:
+                self._set_hover_data(title, results.get(cfg['x']), results.get(cfg['y']))
 
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        for title, canvas in self.canvases.items():
-            canvas.draw()
+        # 只重绘数据发生变化的图表，并合并到下一次事件循环
+        for title in changed:
+            self.canvases[title].draw_idle()
+
+    def refresh_style(self):
+        """图表样式变化后重建图元"""
+        self.mode = None
+        if self.last_results is not None:
+            self.update_plots(self.last_results, self.last_sensitivity)
+        else:
+            for canvas in self.canvases.values():
+                canvas.draw_idle()
+
+    def chart_titles(self):
+        return list(self.PLOT_CONFIG)
+
+    def export_views(self, titles=None):
+        """导出图表用的快照：当前显示模式的完整分辨率数据（不是降采样后的曲线）和坐标轴范围"""
+        views = []
+        for title in titles or self.PLOT_CONFIG:
+            if self.mode == 'compare' and title in self.compare_views:
+                view = dict(self.compare_views[title], show_grid=self.show_grid)
+            else:
+                view = chart_snapshot(title, self.last_results or {}, self.last_sensitivity, self.show_grid)
+            if self.mode is not None:
+                ax = self.axes[title]
+                view['xlim'] = tuple(ax.get_xlim())
+                view['ylim'] = tuple(ax.get_ylim())
+            views.append(view)
+        return views
+
+    def set_grid(self, show):
+        self.show_grid = show
+        for ax in self.axes.values():
+            ax.grid(show)
+        self.redraw()
+
+    def redraw(self):
+        for canvas in self.canvases.values():
+            canvas.draw_idle()
+
+    def _set_hover_data(self, title, x, y):
+        """保存悬停查询用的数据，并预先判断 x 是否有序"""
+        if x is None or y is None:
+            self.hover_data.pop(title, None)
+            return
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y)
+        is_sorted = x.size < 2 or bool(np.all(np.diff(x) >= 0))
+        self.hover_data[title] = (x, y, is_sorted)
+
+    def _nearest_index(self, title, x_query):
+        x, _, is_sorted = self.hover_data[title]
+        if not is_sorted:
+            return int(np.argmin(np.abs(x - x_query)))
+        # 有序数据用二分查找，比较左右两个候选点
+        idx = int(np.searchsorted(x, x_query))
+        if idx <= 0:
+            return 0
+        if idx >= x.size:
+            return x.size - 1
+        return idx if (x[idx] - x_query) < (x_query - x[idx - 1]) else idx - 1
+
+    def on_draw(self, event, title):
+        """整幅图重绘后缓存背景，供悬停提示 blit 使用"""
+        canvas = self.canvases[title]
+        self.hover_backgrounds[title] = canvas.copy_from_bbox(self.figures[title].bbox)
+        annotation = self.hover_annotations.get(title)
+        if annotation is not None and annotation.get_visible() and annotation.axes is not None:
+            annotation.axes.draw_artist(annotation)
+            canvas.blit(self.figures[title].bbox)
 
     def on_motion(self, event, title):
-        """处理鼠标移动事件，显示数据提示"""
-        if event.inaxes is None:
+        """处理鼠标移动事件，显示数据提示（按屏幕刷新率限流）"""
+        self.pending_hover = (event, title)
+        now = time.monotonic()
+        wait = self.hover_interval - (now - self.last_hover_time)
+        if wait <= 0:
+            self._process_hover()
+        elif not self.hover_timer.isActive():
+            # 限流期间只保留最新的位置，到期后处理
+            self.hover_timer.start(int(wait * 1000) + 1)
+
+    def _process_hover(self):
+        if self.pending_hover is None:
+            return
+        event, title = self.pending_hover
+        self.pending_hover = None
+        self.last_hover_time = time.monotonic()
+
+        if event.inaxes is None or title not in self.hover_data or event.xdata is None:
+            self.hide_tooltip(title)
             return
+        x, y, _ = self.hover_data[title]
+        if x.size == 0:
+            return
+
+        idx = self._nearest_index(title, event.xdata)
+        x_val = x[idx]
+        y_val = y[idx]
+        self.show_tooltip(title, event.inaxes, (x_val, y_val), self.HOVER_FORMATS[title].format(x=x_val, y=y_val))
+
+    def _hover_annotation(self, title, ax):
+        """取得可复用的提示框；坐标轴被清空后重新创建"""
+        annotation = self.hover_annotations.get(title)
+        if annotation is None or annotation.axes is not ax or annotation not in ax.texts:
+            # animated=True：不参与常规绘制和导出，只通过 blit 显示
+            annotation = ax.annotate('', xy=(0, 0), xytext=(10, 10), textcoords='offset points',
+                                     bbox=dict(boxstyle='round', fc='w', ec='gray', alpha=0.8),
+                                     fontsize=9, animated=True, visible=False)
+            self.hover_annotations[title] = annotation
+        return annotation
 
-        ax = event.inaxes
-        x, y = event.xdata, event.ydata
-
-        # 获取当前图表的数据
-        if title == '粒子谱分布':
-            if hasattr(self, 'radii_data') and hasattr(self, 'size_dist_data'):
-                radii = self.radii_data
-                size_dist = self.size_dist_data
-                # 找到最近的数据点
-                if radii.size > 0:
-                    idx = np.argmin(np.abs(radii - x))
-                    x_val = radii[idx]
-                    y_val = size_dist[idx]
-                    self.show_tooltip(event, ax, f'半径: {x_val:.3f} μm\n密度: {y_val:.2e}')
-        elif title == '后向散射回波强度':
-            if hasattr(self, 'distance_data') and hasattr(self, 'power_data'):
-                distance = self.distance_data
-                power = self.power_data
-                if distance.size > 0:
-                    idx = np.argmin(np.abs(distance - x))
-                    x_val = distance[idx]
-                    y_val = power[idx]
-                    self.show_tooltip(event, ax, f'距离: {x_val:.0f} m\n功率: {y_val:.2e} W')
-        elif title == '双程路径透过率':
-            if hasattr(self, 'distance_data') and hasattr(self, 'trans_data'):
-                distance = self.distance_data
-                trans = self.trans_data
-                if distance.size > 0:
-                    idx = np.argmin(np.abs(distance - x))
-                    x_val = distance[idx]
-                    y_val = trans[idx]
-                    self.show_tooltip(event, ax, f'距离: {x_val:.0f} m\n透过率: {y_val:.4f}')
-        elif title == '仰角-散射强度 (对数)':
-            if hasattr(self, 'theta_data') and hasattr(self, 'phase_func_data'):
-                theta = self.theta_data
-                phase_func = self.phase_func_data
-                if theta.size > 0:
-                    idx = np.argmin(np.abs(theta - x))
-                    x_val = theta[idx]
-                    y_val = phase_func[idx]
-                    self.show_tooltip(event, ax, f'散射角: {x_val:.1f}°\n强度: {y_val:.2e}')
-
-    def show_tooltip(self, event, ax, text):
+    def show_tooltip(self, title, ax, xy, text):
         """显示数据提示"""
-        # 清除之前的提示
-        if hasattr(self, 'tooltip'):
-            self.tooltip.remove()
-
-        # 创建新的提示
-        self.tooltip = ax.annotate(text, xy=(event.xdata, event.ydata),
-                                  xytext=(10, 10), textcoords='offset points',
-                                  bbox=dict(boxstyle='round', fc='w', ec='gray', alpha=0.8),
-                                  fontsize=9)
-        self.canvases[ax.get_title()].draw()
-
-    def compare_plots(self, records):
+        background = self.hover_backgrounds.get(title)
+        if background is None:
+            # 尚未完成首次绘制，没有可用的背景
+            return
+        canvas = self.canvases[title]
+        annotation = self._hover_annotation(title, ax)
+        annotation.xy = xy
+        annotation.set_text(text)
+        annotation.set_visible(True)
+
+        canvas.restore_region(background)
+        ax.draw_artist(annotation)
+        canvas.blit(self.figures[title].bbox)
+
+    def on_figure_leave(self, title):
+        # 丢弃尚未处理的悬停事件，避免鼠标离开后提示框又被重新画出
+        self.pending_hover = None
+        self.hover_timer.stop()
+        self.hide_tooltip(title)
+
+    def hide_tooltip(self, title):
+        annotation = self.hover_annotations.get(title)
+        if annotation is None or not annotation.get_visible():
+            return
+        annotation.set_visible(False)
+        background = self.hover_backgrounds.get(title)
+        if background is not None:
+            canvas = self.canvases[title]
+            canvas.restore_region(background)
+            canvas.blit(self.figures[title].bbox)
+
+    def compare_plots(self, records, compare_mode=None):
+        """对比多条记录；记录较多时改用统计分位带"""
+        settings = SettingsManager.instance()
+        compare_mode = compare_mode or settings.get('plot', 'compare_mode')
+        if compare_mode == 'band' or \
+                (compare_mode == 'auto' and len(records) > int(settings.get('plot', 'band_threshold'))):
+            self.compare_bands(records)
+        else:
+            self.compare_overlay(records)
+
+    def compare_overlay(self, records):
+        """逐条叠加显示"""
+        self.mode = 'compare'
+        self.hover_data.clear()
         colors = ['#3498db', '#e74c3c', '#27ae60', '#f39c12', '#9b59b6', '#1abc9c']
         markers = ['o', 's', '^', 'd', 'v', 'p']
 
-        ax1 = self.axes['粒子谱分布']
-        ax1.clear()
-        for i, record in enumerate(records):
-            if 'size_distribution' in record['results'] and 'radii' in record['results']:
-                radii = record['results']['radii']
-                size_dist = record['results']['size_distribution']
-                color = colors[i % len(colors)]
-                marker = markers[i % len(markers)]
-                ax1.semilogy(radii, size_dist, color=color, linewidth=1.5, 
-                             marker=marker, markersize=1, 
-                             label=f"记录#{record['id']}")
-        ax1.set_title('粒子谱分布（对比）', fontsize=11, fontweight='bold', pad=10)
-        ax1.set_xlabel('粒子半径 (μm)', fontsize=9)
-        ax1.set_ylabel('相对数量密度', fontsize=9)
-        ax1.tick_params(labelsize=8)
-        ax1.legend(fontsize=7, loc='upper right')
-        ax1.grid(True, linestyle='--', alpha=0.7)
-        self.canvases['粒子谱分布'].draw()
+        for title, cfg in self.PLOT_CONFIG.items():
+            ax = self.axes[title]
+            ax.clear()
+            self._reset_lod(title)
+            for i, record in enumerate(records):
+                results = record['results']
+                if cfg['x'] not in results or cfg['y'] not in results:
+                    continue
+                plot_func = ax.semilogy if cfg['logy'] else ax.plot
+                self._add_lod_line(title, plot_func, results[cfg['x']], results[cfg['y']],
+                                   color=colors[i % len(colors)], linewidth=1.5,
+                                   marker=markers[i % len(markers)], markersize=1,
+                                   label=f"记录#{record['id']}")
+            self.compare_views[title] = overlay_view(title, records)
+            ax.set_title(f"{cfg['title']}（对比）", fontsize=11, fontweight='bold', pad=10)
+            ax.set_xlabel(cfg['xlabel'], fontsize=9)
+            ax.set_ylabel(cfg['ylabel'], fontsize=9)
+            ax.tick_params(labelsize=8)
+            ax.legend(fontsize=7, loc='upper right')
+            ax.grid(True, linestyle='--', alpha=0.7)
+            self.toolbars[title].update()
+            self.canvases[title].draw_idle()
 
-        ax2 = self.axes['后向散射回波强度']
-        ax2.clear()
-        for i, record in enumerate(records):
-            color = colors[i % len(colors)]
-            marker = markers[i % len(markers)]
-            ax2.semilogy(record['results']['r'], record['results']['p_received'], 
-                         color=color, linewidth=1.5, marker=marker, markersize=1,
-                         label=f"记录#{record['id']}")
-        ax2.set_title('后向散射回波强度（对比）', fontsize=11, fontweight='bold', pad=10)
-        ax2.set_xlabel('距离 (m)', fontsize=9)
-        ax2.set_ylabel('功率 (W)', fontsize=9)
-        ax2.tick_params(labelsize=8)
-        ax2.legend(fontsize=7, loc='upper right')
-        ax2.grid(True, linestyle='--', alpha=0.7)
-        self.canvases['后向散射回波强度'].draw()
-
-        ax3 = self.axes['双程路径透过率']
-        ax3.clear()
-        for i, record in enumerate(records):
-            color = colors[i % len(colors)]
-            marker = markers[i % len(markers)]
-            ax3.plot(record['results']['r'], record['results']['trans'], 
-                     color=color, linewidth=1.5, marker=marker, markersize=1,
-                     label=f"记录#{record['id']}")
-        ax3.set_title('双程路径透过率（对比）', fontsize=11, fontweight='bold', pad=10)
-        ax3.set_xlabel('距离 (m)', fontsize=9)
-        ax3.set_ylabel('透过率', fontsize=9)
-        ax3.tick_params(labelsize=8)
-        ax3.legend(fontsize=7, loc='upper right')
-        ax3.grid(True, linestyle='--', alpha=0.7)
-        self.canvases['双程路径透过率'].draw()
-
-        ax4 = self.axes['仰角-散射强度 (对数)']
-        ax4.clear()
-        for i, record in enumerate(records):
-            color = colors[i % len(colors)]
-            marker = markers[i % len(markers)]
-            ax4.semilogy(record['results']['theta'], record['results']['phase_func'], 
-                         color=color, linewidth=1.5, marker=marker, markersize=1,
-                         label=f"记录#{record['id']}")
-        ax4.set_title('仰角-散射强度（对比）', fontsize=11, fontweight='bold', pad=10)
-        ax4.set_xlabel('散射角 (度)', fontsize=9)
-        ax4.set_ylabel('归一化强度', fontsize=9)
-        ax4.tick_params(labelsize=8)
-        ax4.legend(fontsize=7, loc='upper right')
-        ax4.grid(True, linestyle='--', alpha=0.7)
-        self.canvases['仰角-散射强度 (对数)'].draw()
+    def compare_bands(self, records):
+        """统计对比：在公共网格上绘制极值包络、分位带、中位数和均值"""
+        self.mode = 'compare'
+        self.hover_data.clear()
+        color = '#3498db'
+
+        for title, cfg in self.PLOT_CONFIG.items():
+            ax = self.axes[title]
+            ax.clear()
+            self._reset_lod(title)
+            curves = [(record['results'][cfg['x']], record['results'][cfg['y']]) for record in records
+                      if cfg['x'] in record['results'] and cfg['y'] in record['results']]
+            stats = ensemble_statistics(curves, log=cfg['logy']) if curves else None
+            self.compare_views[title] = band_view(title, stats)
+
+            if stats is not None:
+                if cfg['logy']:
+                    ax.set_yscale('log')
+                grid = stats['grid']
+                bands = stats['percentiles']
+                ax.fill_between(grid, stats['min'], stats['max'], color=color, alpha=0.12,
+                                linewidth=0, label='最小-最大')
+                ax.fill_between(grid, bands[10], bands[90], color=color, alpha=0.22,
+                                linewidth=0, label='P10-P90')
+                ax.fill_between(grid, bands[25], bands[75], color=color, alpha=0.35,
+                                linewidth=0, label='P25-P75')
+                self._add_lod_line(title, ax.plot, grid, bands[50], color='#1a5276',
+                                   linewidth=1.5, label='中位数')
+                self._add_lod_line(title, ax.plot, grid, stats['mean'], color='#e74c3c',
+                                   linewidth=1.2, linestyle='--', label='均值')
+                self._set_hover_data(title, grid, bands[50])
+                ax.legend(fontsize=7, loc='upper right')
+                count = stats['count']
+            else:
+                count = 0
+
+            ax.set_title(f"{cfg['title']}（{count} 条记录统计）", fontsize=11, fontweight='bold', pad=10)
+            ax.set_xlabel(cfg['xlabel'], fontsize=9)
+            ax.set_ylabel(cfg['ylabel'], fontsize=9)
+            ax.tick_params(labelsize=8)
+            ax.grid(True, linestyle='--', alpha=0.7)
+            self.toolbars[title].update()
+            self.canvases[title].draw_idle()
@@ -0,0 +1,200 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QGroupBox,
+                             QLabel, QSpinBox, QDoubleSpinBox, QPushButton, QCheckBox,
+                             QComboBox, QMessageBox)
+
+from gui.plot_backend import PLOT_BACKENDS, pyqtgraph_available
+from utils.settings_manager import SettingsManager
+from utils.result_cache import ResultCache
+
+
+class SettingsDialog(QDialog):
+    """仿真设置对话框"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = SettingsManager.instance()
+        self.initUI()
+
+    def initUI(self):
+        self.setWindowTitle('仿真设置')
+        self.setMinimumWidth(380)
+
+        layout = QVBoxLayout(self)
+
+        # 历史记录保留策略
+        history_group = QGroupBox('历史记录保留策略')
+        h_layout = QGridLayout(history_group)
+        history = self.settings.get('history')
+
+        h_layout.addWidget(QLabel('最大记录数 (0 为不限)'), 0, 0)
+        self.max_records_spin = QSpinBox()
+        self.max_records_spin.setRange(0, 1000000)
+        self.max_records_spin.setValue(int(history['max_records']))
+        h_layout.addWidget(self.max_records_spin, 0, 1)
+
+        h_layout.addWidget(QLabel('最大文件大小 (MB, 0 为不限)'), 1, 0)
+        self.max_size_spin = QDoubleSpinBox()
+        self.max_size_spin.setRange(0.0, 100000.0)
+        self.max_size_spin.setDecimals(1)
+        self.max_size_spin.setValue(float(history['max_size_mb']))
+        h_layout.addWidget(self.max_size_spin, 1, 1)
+
+        h_layout.addWidget(QLabel('最长保留天数 (0 为不限)'), 2, 0)
+        self.max_age_spin = QSpinBox()
+        self.max_age_spin.setRange(0, 36500)
+        self.max_age_spin.setValue(int(history['max_age_days']))
+        h_layout.addWidget(self.max_age_spin, 2, 1)
+
+        hint = QLabel('超出限制时按最近最少查看的顺序自动清理，固定的记录不会被清理。')
+        hint.setWordWrap(True)
+        hint.setStyleSheet("color: #7f8c8d;")
+        h_layout.addWidget(hint, 3, 0, 1, 2)
+
+        layout.addWidget(history_group)
+
+        # 结果缓存
+        cache_group = QGroupBox('结果缓存')
+        c_layout = QGridLayout(cache_group)
+        cache = self.settings.get('cache')
+
+        self.cache_enabled_check = QCheckBox('相同参数直接使用缓存结果')
+        self.cache_enabled_check.setChecked(bool(cache['enabled']))
+        c_layout.addWidget(self.cache_enabled_check, 0, 0, 1, 2)
+
+        c_layout.addWidget(QLabel('缓存最大大小 (MB)'), 1, 0)
+        self.cache_size_spin = QDoubleSpinBox()
+        self.cache_size_spin.setRange(0.0, 100000.0)
+        self.cache_size_spin.setDecimals(1)
+        self.cache_size_spin.setValue(float(cache['max_size_mb']))
+        c_layout.addWidget(self.cache_size_spin, 1, 1)
+
+        self.approx_check = QCheckBox('近似模式：参数在容差内时插值相近的缓存结果')
+        self.approx_check.setChecked(bool(cache.get('approximate')))
+        c_layout.addWidget(self.approx_check, 2, 0, 1, 2)
+
+        # 近似模式容差，(参数名, 标签, 最大值, 小数位)
+        tolerance_config = [
+            ('rain_rate', '降雨率容差 (mm/h)', 10.0, 2),
+            ('temperature', '温度容差 (K)', 20.0, 2),
+            ('visibility', '能见度容差 (km)', 5.0, 3),
+            ('ref_real', '折射率实部容差', 0.5, 4),
+            ('ref_imag', '折射率虚部容差', 0.1, 5),
+        ]
+        tolerances = cache.get('approx_tolerances') or {}
+        self.tolerance_spins = {}
+        for i, (key, label, max_v, decimals) in enumerate(tolerance_config):
+            c_layout.addWidget(QLabel(label), 3 + i, 0)
+            spin = QDoubleSpinBox()
+            spin.setRange(0.0, max_v)
+            spin.setDecimals(decimals)
+            spin.setSingleStep(10 ** -decimals * 10)
+            spin.setValue(float(tolerances.get(key, 0.0)))
+            self.tolerance_spins[key] = spin
+            c_layout.addWidget(spin, 3 + i, 1)
+
+        row = 3 + len(tolerance_config)
+        status = ResultCache.instance().status()
+        self.cache_status_label = QLabel(
+            f"已缓存 {status['entries']} 个结果，共 {status['size_bytes'] / 1024 / 1024:.1f} MB")
+        self.cache_status_label.setStyleSheet("color: #7f8c8d;")
+        c_layout.addWidget(self.cache_status_label, row, 0)
+
+        clear_cache_btn = QPushButton('清空缓存')
+        clear_cache_btn.clicked.connect(self.clear_cache)
+        c_layout.addWidget(clear_cache_btn, row, 1)
+
+        layout.addWidget(cache_group)
+
+        # 图表
+        plot_group = QGroupBox('图表')
+        p_layout = QGridLayout(plot_group)
+        plot = self.settings.get('plot')
+
+        p_layout.addWidget(QLabel('历史记录对比方式'), 0, 0)
+        self.compare_mode_combo = QComboBox()
+        for mode, label in (('auto', '自动'), ('overlay', '逐条叠加'), ('band', '统计分位带')):
+            self.compare_mode_combo.addItem(label, mode)
+        self.compare_mode_combo.setCurrentIndex(
+            max(self.compare_mode_combo.findData(plot.get('compare_mode')), 0))
+        p_layout.addWidget(self.compare_mode_combo, 0, 1)
+
+        p_layout.addWidget(QLabel('自动模式下改用分位带的记录数'), 1, 0)
+        self.band_threshold_spin = QSpinBox()
+        self.band_threshold_spin.setRange(2, 10000)
+        self.band_threshold_spin.setValue(int(plot.get('band_threshold', 6)))
+        p_layout.addWidget(self.band_threshold_spin, 1, 1)
+
+        p_layout.addWidget(QLabel('图表后端'), 2, 0)
+        self.backend_combo = QComboBox()
+        for backend, label in PLOT_BACKENDS.items():
+            self.backend_combo.addItem(label, backend)
+        if not pyqtgraph_available():
+            # 未安装 pyqtgraph 时禁用该选项
+            item = self.backend_combo.model().item(self.backend_combo.findData('pyqtgraph'))
+            item.setEnabled(False)
+        self.backend_combo.setCurrentIndex(max(self.backend_combo.findData(plot.get('backend')), 0))
+        p_layout.addWidget(self.backend_combo, 2, 1)
+
+        backend_hint = QLabel('图表后端在重新打开仿真窗口后生效。')
+        backend_hint.setStyleSheet("color: #7f8c8d;")
+        p_layout.addWidget(backend_hint, 3, 0, 1, 2)
+
+        layout.addWidget(plot_group)
+
+        # 更新
+        update_group = QGroupBox('更新')
+        u_layout = QGridLayout(update_group)
+        update = self.settings.get('update')
+
+        self.update_check = QCheckBox('启动后在后台检查更新')
+        self.update_check.setChecked(bool(update.get('check_on_start', True)))
+        u_layout.addWidget(self.update_check, 0, 0, 1, 2)
+
+        u_layout.addWidget(QLabel('检查间隔 (小时)'), 1, 0)
+        self.update_interval_spin = QDoubleSpinBox()
+        self.update_interval_spin.setRange(0.0, 24 * 365)
+        self.update_interval_spin.setDecimals(1)
+        self.update_interval_spin.setValue(float(update.get('check_interval_hours', 24)))
+        u_layout.addWidget(self.update_interval_spin, 1, 1)
+
+        layout.addWidget(update_group)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        ok_btn = QPushButton('确定')
+        ok_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton('取消')
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(ok_btn)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+
+    def accept(self):
+        self.settings.update_section('history', {
+            'max_records': self.max_records_spin.value(),
+            'max_size_mb': self.max_size_spin.value(),
+            'max_age_days': self.max_age_spin.value(),
+        })
+        tolerances = dict(self.settings.get('cache', 'approx_tolerances') or {})
+        tolerances.update({key: spin.value() for key, spin in self.tolerance_spins.items()})
+        self.settings.update_section('cache', {
+            'enabled': self.cache_enabled_check.isChecked(),
+            'max_size_mb': self.cache_size_spin.value(),
+            'approximate': self.approx_check.isChecked(),
+            'approx_tolerances': tolerances,
+        })
+        self.settings.update_section('plot', {
+            'compare_mode': self.compare_mode_combo.currentData(),
+            'band_threshold': self.band_threshold_spin.value(),
+            'backend': self.backend_combo.currentData(),
+        })
+        self.settings.update_section('update', {
+            'check_on_start': self.update_check.isChecked(),
+            'check_interval_hours': self.update_interval_spin.value(),
+        })
+        super().accept()
+
+    def clear_cache(self):
+        ResultCache.instance().clear()
+        self.cache_status_label.setText("已缓存 0 个结果，共 0.0 MB")
+        QMessageBox.information(self, '结果缓存', '结果缓存已清空')
@@ -1,7 +1,11 @@
+import multiprocessing
 import sys
+import time
 import traceback
+
+from utils import startup
 from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLabel
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon, QFont
 
 
@@ -18,8 +22,17 @@ sys.excepthook = handle_exception
 class StartupWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.first_painted = False
         self.initUI()
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_painted:
+            self.first_painted = True
+            print(f"启动计时: 启动窗口已显示，用时 {startup.mark('first_window'):.2f} s")
+            # 用户选择仿真环境期间在后台导入绘图等模块
+            startup.start_preload()
+
     def initUI(self):
         self.setWindowTitle('大气散射特性建模仿真系统')
         self.setGeometry(300, 200, 600, 400)
@@ -95,25 +108,37 @@ class StartupWindow(QMainWindow):
 
     def open_rain_simulation(self):
         try:
+            clicked_at = time.perf_counter()
             from gui.rain_window import RainSimulationWindow
             self.rain_window = RainSimulationWindow()
             self.rain_window.show()
             self.hide()  # 隐藏而不是关闭启动窗口
+            startup.report_window_ready(self.rain_window, 'rain', clicked_at)
         except Exception as e:
             print(f"打开降雨仿真失败: {e}")
             traceback.print_exc()
 
     def open_haze_simulation(self):
         try:
+            clicked_at = time.perf_counter()
             from gui.haze_window import HazeSimulationWindow
             self.haze_window = HazeSimulationWindow()
             self.haze_window.show()
             self.hide()  # 隐藏而不是关闭启动窗口
+            startup.report_window_ready(self.haze_window, 'haze', clicked_at)
         except Exception as e:
             print(f"打开雾霾仿真失败: {e}")
             traceback.print_exc()
 
 
+def start_update_check(window):
+    try:
+        from utils.update_manager import check_updates_on_start
+        check_updates_on_start(window)
+    except Exception as e:
+        print(f"检查更新失败: {e}")
+
+
 def main():
     app = QApplication(sys.argv)
 
@@ -123,17 +148,17 @@ def main():
 
     app.setStyle('Fusion')
 
-    # 检查更新
-    try:
-        from utils.update_manager import check_updates_on_start
-        check_updates_on_start(app)
-    except Exception as e:
-        print(f"检查更新失败: {e}")
+    # 退出前取消并等待后台导出线程
+    from gui.export_progress import cancel_running_exports
+    app.aboutToQuit.connect(cancel_running_exports)
 
     # 显示启动窗口
     try:
         startup_window = StartupWindow()
         startup_window.show()
+
+        # 窗口显示后在后台检查更新，结果通过信号返回
+        QTimer.singleShot(0, lambda: start_update_check(startup_window))
         sys.exit(app.exec_())
     except Exception as e:
         print(f"程序启动失败: {e}")
@@ -142,4 +167,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # 打包后图表导出使用的子进程需要
+    multiprocessing.freeze_support()
     main()
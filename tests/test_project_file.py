@@ -0,0 +1,56 @@
+# tests/test_project_file.py
+# 项目文件的保存/打开往返测试
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.project_file import build_project, open_project_file, save_project_file
+
+
+class ProjectFileRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'project.sim')
+        self.results = {'distances': np.linspace(0.0, 100.0, 11),
+                        'power': np.arange(22, dtype=float).reshape(2, 11),
+                        'eff_range': 42.0}
+        self.task_results = {0: {'power': np.ones(5)}}
+        save_project_file(self.path, build_project('rain', {'wavelength': 1.55}, results=self.results,
+                                                   batch_tasks=[{'name': 'task'}],
+                                                   batch_results=self.task_results))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def assert_project(self, project):
+        results = project.results()
+        for key in ('distances', 'power'):
+            np.testing.assert_array_equal(results[key], self.results[key])
+        self.assertEqual(results['eff_range'], 42.0)
+        tasks, task_results = project.batch()
+        self.assertEqual(tasks, [{'name': 'task'}])
+        np.testing.assert_array_equal(task_results[0]['power'], self.task_results[0]['power'])
+
+    def test_save_to_opened_file(self):
+        """打开项目后保存回同一文件，再次打开内容不变"""
+        project = open_project_file(self.path)
+        results = project.results()
+        # 已映射和尚未读取的数组都要保留
+        self.assertIsInstance(results['distances'], np.memmap)
+        _, task_results = project.batch()
+        save_project_file(self.path, build_project(project.env_type, project.params, results=results,
+                                                   batch_tasks=project.batch()[0],
+                                                   batch_results=task_results))
+        self.assertNotIsInstance(results['distances'], np.memmap)
+        np.testing.assert_array_equal(results['power'], self.results['power'])
+
+        self.assert_project(open_project_file(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
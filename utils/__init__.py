@@ -1,6 +1,20 @@
 # utils/__init__.py
-from .style_utils import setup_chinese_font
-from .export_utils import export_data_to_txt
+# 较重的子模块在首次访问时才导入，导入 utils 包本身不会加载 matplotlib 等依赖
+import importlib
+
 from .version import __version__, get_version_info, compare_versions
 
-__all__ = ['setup_chinese_font', 'export_data_to_txt', '__version__', 'get_version_info', 'compare_versions']
\ No newline at end of file
+_EXPORTS = {
+    'setup_chinese_font': 'style_utils',
+    'export_data_to_txt': 'export_utils',
+}
+
+__all__ = ['setup_chinese_font', 'export_data_to_txt', '__version__', 'get_version_info', 'compare_versions']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
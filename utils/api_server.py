@@ -0,0 +1,604 @@
+# utils/api_server.py
+# 本地仿真服务：asyncio HTTP 服务器，仿真在进程池中计算。其他程序通过 HTTP 调用仿真，
+# 不必各自启动 Python 解释器；参数相同的并发请求只计算一次。
+#
+#   POST /rpc            JSON-RPC 2.0，请求体为数组时按批量请求处理
+#   POST /run            {"env_type": "rain", "params": {...}, "arrays": false}
+#   POST /sweep          {"env_type": "rain", "params": {...}, "sweep": {"rain_rate": [1, 5, 10]}}
+#                        按完成顺序流式返回 JSON lines（分块传输），最后一行为 done
+#   GET  /cache-status
+#   GET  /history?env_type=rain&limit=20&offset=0
+#   GET  /health
+#
+# JSON-RPC 方法 run、sweep、cache_status、history_query 的参数与上面的请求体相同。
+# 可选参数 use_cache (默认 true)、approximate (默认 false)、arrays (返回完整数组，默认 false)。
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.api import ENV_TYPES, prepare_params, run_task, sweep_tasks
+from utils.export_utils import result_scalars, to_json
+from utils.result_cache import ResultCache, make_cache_key
+from utils.settings_manager import SettingsManager, get_data_dir
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_SWEEP_TASKS = 10000
+MAX_HISTORY_LIMIT = 1000
+IDLE_TIMEOUT = 30  # 空闲连接保持的秒数
+
+HTTP_REASONS = {
+    200: 'OK',
+    204: 'No Content',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+# JSON-RPC 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class ApiError(Exception):
+    def __init__(self, message, code=INVALID_PARAMS, status=400):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+def result_payload(results, info, arrays=False):
+    payload = {
+        'params': info['params'],
+        'scalars': result_scalars(results),
+        'cached': info['from_cache'],
+        'interp_error': info['interp_error'],
+        'seconds': info['seconds'],
+        'perf': results.get('perf'),
+    }
+    if arrays:
+        payload['arrays'] = {key: value for key, value in results.items() if isinstance(value, np.ndarray)}
+    return payload
+
+
+def as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+class HistoryReader:
+    """只读访问历史记录文件，文件未变化时复用上次解析的结果"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_data_dir(), 'simulation_history.json')
+        self._mtime = None
+        self._records = []
+        self._lock = threading.Lock()
+
+    def records(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return []
+        with self._lock:
+            if mtime != self._mtime:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._records = json.load(f)
+                self._mtime = mtime
+            return self._records
+
+    def query(self, env_type=None, limit=50, offset=0, record_id=None, include_results=False):
+        """按时间从新到旧返回记录，默认只包含标量结果"""
+        records = self.records()
+        if record_id is not None:
+            records = [r for r in records if r.get('id') == record_id]
+        if env_type:
+            records = [r for r in records if r.get('env_type') == env_type]
+        records = records[::-1]
+        items = []
+        for record in records[offset:offset + limit]:
+            item = {key: record.get(key) for key in ('id', 'timestamp', 'env_type', 'params')}
+            item['pinned'] = bool(record.get('pinned'))
+            results = record.get('results') or {}
+            item['scalars'] = result_scalars(results)
+            item['perf'] = results.get('perf')
+            if include_results:
+                item['results'] = results
+            items.append(item)
+        return {'total': len(records), 'offset': offset, 'records': items}
+
+
+class SimulationService:
+    """本地仿真服务
+
+    max_concurrent 限制同时提交到进程池的仿真数，超出的请求在事件循环中排队；
+    参数相同的请求共用一次计算，所有请求方都断开后取消尚未开始的计算。
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, workers=2, max_concurrent=4, max_batch=64):
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_batch = max(1, max_batch)
+        self.server = None
+        self.executor = None
+        self.semaphore = None
+        self.started_at = None
+        self.history = HistoryReader()
+        self._inflight = {}        # (缓存键, 选项) -> {'task', 'waiters'}
+        self._connections = set()
+        self.stats = {'requests': 0, 'simulations': 0, 'shared': 0, 'cache_hits': 0, 'errors': 0, 'active': 0}
+        self.methods = {
+            'run': self.method_run,
+            'sweep': self.method_sweep,
+            'cache_status': self.method_cache_status,
+            'history_query': self.method_history_query,
+        }
+        # 路径 -> (HTTP 方法, 处理函数)；/sweep 和 /rpc 单独处理
+        self.routes = {
+            '/run': ('POST', self.method_run),
+            '/cache-status': ('GET', self.method_cache_status),
+            '/history': ('GET', self.method_history_query),
+            '/health': ('GET', self.method_health),
+        }
+        # 在创建服务的线程中初始化设置单例，避免首次在线程池中创建
+        SettingsManager.instance()
+
+    @property
+    def address(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        # 端口为 0 时使用系统分配的端口
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.started_at = time.time()
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self.server.wait_closed()
+            self.server = None
+        for entry in list(self._inflight.values()):
+            entry['task'].cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    # ---------------- 仿真 ----------------
+
+    def _simulation_args(self, params):
+        env_type = params.get('env_type')
+        if env_type not in ENV_TYPES:
+            raise ApiError(f"未知的环境类型: {env_type}")
+        sim_params = params.get('params') or {}
+        if not isinstance(sim_params, dict):
+            raise ApiError("params 应为对象")
+        options = {'use_cache': as_bool(params.get('use_cache', True)),
+                   'approximate': as_bool(params.get('approximate', False))}
+        return env_type, sim_params, options
+
+    async def simulate(self, env_type, params, use_cache=True, approximate=False):
+        try:
+            prepared = prepare_params(env_type, params)
+        except (TypeError, ValueError) as e:
+            raise ApiError(str(e))
+
+        key = (make_cache_key(prepared, env_type), use_cache, approximate)
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(self._compute(env_type, prepared, use_cache, approximate))
+            entry = self._inflight[key] = {'task': task, 'waiters': 0}
+            task.add_done_callback(functools.partial(self._computed, key))
+        else:
+            self.stats['shared'] += 1
+        entry['waiters'] += 1
+        try:
+            return await asyncio.shield(entry['task'])
+        finally:
+            entry['waiters'] -= 1
+            # 所有请求方都已断开时不再计算
+            if entry['waiters'] == 0 and not entry['task'].done():
+                entry['task'].cancel()
+
+    async def _compute(self, env_type, params, use_cache, approximate):
+        loop = asyncio.get_running_loop()
+        async with self.semaphore:
+            self.stats['active'] += 1
+            try:
+                results, info = await loop.run_in_executor(self.executor, run_task, env_type, params,
+                                                           use_cache, approximate)
+            except Exception:
+                self.stats['errors'] += 1
+                raise
+            finally:
+                self.stats['active'] -= 1
+        self.stats['simulations'] += 1
+        if info['from_cache']:
+            self.stats['cache_hits'] += 1
+        return results, info
+
+    def _computed(self, key, task):
+        entry = self._inflight.get(key)
+        if entry is not None and entry['task'] is task:
+            del self._inflight[key]
+        # 请求方都已断开时异常无人读取，这里读取以免事件循环报警
+        if not task.cancelled():
+            task.exception()
+
+    def prepare_sweep(self, params):
+        env_type, base_params, options = self._simulation_args(params)
+        sweep = params.get('sweep')
+        if not isinstance(sweep, dict) or not sweep:
+            raise ApiError("sweep 应为 {参数名: [取值, ...]}")
+        for key, values in sweep.items():
+            if not isinstance(values, list) or not values:
+                raise ApiError(f"扫描参数 {key} 的取值应为非空数组")
+        tasks = sweep_tasks(base_params, sweep)
+        if len(tasks) > MAX_SWEEP_TASKS:
+            raise ApiError(f"扫描任务过多: {len(tasks)} (上限 {MAX_SWEEP_TASKS})")
+        return env_type, tasks, options, as_bool(params.get('arrays', False))
+
+    async def iter_sweep(self, env_type, tasks, options, arrays):
+        """按完成顺序产生 result / error 事件，最后产生 done"""
+        started = time.perf_counter()
+
+        async def one(index, params):
+            try:
+                results, info = await self.simulate(env_type, params, **options)
+                return dict(event='result', index=index, **result_payload(results, info, arrays))
+            except Exception as e:
+                return {'event': 'error', 'index': index, 'params': params, 'message': str(e)}
+
+        pending = [asyncio.ensure_future(one(index, params)) for index, params in enumerate(tasks)]
+        failed = 0
+        try:
+            for future in asyncio.as_completed(pending):
+                item = await future
+                failed += item['event'] == 'error'
+                yield item
+        finally:
+            for task in pending:
+                task.cancel()
+        yield {'event': 'done', 'total': len(tasks), 'failed': failed,
+               'seconds': time.perf_counter() - started}
+
+    # ---------------- 方法 ----------------
+
+    async def method_run(self, params):
+        env_type, sim_params, options = self._simulation_args(params)
+        results, info = await self.simulate(env_type, sim_params, **options)
+        return result_payload(results, info, as_bool(params.get('arrays', False)))
+
+    async def method_sweep(self, params):
+        items = [item async for item in self.iter_sweep(*self.prepare_sweep(params))]
+        done = items.pop()
+        done.pop('event')
+        done['results'] = sorted(items, key=lambda item: item['index'])
+        return done
+
+    async def method_cache_status(self, params):
+        loop = asyncio.get_running_loop()
+        # 计算进程写入的文件也计入；目录未变化时不重新扫描
+        status = await loop.run_in_executor(None, ResultCache.instance().refresh)
+        return {
+            'cache': {key: status[key] for key in ('enabled', 'entries', 'size_bytes')},
+            'service': self.service_status(),
+        }
+
+    async def method_history_query(self, params):
+        try:
+            limit = min(int(params.get('limit', 50)), MAX_HISTORY_LIMIT)
+            offset = max(int(params.get('offset', 0)), 0)
+            record_id = int(params['id']) if params.get('id') is not None else None
+        except (TypeError, ValueError):
+            raise ApiError("limit、offset、id 应为整数")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(
+            self.history.query, params.get('env_type'), limit, offset, record_id,
+            as_bool(params.get('include_results', False))))
+
+    async def method_health(self, params):
+        return {'status': 'ok', 'service': self.service_status()}
+
+    def service_status(self):
+        return dict(self.stats,
+                    address=self.address,
+                    uptime=time.time() - self.started_at if self.started_at else 0,
+                    workers=self.workers,
+                    max_concurrent=self.max_concurrent,
+                    pending=len(self._inflight))
+
+    # ---------------- JSON-RPC ----------------
+
+    async def handle_rpc(self, payload):
+        """返回响应对象；批量请求返回数组，全部为通知时返回 None"""
+        if isinstance(payload, list):
+            if not payload:
+                return rpc_error(None, INVALID_REQUEST, "批量请求为空")
+            if len(payload) > self.max_batch:
+                return rpc_error(None, INVALID_REQUEST, f"批量请求最多包含 {self.max_batch} 个调用")
+            # 批量中的调用并发执行，同时计算的数量仍受 max_concurrent 限制
+            responses = await asyncio.gather(*(self.rpc_call(item) for item in payload))
+            return [response for response in responses if response is not None] or None
+        return await self.rpc_call(payload)
+
+    async def rpc_call(self, request):
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' \
+                or not isinstance(request.get('method'), str):
+            return rpc_error(request.get('id') if isinstance(request, dict) else None,
+                             INVALID_REQUEST, "无效的 JSON-RPC 请求")
+        request_id = request.get('id')
+        method = self.methods.get(request['method'])
+        if method is None:
+            return rpc_error(request_id, METHOD_NOT_FOUND, f"未知方法: {request['method']}")
+        params = request.get('params', {})
+        if not isinstance(params, dict):
+            return rpc_error(request_id, INVALID_PARAMS, "params 应为对象")
+        try:
+            result = await method(params)
+        except ApiError as e:
+            return rpc_error(request_id, e.code, str(e))
+        except Exception as e:
+            return rpc_error(request_id, INTERNAL_ERROR, str(e))
+        if 'id' not in request:
+            return None  # 通知不需要响应
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    # ---------------- HTTP ----------------
+
+    async def handle_connection(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+                except ApiError as e:
+                    await send_json(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                self.stats['requests'] += 1
+                await self.dispatch(writer, request)
+                if not request['keep_alive']:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"本地仿真服务处理请求失败: {e}")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def dispatch(self, writer, request):
+        path, keep_alive = request['path'], request['keep_alive']
+        try:
+            if path == '/sweep':
+                self._check_method(request, 'POST')
+                sweep = self.prepare_sweep(parse_body(request['body']))
+                await send_stream(writer, self.iter_sweep(*sweep), keep_alive)
+            elif path == '/rpc':
+                self._check_method(request, 'POST')
+                try:
+                    payload = json.loads(request['body'] or b'null')
+                except ValueError:
+                    await send_json(writer, 200, rpc_error(None, PARSE_ERROR, "请求不是有效的 JSON"), keep_alive)
+                    return
+                response = await self.handle_rpc(payload)
+                if response is None:
+                    await send_json(writer, 204, None, keep_alive)
+                else:
+                    await send_json(writer, 200, response, keep_alive)
+            elif path in self.routes:
+                http_method, handler = self.routes[path]
+                self._check_method(request, http_method)
+                params = request['query'] if http_method == 'GET' else parse_body(request['body'])
+                await send_json(writer, 200, await handler(params), keep_alive)
+            else:
+                raise ApiError(f"未知路径: {path}", status=404)
+        except ApiError as e:
+            await send_json(writer, e.status, {'error': str(e)}, keep_alive)
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            await send_json(writer, 500, {'error': str(e)}, keep_alive)
+
+    def _check_method(self, request, expected):
+        if request['method'] != expected:
+            raise ApiError(f"{request['path']} 只支持 {expected}", status=405)
+
+
+def rpc_error(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+def parse_body(body):
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError:
+        raise ApiError("请求体不是有效的 JSON")
+    if not isinstance(payload, dict):
+        raise ApiError("请求体应为 JSON 对象")
+    return payload
+
+
+async def read_request(reader):
+    """读取一个 HTTP/1.1 请求，连接已关闭时返回 None"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise ApiError("无效的请求行")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise ApiError("请求体需要 Content-Length", status=411)
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise ApiError("无效的 Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise ApiError("请求体过大", status=413)
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+    url = urllib.parse.urlsplit(target)
+    return {
+        'method': method.upper(),
+        'path': url.path.rstrip('/') or '/',
+        'query': dict(urllib.parse.parse_qsl(url.query)),
+        'body': body,
+        'keep_alive': keep_alive,
+    }
+
+
+def response_head(status, content_type, keep_alive, length=None):
+    lines = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+             f"Content-Type: {content_type}; charset=utf-8",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines.append(f"Content-Length: {length}" if length is not None else "Transfer-Encoding: chunked")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def send_json(writer, status, payload, keep_alive):
+    body = to_json(payload).encode('utf-8') if payload is not None else b''
+    writer.write(response_head(status, 'application/json', keep_alive, len(body)) + body)
+    await writer.drain()
+
+
+async def send_stream(writer, items, keep_alive):
+    """分块传输，每个事件一行 JSON，客户端可以边收边处理"""
+    writer.write(response_head(200, 'application/x-ndjson', keep_alive))
+    try:
+        async for item in items:
+            data = (to_json(item) + '\n').encode('utf-8')
+            writer.write(f"{len(data):x}\r\n".encode('latin-1') + data + b'\r\n')
+            await writer.drain()
+    finally:
+        await items.aclose()
+    writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+
+def create_service():
+    """按设置中的 'api' 分组创建服务"""
+    settings = SettingsManager.instance().get('api')
+    return SimulationService(settings['host'], int(settings['port']), int(settings['workers']),
+                             int(settings['max_concurrent']), int(settings['max_batch']))
+
+
+async def serve(service, on_started=None):
+    """运行服务直到被取消（命令行使用）"""
+    await service.start()
+    if on_started is not None:
+        on_started(service)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+
+
+class ApiServerThread(QThread):
+    """在后台线程中运行服务的事件循环，界面通过它启动和停止服务"""
+    server_started = pyqtSignal(str)
+    server_stopped = pyqtSignal()
+    server_error = pyqtSignal(str)
+
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+        self.loop = None
+        self._stop_event = None
+        self._stop_requested = False
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            print(f"本地仿真服务启动失败: {e}")
+            self.server_error.emit(str(e))
+        finally:
+            self.loop.close()
+            self.server_stopped.emit()
+
+    async def _serve(self):
+        self._stop_event = asyncio.Event()
+        try:
+            await self.service.start()
+            self.server_started.emit(self.service.address)
+            if not self._stop_requested:
+                await self._stop_event.wait()
+        finally:
+            await self.service.stop()
+
+    def stop(self):
+        self._stop_requested = True
+        if self.loop is not None and self._stop_event is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # 事件循环已经结束
+
+
+_service_thread = None
+_quit_connected = False
+
+
+def service_thread():
+    """正在运行的服务线程，未运行时返回 None"""
+    if _service_thread is not None and _service_thread.isRunning():
+        return _service_thread
+    return None
+
+
+def start_service():
+    """启动本地仿真服务（已运行时直接返回），程序退出时自动停止"""
+    global _service_thread, _quit_connected
+    if service_thread() is None:
+        from PyQt5.QtWidgets import QApplication
+        _service_thread = ApiServerThread(create_service())
+        app = QApplication.instance()
+        if app is not None and not _quit_connected:
+            app.aboutToQuit.connect(stop_service)
+            _quit_connected = True
+        _service_thread.start()
+    return _service_thread
+
+
+def stop_service(wait_ms=5000):
+    thread = service_thread()
+    if thread is not None:
+        thread.stop()
+        thread.wait(wait_ms)
@@ -0,0 +1,270 @@
+# utils/delta_update.py
+# 增量更新：发布时为安装目录生成文件清单 (相对路径 -> 大小、SHA-256)，
+# 客户端与本地文件比较，只下载内容变化的文件，替换时保留 .bak 用于回滚。
+# 安装目录中的 installed_files.json 记录当前版本的发布文件，更新时只删除其中列出、
+# 新版本已没有的文件，用户放在安装目录中的其他文件不受影响。
+import argparse
+import json
+import os
+import shutil
+import sys
+import urllib.parse
+from datetime import datetime
+
+import requests
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.update_manager import UPDATE_MANIFEST_NAME, DownloadError, ResumableDownload, file_sha256
+
+MANIFEST_FORMAT_VERSION = 1
+
+# 不属于发布内容的目录和文件：用户数据、回滚备份和未完成的下载
+EXCLUDED_DIRS = ("data",)
+EXCLUDED_SUFFIXES = (".bak", ".part", ".part.json")
+
+# 安装目录中当前版本的发布文件列表
+INSTALLED_FILES_NAME = "installed_files.json"
+
+
+def install_root():
+    """打包后的安装目录，开发环境下返回 None（不支持增量更新）"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return None
+
+
+def staging_dir(version):
+    """增量更新文件的下载目录"""
+    from utils.settings_manager import get_data_dir
+    return os.path.join(get_data_dir(), "updates", f"delta_{version}")
+
+
+def _release_files(root):
+    for dir_path, dir_names, file_names in os.walk(root):
+        if dir_path == root:
+            dir_names[:] = [name for name in dir_names if name not in EXCLUDED_DIRS]
+        dir_names.sort()
+        for name in sorted(file_names):
+            if dir_path == root and name == INSTALLED_FILES_NAME:
+                continue
+            if not name.endswith(EXCLUDED_SUFFIXES):
+                path = os.path.join(dir_path, name)
+                yield os.path.relpath(path, root).replace(os.sep, "/"), path
+
+
+def release_paths(root):
+    """目录中属于发布内容的文件，返回相对路径列表"""
+    return [rel_path for rel_path, _ in _release_files(root)]
+
+
+def installed_files(root):
+    """当前安装版本的发布文件列表，没有记录（或无法读取）时返回 None"""
+    try:
+        with open(os.path.join(root, INSTALLED_FILES_NAME), 'r', encoding='utf-8') as f:
+            return list(json.load(f)["files"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_installed_files(root, rel_paths):
+    """记录安装目录中当前版本的发布文件"""
+    try:
+        with open(os.path.join(root, INSTALLED_FILES_NAME), 'w', encoding='utf-8') as f:
+            json.dump({"updated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                       "files": sorted(rel_paths)}, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"写入安装文件列表失败: {e}")
+
+
+def stale_files(root, keep):
+    """上一版本发布、新版本文件列表 keep 中已没有的文件，安装新版本时删除
+
+    只删除 installed_files.json 中列出的文件；没有该记录时不删除任何文件。
+    """
+    previous = installed_files(root)
+    if previous is None:
+        return []
+    keep = set(keep)
+    return sorted(rel_path for rel_path in previous
+                  if rel_path not in keep and os.path.isfile(safe_target(root, rel_path)))
+
+
+def build_update_manifest(root, version, base_url=None):
+    """为打包输出目录生成文件清单"""
+    files = {}
+    for rel_path, path in _release_files(root):
+        files[rel_path] = {"size": os.path.getsize(path), "sha256": file_sha256(path)}
+    return {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "version": version,
+        "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "base_url": base_url,
+        "files": files,
+    }
+
+
+def safe_target(root, rel_path):
+    """清单中的相对路径 -> 安装目录下的路径，拒绝指向安装目录之外的路径"""
+    if os.path.isabs(rel_path) or rel_path.startswith(("/", "\\")):
+        raise DownloadError(f"更新清单包含非法路径: {rel_path}")
+    target = os.path.normpath(os.path.join(root, rel_path))
+    if os.path.commonpath([os.path.abspath(root), os.path.abspath(target)]) != os.path.abspath(root):
+        raise DownloadError(f"更新清单包含非法路径: {rel_path}")
+    return target
+
+
+def changed_files(manifest, root):
+    """比较清单和本地文件，返回需要下载的 [(相对路径, 清单条目), ...]"""
+    changed = []
+    for rel_path, entry in sorted(manifest.get("files", {}).items()):
+        target = safe_target(root, rel_path)
+        # 大小不同时不必计算哈希
+        if (os.path.isfile(target) and os.path.getsize(target) == entry["size"]
+                and file_sha256(target) == entry["sha256"].lower()):
+            continue
+        changed.append((rel_path, entry))
+    return changed
+
+
+def file_url(manifest, manifest_url, rel_path, entry):
+    """单个文件的下载地址：条目中的 url，或相对于 base_url（默认为清单所在目录）"""
+    if entry.get("url"):
+        return entry["url"]
+    base_url = manifest.get("base_url")
+    base_url = base_url.rstrip("/") + "/" if base_url else manifest_url
+    return urllib.parse.urljoin(base_url, urllib.parse.quote(rel_path))
+
+
+class DeltaUpdateDownloader(QThread):
+    """下载增量更新中变化的文件，信号与 UpdateDownloader 相同"""
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool, str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, manifest_url, root, version):
+        super().__init__()
+        self.manifest_url = manifest_url
+        self.root = root
+        self.staging_dir = staging_dir(version)
+        self.changed = []
+        self.removed = []
+        self.release = []  # 新版本的全部发布文件
+        self.download_size = 0
+        self.current = None
+        self.is_cancelled = False
+
+    def cancel(self):
+        self.is_cancelled = True
+        if self.current is not None:
+            self.current.cancel()
+
+    def run(self):
+        try:
+            response = requests.get(self.manifest_url, timeout=30)
+            response.raise_for_status()
+            manifest = response.json()
+            if manifest.get("format_version", 0) > MANIFEST_FORMAT_VERSION:
+                raise DownloadError("更新清单版本过高，请下载完整安装包")
+
+            self.changed = changed_files(manifest, self.root)
+            self.release = sorted(manifest.get("files", {}))
+            self.removed = stale_files(self.root, self.release)
+            self.download_size = sum(entry["size"] for _, entry in self.changed)
+            print(f"增量更新: {len(self.changed)} 个文件变化，共 {self.download_size / 1024 / 1024:.1f} MB")
+
+            finished_size = 0
+            for rel_path, entry in self.changed:
+                if self.is_cancelled:
+                    break
+
+                def on_progress(downloaded, total, offset=finished_size):
+                    if self.download_size:
+                        self.progress.emit(int((offset + downloaded) * 100 / self.download_size))
+
+                self.current = ResumableDownload(
+                    file_url(manifest, self.manifest_url, rel_path, entry),
+                    os.path.join(self.staging_dir, *rel_path.split("/")),
+                    sha256=entry["sha256"], on_progress=on_progress)
+                if self.is_cancelled or not self.current.download():
+                    break
+                finished_size += entry["size"]
+
+            if self.is_cancelled:
+                self.cancelled.emit()
+                return
+            self.progress.emit(100)
+            self.finished.emit(True, "")
+        except Exception as e:
+            if self.is_cancelled:
+                self.cancelled.emit()
+            else:
+                self.finished.emit(False, str(e))
+
+
+def install_delta_update(staging, root, rel_paths, removed=(), release=None):
+    """用下载的文件替换安装目录中的对应文件，并删除新版本中已没有的文件 removed
+
+    原文件改名为 .bak（正在运行的可执行文件也可以改名），任一文件失败时全部还原。
+    release 为新版本的全部发布文件，安装成功后记录到 installed_files.json。
+    """
+    replaced = []
+
+    def backup_target(target):
+        backup = target + ".bak"
+        if os.path.exists(backup):
+            os.remove(backup)
+        os.replace(target, backup)
+        return backup
+
+    try:
+        for rel_path in rel_paths:
+            source = os.path.join(staging, *rel_path.split("/"))
+            target = safe_target(root, rel_path)
+            backup = None
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.exists(target):
+                backup = backup_target(target)
+            replaced.append((target, backup))
+            shutil.move(source, target)
+        for rel_path in removed:
+            target = safe_target(root, rel_path)
+            if os.path.exists(target):
+                replaced.append((target, backup_target(target)))
+    except Exception as e:
+        print(f"安装增量更新失败: {e}")
+        for target, backup in reversed(replaced):
+            try:
+                if os.path.exists(target):
+                    os.remove(target)
+                if backup:
+                    os.replace(backup, target)
+            except OSError as restore_error:
+                print(f"还原文件失败: {target}: {restore_error}")
+        return False
+
+    if release is not None:
+        write_installed_files(root, release)
+    shutil.rmtree(staging, ignore_errors=True)
+    return True
+
+
+def main(argv=None):
+    """发布时生成清单：python -m utils.delta_update dist/AtmScattSim 2.0.3"""
+    parser = argparse.ArgumentParser(description="生成增量更新文件清单")
+    parser.add_argument("root", help="打包输出目录")
+    parser.add_argument("version", help="发布版本号")
+    parser.add_argument("--base-url", help="文件下载地址前缀，默认与清单同目录")
+    parser.add_argument("-o", "--output", default=UPDATE_MANIFEST_NAME, help="清单输出路径")
+    args = parser.parse_args(argv)
+
+    manifest = build_update_manifest(args.root, args.version, args.base_url)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    # 随发布包一起分发，之后的更新据此判断哪些旧文件可以删除
+    write_installed_files(args.root, manifest["files"])
+    total = sum(entry["size"] for entry in manifest["files"].values())
+    print(f"已写入 {args.output}: {len(manifest['files'])} 个文件，共 {total / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# utils/ensemble_stats.py
+# 多条仿真曲线的统计：插值到公共网格后按列计算均值、极值和分位数
+import warnings
+
+import numpy as np
+
+# 公共网格的最大点数
+GRID_POINTS = 2000
+# 分位带使用的百分位数（成对使用，50 为中位数）
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def common_grid(curves, n_points=None):
+    """根据所有曲线的 x 范围生成公共网格
+
+    优先使用所有曲线都覆盖的区间，没有交集时使用并集（区间外为 nan）。
+    """
+    starts = np.array([np.nanmin(x) for x, _ in curves])
+    ends = np.array([np.nanmax(x) for x, _ in curves])
+    x_min, x_max = starts.max(), ends.min()
+    if not x_max > x_min:
+        x_min, x_max = starts.min(), ends.max()
+    if n_points is None:
+        n_points = min(max(x.size for x, _ in curves), GRID_POINTS)
+    return np.linspace(x_min, x_max, max(int(n_points), 2))
+
+
+def resample_curves(curves, grid=None):
+    """把曲线插值到公共网格，返回 (grid, 矩阵[曲线, 网格点])
+
+    所有曲线 x 完全相同时直接堆叠，不做插值。
+    """
+    first_x = curves[0][0]
+    if grid is None and first_x.size <= GRID_POINTS and \
+            all(x.size == first_x.size and np.array_equal(x, first_x) for x, _ in curves):
+        return first_x, np.vstack([y for _, y in curves])
+
+    if grid is None:
+        grid = common_grid(curves)
+    matrix = np.empty((len(curves), grid.size))
+    for i, (x, y) in enumerate(curves):
+        if x.size > 1 and np.any(np.diff(x) < 0):
+            order = np.argsort(x, kind='stable')
+            x, y = x[order], y[order]
+        matrix[i] = np.interp(grid, x, y, left=np.nan, right=np.nan)
+    return grid, matrix
+
+
+def ensemble_statistics(curves, log=False, percentiles=PERCENTILES):
+    """计算多条曲线的统计包络
+
+    curves: [(x, y), ...]
+    log: 对数坐标下的量在 log10 空间统计（均值为几何均值），非正值视为缺失
+
+    返回 dict: grid, mean, min, max, percentiles({百分位: 数组}), count
+    """
+    curves = [(np.asarray(x, dtype=float).ravel(), np.asarray(y, dtype=float).ravel())
+              for x, y in curves]
+    curves = [(x, y) for x, y in curves if x.size and x.size == y.size]
+    if not curves:
+        return None
+
+    grid, matrix = resample_curves(curves)
+    if log:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = np.where(matrix > 0, np.log10(matrix), np.nan)
+
+    # 网格点上全部为 nan 时 nan* 函数会告警，结果保持 nan 即可
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        stats = {
+            'mean': np.nanmean(matrix, axis=0),
+            'min': np.nanmin(matrix, axis=0),
+            'max': np.nanmax(matrix, axis=0),
+        }
+        bands = np.nanpercentile(matrix, percentiles, axis=0)
+
+    stats['percentiles'] = dict(zip(percentiles, bands))
+    if log:
+        stats = {key: ({q: np.power(10.0, v) for q, v in value.items()} if isinstance(value, dict)
+                       else np.power(10.0, value))
+                 for key, value in stats.items()}
+    stats['grid'] = grid
+    stats['count'] = len(curves)
+    return stats
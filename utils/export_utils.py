@@ -1,101 +1,432 @@
 # utils/export_utils.py
+# 仿真数据导出：完整分辨率的数组和元数据，支持 TXT/CSV/NPZ/HDF5/XLSX。
+# 每个导出器按结果逐个写入（write_result），批处理结果可以边算边写，内存占用与结果数量无关。
+import csv
+import io
+import json
+import numbers
 import os
-import numpy as np
+import threading
+import zipfile
 from datetime import datetime
 
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
 
-def export_data_to_txt(simulation_results, parameters, output_widgets, filepath):
-    """导出数据到TXT文件"""
+from utils.version import __version__
+
+# 共用横坐标的数组组成一张表：(表名, 显示名, ((字段, 列标题), ...))，第一列为横坐标
+RESULT_TABLES = (
+    ('range', '距离分布', (('r', '距离(m)'), ('p_received', '回波功率(W)'), ('trans', '双程透过率'))),
+    ('angle', '角散射', (('theta', '散射角(度)'), ('phase_func', '归一化强度'))),
+    ('size', '粒子谱', (('radii', '粒子半径(μm)'), ('size_distribution', '相对数量密度'))),
+)
+
+# 标量结果及其显示名
+RESULT_SCALARS = (
+    ('eff_range', '有效探测距离(m)'),
+    ('alpha', '消光系数(1/m)'),
+    ('beta', '后向散射系数(1/m)'),
+    ('echo_power', '回波功率(W)'),
+    ('interp_error_alpha', '近似插值误差(消光系数)'),
+    ('interp_error_beta', '近似插值误差(后向散射系数)'),
+    ('interp_error_phase_func', '近似插值误差(相函数)'),
+)
+
+# 输入参数显示名和单位
+PARAM_LABELS = {
+    'rain_rate': ('降雨率', 'mm/h'),
+    'temperature': ('温度', 'K'),
+    'visibility': ('能见度', 'km'),
+    'ref_real': ('折射率实部', ''),
+    'ref_imag': ('折射率虚部', ''),
+    'avg_power': ('发射功率', 'W'),
+    'frequency': ('工作频率', 'GHz'),
+    'wavelength': ('波长', 'nm'),
+    'rep_rate': ('重复频率', 'kHz'),
+    'pulse_width': ('脉宽', 'ns'),
+    'aperture_dia': ('接收口径', 'mm'),
+    'system_efficiency': ('系统效率', ''),
+    'max_range': ('探测距离', 'km'),
+    'sensitivity': ('灵敏度', 'dBm'),
+    'sensitivity_watts': ('灵敏度', 'W'),
+}
+
+# 文件扩展名 -> 导出格式
+EXPORT_FORMATS = {
+    '.txt': 'txt',
+    '.csv': 'csv',
+    '.npz': 'npz',
+    '.h5': 'h5',
+    '.hdf5': 'h5',
+    '.xlsx': 'xlsx',
+}
+
+# 保存对话框使用的文件类型过滤器
+EXPORT_FILTERS = ("文本报告 (*.txt);;CSV 表格 (*.csv);;NumPy 数组 (*.npz);;"
+                  "HDF5 (*.h5 *.hdf5);;Excel 工作簿 (*.xlsx)")
+
+
+def export_metadata(env_type, description=None):
+    return {
+        'software': 'AtmScattSim',
+        'version': __version__,
+        'export_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'env_type': env_type,
+        'description': description or '',
+    }
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def to_json(value):
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+def result_tables(results):
+    """按横坐标分组取出完整数组
+
+    返回 [(表名, 显示名, 列标题, 字段, 二维数组)]，长度不一致的列单独成表。
+    """
+    tables = []
+    used = set()
+    for name, label, columns in RESULT_TABLES:
+        x_key = columns[0][0]
+        if results.get(x_key) is None:
+            continue
+        x = np.asarray(results[x_key], dtype=float).ravel()
+        fields, headers, data = [x_key], [columns[0][1]], [x]
+        for key, header in columns[1:]:
+            value = results.get(key)
+            if value is None:
+                continue
+            value = np.asarray(value, dtype=float).ravel()
+            if value.size == x.size:
+                fields.append(key)
+                headers.append(header)
+                data.append(value)
+        used.update(fields)
+        tables.append((name, label, headers, fields, np.column_stack(data)))
+
+    # 其余一维数组各自成表
+    for key, value in results.items():
+        if key in used or not isinstance(value, (np.ndarray, list)):
+            continue
+        value = np.asarray(value)
+        if value.ndim == 1 and value.dtype.kind in 'fiu':
+            tables.append((key, key, [key], [key], value.astype(float).reshape(-1, 1)))
+    return tables
+
+
+def _real_value(value):
+    """实数（含 numpy 标量和 0 维数组）转为 float，其他类型返回 None"""
+    if isinstance(value, np.ndarray) and value.ndim == 0:
+        value = value.item()
+    if isinstance(value, (numbers.Real, np.number)) and not isinstance(value, np.complexfloating):
+        return float(value)
+    return None
+
+
+def result_scalars(results):
+    """标量结果（按 RESULT_SCALARS 的顺序）
+
+    近似缓存结果的 interp_error 为 {'alpha', 'beta', 'phase_func'} 字典，展开为 interp_error_<字段>。
+    """
+    flat = dict(results)
+    interp_error = results.get('interp_error')
+    if isinstance(interp_error, dict):
+        flat.update({f"interp_error_{field}": value for field, value in interp_error.items()})
+    scalars = {}
+    for key, _ in RESULT_SCALARS:
+        value = _real_value(flat.get(key))
+        if value is not None:
+            scalars[key] = value
+    return scalars
+
+
+def format_param(key, value):
+    label, unit = PARAM_LABELS.get(key, (key, ''))
+    return f"{label}: {value}{' ' + unit if unit else ''}"
+
+
+def param_header(key):
+    label, unit = PARAM_LABELS.get(key, (key, ''))
+    return f"{label}({unit})" if unit else label
+
+
+class TextExporter:
+    """文本导出：元数据和参数写成注释行，数组用 np.savetxt 整块写出"""
+    delimiter = '\t'
+    encoding = 'utf-8'
+    comment = '# '
+
+    def __init__(self, path, metadata):
+        self.file = open(path, 'w', encoding=self.encoding, newline='')
+        self._write_comment_block(['仿真数据导出'] + [f"{key}: {value}" for key, value in metadata.items()])
+
+    def _write_comment_block(self, lines):
+        self.file.write(''.join(f"{self.comment}{line}\n" for line in lines))
+
+    def write_result(self, key, params, results):
+        lines = [f"[{key}]"]
+        lines += [f"  {format_param(k, v)}" for k, v in params.items() if not isinstance(v, (dict, list))]
+        labels = dict(RESULT_SCALARS)
+        lines += [f"  {labels[k]} = {v:.10g}" for k, v in result_scalars(results).items()]
+        self.file.write('\n')
+        self._write_comment_block(lines)
+        for _, label, headers, _, matrix in result_tables(results):
+            self._write_comment_block([f"{key} / {label} ({matrix.shape[0]} 行)"])
+            np.savetxt(self.file, matrix, fmt='%.10g', delimiter=self.delimiter,
+                       header=self.delimiter.join(headers), comments='')
+
+    def close(self):
+        self.file.close()
+
+
+class CsvExporter(TextExporter):
+    delimiter = ','
+    # 带 BOM，Excel 打开时中文不乱码
+    encoding = 'utf-8-sig'
+
+
+class NpzExporter:
+    """NPZ 导出：逐个数组写入 zip（与 np.savez 相同的格式），可用 np.load 读取
+
+    数组名为 "<结果>/<字段>"，参数和元数据保存为 JSON 字符串。
+    """
+
+    def __init__(self, path, metadata):
+        self.zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+        self._write('metadata', np.array(to_json(metadata)))
+
+    def _write(self, name, array):
+        with self.zip.open(f"{name}.npy", 'w', force_zip64=True) as f:
+            np.lib.format.write_array(f, np.asanyarray(array), allow_pickle=False)
+
+    def write_result(self, key, params, results):
+        self._write(f"{key}/params", np.array(to_json(params)))
+        for name, value in result_scalars(results).items():
+            self._write(f"{key}/{name}", np.float64(value))
+        for _, _, _, fields, matrix in result_tables(results):
+            for i, field in enumerate(fields):
+                self._write(f"{key}/{field}", matrix[:, i])
+
+    def close(self):
+        self.zip.close()
+
+
+class Hdf5Exporter:
+    """HDF5 导出：每个结果一个组，参数和标量结果保存为组属性"""
+
+    def __init__(self, path, metadata):
+        try:
+            import h5py
+        except ImportError:
+            raise RuntimeError("导出 HDF5 需要安装 h5py")
+        self.file = h5py.File(path, 'w')
+        for name, value in metadata.items():
+            self.file.attrs[name] = str(value)
+
+    def write_result(self, key, params, results):
+        group = self.file.create_group(str(key))
+        group.attrs['params'] = to_json(params)
+        for name, value in result_scalars(results).items():
+            group.attrs[name] = value
+        for _, _, _, fields, matrix in result_tables(results):
+            for i, field in enumerate(fields):
+                group.create_dataset(field, data=matrix[:, i], compression='gzip')
+
+    def close(self):
+        self.file.close()
+
+
+class XlsxExporter:
+    """Excel 导出：openpyxl 只写模式，行数据直接写入临时文件，不在内存中保留整个工作簿
+
+    "结果汇总" 表每个结果一行；每种数组表一个工作表，长格式（第一列为结果名）。
+    """
+    MAX_ROWS = 1048576
+
+    def __init__(self, path, metadata):
+        from openpyxl import Workbook
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        info = self.workbook.create_sheet('导出信息')
+        for name, value in metadata.items():
+            info.append([name, str(value)])
+        self.summary = self.workbook.create_sheet('结果汇总')
+        self.summary_keys = None
+        self.sheets = {}  # 表名 -> [工作表, 已写行数]
+
+    def write_result(self, key, params, results):
+        scalars = result_scalars(results)
+        if self.summary_keys is None:
+            param_keys = [k for k, v in params.items() if not isinstance(v, (dict, list))]
+            self.summary_keys = (param_keys, [k for k, _ in RESULT_SCALARS])
+            labels = dict(RESULT_SCALARS)
+            self.summary.append(['结果'] + [param_header(k) for k in param_keys] +
+                                [labels[k] for k in self.summary_keys[1]])
+        param_keys, scalar_keys = self.summary_keys
+        self.summary.append([str(key)] + [params.get(k) for k in param_keys] +
+                            [scalars.get(k) for k in scalar_keys])
+
+        for name, label, headers, _, matrix in result_tables(results):
+            if name not in self.sheets:
+                sheet = self.workbook.create_sheet(label[:31])
+                sheet.append(['结果'] + headers)
+                self.sheets[name] = [sheet, 1]
+            sheet, rows = self.sheets[name]
+            if rows + matrix.shape[0] > self.MAX_ROWS:
+                raise ValueError(f"工作表 {label} 超出 Excel 最大行数，请改用 CSV/NPZ/HDF5")
+            for row in matrix.tolist():
+                sheet.append([str(key)] + row)
+            self.sheets[name][1] = rows + matrix.shape[0]
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+EXPORTERS = {
+    'txt': TextExporter,
+    'csv': CsvExporter,
+    'npz': NpzExporter,
+    'h5': Hdf5Exporter,
+    'xlsx': XlsxExporter,
+}
+
+
+def export_format(path):
+    return EXPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def export_results(path, entries, metadata, fmt=None, cancel_event=None, on_progress=None):
+    """把 [(结果名, 参数, 结果), ...] 依次写入文件
+
+    先写到临时文件，全部完成后替换目标文件；取消或出错时删除临时文件。
+    返回写入的结果数。
+    """
+    fmt = fmt or export_format(path)
+    if fmt not in EXPORTERS:
+        raise ValueError(f"不支持的导出格式: {path}")
+    tmp_path = f"{path}.part"
+    count = 0
+    exporter = EXPORTERS[fmt](tmp_path, metadata)
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            # 写入文件头部信息
-            f.write("=" * 60 + "\n")
-            f.write("降雨环境下激光散射-传输建模与仿真数据\n")
-            f.write("=" * 60 + "\n")
-            f.write(f"导出时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 60 + "\n\n")
-
-            # 1. 写入输入参数
-            f.write("一、输入参数\n")
-            f.write("-" * 40 + "\n")
-
-            # 降雨环境参数
-            f.write("[降雨环境]\n")
-            f.write(f"  降雨率: {parameters['rain_rate']} mm/h\n")
-            f.write(f"  温度: {parameters['temperature']} K\n")
-            f.write(f"  雨滴谱: Marshall-Palmer\n\n")
-
-            # 系统参数
-            f.write("[系统参数]\n")
-            params_mapping = {
-                'avg_power': '发射功率',
-                'frequency': '工作频率',
-                'rep_rate': '重复频率',
-                'pulse_width': '脉宽',
-                'aperture_dia': '接收口径',
-                'system_efficiency': '系统效率',
-                'max_range': '探测距离',
-                'sensitivity': '灵敏度'
-            }
-
-            for key, display_name in params_mapping.items():
-                value = parameters.get(key, 'N/A')
-                unit = ""
-                if key == 'avg_power':
-                    unit = " W"
-                elif key == 'frequency':
-                    unit = " GHz"
-                elif key == 'rep_rate':
-                    unit = " kHz"
-                elif key == 'pulse_width':
-                    unit = " ns"
-                elif key == 'aperture_dia':
-                    unit = " mm"
-                elif key == 'max_range':
-                    unit = " km"
-                elif key == 'sensitivity':
-                    unit = " dBm"
-
-                f.write(f"  {display_name}: {value}{unit}\n")
-
-            f.write("\n" + "=" * 60 + "\n\n")
-
-            # 2. 写入输出结果
-            f.write("二、仿真结果\n")
-            f.write("-" * 40 + "\n")
-
-            for key, widget in output_widgets.items():
-                if key == 'eff_range':
-                    f.write(f"有效探测距离: {widget.text()} m\n")
-                elif key == 'alpha':
-                    f.write(f"消光系数: {widget.text()} 1/km\n")
-                elif key == 'beta':
-                    f.write(f"后向散射系数: {widget.text()} 1/(km·)\n")
-
-            f.write("\n")
-
-            # 3. 写入详细数据
-            if simulation_results:
-                f.write("三、详细数据\n")
-                f.write("-" * 40 + "\n")
-
-                # 回波强度数据
-                f.write("[回波强度数据 - 关键点]\n")
-                r_data = simulation_results['r']
-                p_data = simulation_results['p_received']
-
-                f.write("距离(m)     功率(W)\n")
-                f.write("-" * 25 + "\n")
-
-                # 均匀采样20个点
-                indices = np.linspace(0, len(r_data) - 1, 20, dtype=int)
-                for idx in indices:
-                    f.write(f"{r_data[idx]:<10.2f} {p_data[idx]:<10.2e}\n")
-
-                f.write("\n" + "=" * 60 + "\n")
-                f.write("数据导出完成\n")
-                f.write("=" * 60 + "\n")
-
-        return True
-    except Exception as e:
-        raise e
+        try:
+            for key, params, results in entries:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                exporter.write_result(key, params, results)
+                count += 1
+                if on_progress is not None:
+                    on_progress(count)
+        finally:
+            exporter.close()
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    if cancel_event is not None and cancel_event.is_set():
+        _remove_quietly(tmp_path)
+        return 0
+    os.replace(tmp_path, path)
+    return count
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def export_data_to_txt(simulation_results, parameters, output_widgets, filepath):
+    """导出单次仿真的完整数据到 TXT 文件（output_widgets 保留兼容，不再使用）"""
+    metadata = export_metadata(parameters.get('env_type', 'rain'))
+    export_results(filepath, [('结果', parameters, simulation_results)], metadata, fmt='txt')
+    return True
+
+
+class BatchResultSink:
+    """批处理结果汇总文件：每个任务结束时追加一行（CSV，按任务序号标识）
+
+    每行一次性写入并立即刷新，运行过程中文件随时可以被其他程序读取；
+    失败的任务同样写入一行，行与任务序号一一对应，不会错位。
+    """
+
+    def __init__(self, path, param_keys):
+        self.path = path
+        self.param_keys = list(param_keys)
+        self.scalar_keys = [key for key, _ in RESULT_SCALARS]
+        self.lock = threading.Lock()
+        self.rows = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 带 BOM，Excel 打开时中文不乱码
+        self.file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._write_row(['task_index', 'status', 'param_key', 'value'] + self.param_keys +
+                        self.scalar_keys + ['cached', 'error'])
+
+    def _write_row(self, row):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(row)
+        with self.lock:
+            self.file.write(buffer.getvalue())
+            self.file.flush()
+
+    def _task_row(self, index, task, status, params):
+        params = params or {}
+        return [index + 1, status, task.get('param_key'), task.get('value')] + \
+            [params.get(key) for key in self.param_keys]
+
+    def append(self, index, task, params, results):
+        scalars = result_scalars(results)
+        self._write_row(self._task_row(index, task, 'completed', params) +
+                        [scalars.get(key) for key in self.scalar_keys] +
+                        [int(bool(task.get('cached'))), ''])
+        self.rows += 1
+
+    def append_failure(self, index, task, params, error):
+        self._write_row(self._task_row(index, task, 'failed', params) +
+                        [None] * len(self.scalar_keys) + [0, str(error)])
+        self.rows += 1
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class DataExportWorker(QThread):
+    """在后台导出数据，接口与 FigureExportWorker 一致"""
+    progress = pyqtSignal(int, int)
+    export_finished = pyqtSignal(list, list)
+
+    def __init__(self, path, entries, metadata, total, fmt=None):
+        super().__init__()
+        self.path = path
+        self.entries = entries
+        self.metadata = metadata
+        self.total = total
+        self.fmt = fmt
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self):
+        self.progress.emit(0, self.total)
+        try:
+            count = export_results(self.path, self.entries, self.metadata, self.fmt, self.cancel_event,
+                                   lambda done: self.progress.emit(done, self.total))
+            self.export_finished.emit([self.path] if count else [], [])
+        except Exception as e:
+            print(f"导出数据失败: {e}")
+            self.export_finished.emit([], [f"{self.path}: {e}"])
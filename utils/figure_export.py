@@ -0,0 +1,137 @@
+# utils/figure_export.py
+# 后台图表导出：界面线程只生成数据快照，绘制和保存在工作进程中并行完成
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.figure_render import CHART_CONFIG, capture_style, chart_snapshot, render_chart
+
+# 并行导出的最大进程数
+MAX_EXPORT_PROCESSES = 4
+
+# 文件名中使用的图表标识
+CHART_IDS = {
+    '粒子谱分布': 'particle_distribution',
+    '后向散射回波强度': 'backscatter',
+    '双程路径透过率': 'transmittance',
+    '仰角-散射强度 (对数)': 'angular_scatter',
+}
+
+
+def sensitivity_to_watts(sensitivity_dbm):
+    return 10 ** ((sensitivity_dbm - 30) / 10)
+
+
+def build_view_jobs(views, save_dir, fmt, name_pattern=None, dpi=300, style=None):
+    """为一组图表快照（chart_view 的内容）生成导出任务
+
+    name_pattern: 文件名模板，可用 {chart_id} 和 {title}，默认 "chart_{chart_id}"
+    """
+    style = capture_style() if style is None else style
+    name_pattern = name_pattern or 'chart_{chart_id}'
+    jobs = []
+    for view in views:
+        filename = name_pattern.format(chart_id=CHART_IDS[view['title']], title=view['title'])
+        jobs.append(dict(view, path=os.path.join(save_dir, f"{filename}.{fmt}"),
+                         format=fmt, dpi=dpi, style=style))
+    return jobs
+
+
+def build_chart_jobs(results, sensitivity_watts, save_dir, fmt, titles=None, name_pattern=None,
+                     dpi=300, show_grid=True, style=None):
+    """为一组结果生成导出任务，参数同 build_view_jobs"""
+    views = [chart_snapshot(title, results, sensitivity_watts, show_grid) for title in titles or CHART_CONFIG]
+    return build_view_jobs(views, save_dir, fmt, name_pattern, dpi, style)
+
+
+def build_bulk_jobs(entries, save_dir, fmt, titles=None, dpi=300, show_grid=True):
+    """批量导出：每个结果一个子目录
+
+    entries: [(子目录名, results, sensitivity_watts), ...]
+    """
+    style = capture_style()
+    jobs = []
+    for name, results, sensitivity_watts in entries:
+        sub_dir = os.path.join(save_dir, name)
+        os.makedirs(sub_dir, exist_ok=True)
+        jobs.extend(build_chart_jobs(results, sensitivity_watts, sub_dir, fmt, titles,
+                                     name_pattern='{chart_id}', dpi=dpi, show_grid=show_grid,
+                                     style=style))
+    return jobs
+
+
+def record_export_entries(records):
+    """历史记录 -> 批量导出条目"""
+    return [(f"record_{record['id']}_{record['env_type']}", record['results'],
+             record['params'].get('sensitivity_watts', 1e-12)) for record in records]
+
+
+class FigureExportWorker(QThread):
+    """在后台导出图表，多个图表时使用进程池并行绘制"""
+    progress = pyqtSignal(int, int)          # 已完成数, 总数
+    export_finished = pyqtSignal(list, list)  # 成功的文件路径, 失败信息
+
+    def __init__(self, jobs, max_workers=None):
+        super().__init__()
+        self.jobs = jobs
+        self.max_workers = max_workers or min(MAX_EXPORT_PROCESSES, os.cpu_count() or 1)
+        self.cancel_event = threading.Event()
+        self.saved = []
+        self.errors = []
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self):
+        total = len(self.jobs)
+        self.progress.emit(0, total)
+        if total == 1 or self.max_workers <= 1:
+            self._run_serial()
+        else:
+            try:
+                self._run_parallel()
+            except OSError as e:
+                # 无法创建子进程时退回当前线程依次导出
+                print(f"启动导出进程失败: {e}")
+                self.saved, self.errors = [], []
+                self._run_serial()
+        self.export_finished.emit(self.saved, self.errors)
+
+    def _run_serial(self):
+        total = len(self.jobs)
+        for i, job in enumerate(self.jobs):
+            if self.cancelled:
+                break
+            try:
+                # 样式与界面当前样式相同，线程内不修改全局 rcParams
+                self.saved.append(render_chart(job, apply_style=False))
+            except Exception as e:
+                self.errors.append(f"{job['path']}: {e}")
+            self.progress.emit(i + 1, total)
+
+    def _run_parallel(self):
+        total = len(self.jobs)
+        context = multiprocessing.get_context('spawn')
+        workers = min(self.max_workers, total)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {executor.submit(render_chart, job): job for job in self.jobs}
+            done = 0
+            for future in as_completed(futures):
+                if self.cancelled:
+                    # 取消尚未开始的任务，正在绘制的图表写完后结束
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                try:
+                    self.saved.append(future.result())
+                except Exception as e:
+                    self.errors.append(f"{futures[future]['path']}: {e}")
+                done += 1
+                self.progress.emit(done, total)
@@ -0,0 +1,158 @@
+# utils/figure_render.py
+# 离屏绘制结果图表：只依赖 matplotlib 的 Figure 和 Agg/PDF/SVG 后端，不依赖 Qt，
+# 可以在工作线程或子进程中根据序列化的数据快照绘制并保存
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# 四个结果图表的绘制配置
+CHART_CONFIG = {
+    '粒子谱分布': {
+        'x': 'radii', 'y': 'size_distribution', 'fmt': 'b-', 'marker': 'o', 'logy': True,
+        'title': '粒子谱分布', 'xlabel': '粒子半径 (μm)', 'ylabel': '相对数量密度'},
+    '后向散射回波强度': {
+        'x': 'r', 'y': 'p_received', 'fmt': 'b-', 'marker': 's', 'logy': True,
+        'title': '后向散射回波强度', 'xlabel': '距离 (m)', 'ylabel': '功率 (W)'},
+    '双程路径透过率': {
+        'x': 'r', 'y': 'trans', 'fmt': 'g-', 'marker': '^', 'logy': False,
+        'title': '双程路径透过率', 'xlabel': '距离 (m)', 'ylabel': '透过率'},
+    '仰角-散射强度 (对数)': {
+        'x': 'theta', 'y': 'phase_func', 'fmt': 'r-', 'marker': 'd', 'logy': True,
+        'title': '仰角-散射强度', 'xlabel': '散射角 (度)', 'ylabel': '归一化强度'},
+}
+
+# 随快照传给子进程的 rcParams 分组（图表样式、字体）
+STYLE_GROUPS = ('axes', 'figure', 'font', 'grid', 'legend', 'lines', 'patch', 'text',
+                'xtick', 'ytick', 'savefig')
+
+
+def capture_style():
+    """记录当前 matplotlib 样式，子进程中按相同样式绘制"""
+    return {key: value for key, value in matplotlib.rcParams.items()
+            if key.split('.')[0] in STYLE_GROUPS}
+
+
+# 对比模式的曲线颜色和标记，与界面上的对比图一致
+COMPARE_COLORS = ('#3498db', '#e74c3c', '#27ae60', '#f39c12', '#9b59b6', '#1abc9c')
+COMPARE_MARKERS = ('o', 's', '^', 'd', 'v', 'p')
+BAND_COLOR = '#3498db'
+
+
+def line_snapshot(x, y, fmt=None, **style):
+    """一条曲线：完整分辨率数据（复制）、matplotlib 格式串和样式参数"""
+    return {'x': np.array(x, dtype=float), 'y': np.array(y, dtype=float), 'fmt': fmt, 'style': style}
+
+
+def band_snapshot(x, low, high, **style):
+    """一条填充带（fill_between）"""
+    return {'x': np.array(x, dtype=float), 'low': np.array(low, dtype=float),
+            'high': np.array(high, dtype=float), 'style': style}
+
+
+def chart_view(title, heading=None, lines=(), bands=(), threshold=None, show_grid=True):
+    """单个图表的绘制内容，xlim / ylim 为 None 时自动计算坐标轴范围"""
+    return {
+        'title': title,
+        'heading': heading or CHART_CONFIG[title]['title'],
+        'lines': list(lines),
+        'bands': list(bands),
+        'threshold': threshold,
+        'show_grid': show_grid,
+        'xlim': None,
+        'ylim': None,
+    }
+
+
+def chart_snapshot(title, results, sensitivity_watts=None, show_grid=True):
+    """从单次结果中取出单个图表需要的数据（复制数组，之后与界面数据无关）"""
+    cfg = CHART_CONFIG[title]
+    x = results.get(cfg['x'])
+    y = results.get(cfg['y'])
+    lines = []
+    if x is not None and y is not None:
+        lines.append(line_snapshot(x, y, cfg['fmt'], linewidth=1.5, marker=cfg['marker'], markersize=1))
+    return chart_view(title, lines=lines,
+                      threshold=sensitivity_watts if title == '后向散射回波强度' else None,
+                      show_grid=show_grid)
+
+
+def overlay_view(title, records):
+    """逐条叠加对比的绘制内容"""
+    cfg = CHART_CONFIG[title]
+    lines = []
+    for i, record in enumerate(records):
+        results = record['results']
+        if cfg['x'] not in results or cfg['y'] not in results:
+            continue
+        lines.append(line_snapshot(results[cfg['x']], results[cfg['y']],
+                                   color=COMPARE_COLORS[i % len(COMPARE_COLORS)], linewidth=1.5,
+                                   marker=COMPARE_MARKERS[i % len(COMPARE_MARKERS)], markersize=1,
+                                   label=f"记录#{record['id']}"))
+    return chart_view(title, f"{cfg['title']}（对比）", lines=lines)
+
+
+def band_view(title, stats):
+    """统计对比的绘制内容，stats 为 ensemble_statistics 的结果（可以为 None）"""
+    cfg = CHART_CONFIG[title]
+    if stats is None:
+        return chart_view(title, f"{cfg['title']}（0 条记录统计）")
+    grid = stats['grid']
+    bands = stats['percentiles']
+    return chart_view(
+        title, f"{cfg['title']}（{stats['count']} 条记录统计）",
+        lines=[line_snapshot(grid, bands[50], color='#1a5276', linewidth=1.5, label='中位数'),
+               line_snapshot(grid, stats['mean'], color='#e74c3c', linewidth=1.2, linestyle='--',
+                             label='均值')],
+        bands=[band_snapshot(grid, low, high, color=BAND_COLOR, alpha=alpha, linewidth=0, label=label)
+               for low, high, alpha, label in ((stats['min'], stats['max'], 0.12, '最小-最大'),
+                                               (bands[10], bands[90], 0.22, 'P10-P90'),
+                                               (bands[25], bands[75], 0.35, 'P25-P75'))])
+
+
+def render_chart(job, apply_style=True):
+    """绘制单个图表并保存到 job['path']，返回保存路径
+
+    job: chart_view / chart_snapshot 的内容加上 path / format / dpi / style
+    """
+    style = job.get('style') if apply_style else None
+    with matplotlib.rc_context(style or {}):
+        cfg = CHART_CONFIG[job['title']]
+        fig = Figure(figsize=(5, 4), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        if cfg['logy']:
+            ax.set_yscale('log')
+
+        for band in job['bands']:
+            ax.fill_between(band['x'], band['low'], band['high'], **band['style'])
+        for line in job['lines']:
+            fmt = (line['fmt'],) if line['fmt'] else ()
+            ax.plot(line['x'], line['y'], *fmt, **line['style'])
+        if not job['lines'] and not job['bands']:
+            ax.text(0.5, 0.5, f"{cfg['title']}数据\n未提供", horizontalalignment='center',
+                    verticalalignment='center', transform=ax.transAxes, fontsize=12)
+
+        if job.get('threshold') is not None:
+            ax.axhline(y=job['threshold'], color='r', linestyle='--', linewidth=1.5, label='噪声阈值')
+        handles, _ = ax.get_legend_handles_labels()
+        if handles:
+            ax.legend(fontsize=8 if len(handles) == 1 else 7, loc='upper right')
+
+        # 界面上缩放后的视图范围
+        if job.get('xlim') is not None:
+            ax.set_xlim(job['xlim'])
+        if job.get('ylim') is not None:
+            ax.set_ylim(job['ylim'])
+
+        ax.set_title(job['heading'], fontsize=11, fontweight='bold', pad=10)
+        ax.set_xlabel(cfg['xlabel'], fontsize=9)
+        ax.set_ylabel(cfg['ylabel'], fontsize=9)
+        ax.tick_params(labelsize=8)
+        if job.get('show_grid', True):
+            ax.grid(True, linestyle='--', alpha=0.7)
+
+        # format 决定使用的后端：png/jpg 为 Agg，pdf/svg 为对应的矢量后端
+        fig.savefig(job['path'], format=job.get('format'), dpi=job.get('dpi', 300),
+                    bbox_inches='tight', facecolor='white')
+    return job['path']
@@ -1,8 +1,12 @@
 import json
 import os
+import queue
+import threading
+import time
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 from PyQt5.QtCore import QObject, pyqtSignal
+from utils.settings_manager import SettingsManager, get_data_dir
 
 
 class NumpyEncoder(json.JSONEncoder):
@@ -18,24 +22,122 @@ class NumpyEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+class HistoryWriter(threading.Thread):
+    """历史记录后台写入线程
+
+    GUI 线程只负责投递保存请求，序列化和磁盘写入都在本线程完成。
+    队列有界，短时间内的多次请求（如批处理）会合并为一次写入。
+    """
+
+    _SAVE = 'save'
+    _STOP = 'stop'
+
+    def __init__(self, write_func, max_pending=16, coalesce_delay=0.2):
+        super().__init__(name='HistoryWriter', daemon=True)
+        self.write_func = write_func
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.coalesce_delay = coalesce_delay
+
+    def request_save(self):
+        """投递保存请求，不阻塞调用线程"""
+        try:
+            self.queue.put_nowait(self._SAVE)
+        except queue.Full:
+            # 队列已满说明已有待处理的请求，写入时会取最新快照，直接合并
+            pass
+
+    def run(self):
+        while True:
+            items = [self.queue.get()]
+            if items[0] != self._STOP and self.coalesce_delay > 0:
+                # 等待一小段时间，收集同一批次的后续请求
+                threading.Event().wait(self.coalesce_delay)
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self.write_func()
+
+            for _ in items:
+                self.queue.task_done()
+            if self._STOP in items:
+                break
+
+    def flush(self):
+        """阻塞直到所有已投递的请求写入磁盘"""
+        if self.is_alive():
+            self.queue.join()
+
+    def stop(self, timeout=None):
+        """写入剩余数据并结束线程"""
+        if self.is_alive():
+            self.queue.put(self._STOP)
+            self.join(timeout)
+
+
 class HistoryManager(QObject):
-    def __init__(self):
+    # 新增记录（用于历史列表增量插入）
+    record_added = pyqtSignal(dict)
+    # 后台保留策略淘汰了记录（参数为被淘汰的记录 id 列表）
+    records_evicted = pyqtSignal(list)
+    # 后台线程读取历史文件完成
+    history_loaded = pyqtSignal()
+
+    # 每次写入最多淘汰的记录数，避免一次淘汰过多阻塞写入线程
+    EVICT_BATCH = 50
+
+    def __init__(self, load_async=True):
+        """load_async: 在后台线程读取历史文件，窗口不必等待；读取完成后发出 history_loaded"""
         super().__init__()
         # 使用绝对路径确保文件路径在不同环境中一致
-        self.history_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'simulation_history.json'))
+        self.history_file = os.path.abspath(os.path.join(get_data_dir(), 'simulation_history.json'))
         self.history = []
+        self._lock = threading.Lock()
+        self._encoded = {}  # 记录 id -> (修改次数, 序列化文本, 字节数)，避免重复序列化未变化的记录
+        self._versions = {}  # 记录 id -> 修改次数，写入线程据此判断缓存的序列化文本是否过期
+        self._loaded = threading.Event()
+        self._next_id = 1
+        self.load_seconds = None
+        self.settings = SettingsManager.instance()
+        self.writer = HistoryWriter(self._write_history)
+        if load_async:
+            threading.Thread(target=self._load, name='HistoryLoader', daemon=True).start()
+        else:
+            self._load()
+        self.writer.start()
+
+    def _load(self):
+        started = time.perf_counter()
         self.load_history()
+        self._next_id = max((r['id'] for r in self.history), default=0) + 1
+        self.load_seconds = time.perf_counter() - started
+        self._loaded.set()
+        self.history_loaded.emit()
+
+    @property
+    def loaded(self):
+        return self._loaded.is_set()
+
+    def wait_loaded(self, timeout=None):
+        """修改记录前等待读取完成，避免新记录被读入的文件内容覆盖"""
+        return self._loaded.wait(timeout)
 
     def add_record(self, params, results, env_type):
+        self.wait_loaded()
         record = {
-            'id': len(self.history) + 1,
+            'id': self._next_id,
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'env_type': env_type,
             'params': params,
             'results': results
         }
-        self.history.append(record)
+        self._next_id += 1
+        with self._lock:
+            self.history.append(record)
         self.save_history()
+        self.record_added.emit(record)
         return record['id']
 
     def get_record(self, record_id):
@@ -50,22 +152,166 @@ class HistoryManager(QObject):
     def get_records_by_type(self, env_type):
         return [r for r in self.history if r['env_type'] == env_type]
 
+    def mark_viewed(self, record_id):
+        """更新记录的最近查看时间，淘汰时优先保留最近查看过的记录"""
+        self._update_record(record_id, last_viewed=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    def set_pinned(self, record_id, pinned):
+        """固定的记录不会被保留策略淘汰"""
+        self._update_record(record_id, pinned=bool(pinned))
+
+    def _update_record(self, record_id, **fields):
+        self.wait_loaded()
+        record = self.get_record(record_id)
+        if record is None:
+            return
+        with self._lock:
+            record.update(fields)
+            self._encoded.pop(record_id, None)
+            self._versions[record_id] = self._versions.get(record_id, 0) + 1
+        self.save_history()
+
     def delete_record(self, record_id):
-        self.history = [r for r in self.history if r['id'] != record_id]
+        self.delete_records([record_id])
+
+    def delete_records(self, record_ids):
+        self.wait_loaded()
+        record_ids = set(record_ids)
+        with self._lock:
+            self.history = [r for r in self.history if r['id'] not in record_ids]
+            for record_id in record_ids:
+                self._encoded.pop(record_id, None)
+                self._versions.pop(record_id, None)
         self.save_history()
 
     def clear_all(self):
-        self.history = []
+        self.wait_loaded()
+        with self._lock:
+            self.history = []
+            self._encoded = {}
+            self._versions = {}
         self.save_history()
 
     def save_history(self):
+        """请求保存历史记录，实际写入由后台线程完成"""
+        if self.writer.is_alive():
+            self.writer.request_save()
+        else:
+            self._write_history()
+
+    def flush(self):
+        """等待所有待写入的历史记录落盘"""
+        self.writer.flush()
+
+    def close(self):
+        """窗口关闭时调用，保证历史记录全部写入后再退出"""
+        self.writer.stop()
+
+    def _encode_record(self, record, version):
+        """序列化写入快照中的记录副本，返回 (文本, 字节数)
+
+        version 为取快照时记录的修改次数；序列化期间记录又被修改时不缓存，避免写入过期内容。
+        """
+        with self._lock:
+            cached = self._encoded.get(record['id'])
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        text = json.dumps(record, indent=2, ensure_ascii=False, cls=NumpyEncoder)
+        # 与 json.dump(list, indent=2) 的输出保持一致：每行缩进两格
+        text = '  ' + text.replace('\n', '\n  ')
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            if self._versions.get(record['id'], 0) == version:
+                self._encoded[record['id']] = (version, text, size)
+        return text, size
+
+    def _apply_retention(self, snapshot, versions):
+        """按保留策略淘汰记录（最近最少查看的优先，固定记录除外）
+
+        每次最多淘汰 EVICT_BATCH 条，返回 (保留的记录, 淘汰的 id, 是否还需继续淘汰)。
+        """
+        policy = self.settings.get('history')
+        max_records = int(policy.get('max_records') or 0)
+        max_bytes = int(float(policy.get('max_size_mb') or 0) * 1024 * 1024)
+        max_age_days = float(policy.get('max_age_days') or 0)
+
+        candidates = [r for r in snapshot if not r.get('pinned')]
+        # 从未查看过的记录以创建时间作为最近查看时间
+        candidates.sort(key=lambda r: r.get('last_viewed') or r['timestamp'])
+
+        evicted = set()
+        if max_age_days > 0:
+            cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+            for r in candidates:
+                if r['timestamp'] < cutoff:
+                    evicted.add(r['id'])
+
+        if max_records > 0:
+            excess = len(snapshot) - len(evicted) - max_records
+            for r in candidates:
+                if excess <= 0:
+                    break
+                if r['id'] not in evicted:
+                    evicted.add(r['id'])
+                    excess -= 1
+
+        if max_bytes > 0:
+            total = sum(self._encode_record(r, versions[r['id']])[1]
+                        for r in snapshot if r['id'] not in evicted)
+            for r in candidates:
+                if total <= max_bytes:
+                    break
+                if r['id'] not in evicted:
+                    evicted.add(r['id'])
+                    total -= self._encode_record(r, versions[r['id']])[1]
+
+        if not evicted:
+            return snapshot, [], False
+
+        # 按淘汰顺序只取一批，剩余的留给下一次写入
+        batch = [r['id'] for r in candidates if r['id'] in evicted][:self.EVICT_BATCH]
+        batch_set = set(batch)
+        kept = [r for r in snapshot if r['id'] not in batch_set]
+        return kept, batch, len(evicted) > len(batch)
+
+    def _write_history(self):
+        # 读取完成前写入会用空列表覆盖历史文件
+        self.wait_loaded()
+        # 记录可能同时在界面线程中被修改（查看时间、固定），在锁内复制，之后只读副本
+        with self._lock:
+            snapshot = [dict(r) for r in self.history]
+            versions = {r['id']: self._versions.get(r['id'], 0) for r in snapshot}
+
+        try:
+            kept, evicted_ids, more = self._apply_retention(snapshot, versions)
+        except Exception as e:
+            print(f"应用历史记录保留策略失败: {e}")
+            kept, evicted_ids, more = snapshot, [], False
+
+        if evicted_ids:
+            evicted_set = set(evicted_ids)
+            with self._lock:
+                self.history = [r for r in self.history if r['id'] not in evicted_set]
+                for record_id in evicted_ids:
+                    self._encoded.pop(record_id, None)
+                    self._versions.pop(record_id, None)
+
+        tmp_file = self.history_file + '.tmp'
         try:
             os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, indent=2, ensure_ascii=False, cls=NumpyEncoder)
+            body = ',\n'.join(self._encode_record(r, versions[r['id']])[0] for r in kept)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write('[\n' + body + '\n]' if body else '[]')
+            # 先写临时文件再替换，避免写入中途退出导致历史文件损坏
+            os.replace(tmp_file, self.history_file)
         except Exception as e:
             print(f"保存历史记录失败: {e}")
 
+        if evicted_ids:
+            self.records_evicted.emit(evicted_ids)
+        if more:
+            self.writer.request_save()
+
     def load_history(self):
         try:
             if os.path.exists(self.history_file):
@@ -0,0 +1,125 @@
+# utils/profiling.py
+# 按需深度分析：用 cProfile 记录函数耗时、tracemalloc 记录内存分配，
+# 结果保存在 data/profiles/<时间>_<名称>/ 下：
+#   run.prof         cProfile 数据，可用 snakeviz / python -m pstats 查看
+#   memory.snapshot  tracemalloc 快照，可用 tracemalloc.Snapshot.load 读取
+#   report.txt       按累计耗时排序的函数列表
+#   summary.json     热点摘要（分析结果对话框使用）
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from datetime import datetime
+
+from utils.settings_manager import get_data_dir
+
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+TRACEMALLOC_FRAMES = 5
+
+
+def profiles_dir():
+    return os.path.join(get_data_dir(), 'profiles')
+
+
+def _function_name(key):
+    file_name, line, name = key
+    if file_name == '~':
+        return name  # 内置函数
+    return f"{name} ({os.path.basename(file_name)}:{line})"
+
+
+def function_rows(stats, sort_key, limit=TOP_FUNCTIONS):
+    """pstats.Stats -> [{'function', 'calls', 'tottime', 'cumtime'}, ...]，按 sort_key 降序"""
+    rows = []
+    for key, (primitive_calls, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({'function': _function_name(key), 'calls': calls,
+                     'tottime': tottime, 'cumtime': cumtime})
+    rows.sort(key=lambda row: row[sort_key], reverse=True)
+    return rows[:limit]
+
+
+class ProfileCapture:
+    """记录一次运行的函数耗时和内存分配
+
+    cProfile 只记录启用它的线程，需要在计算线程中使用；tracemalloc 记录所有线程的分配。
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.summary = None
+
+    def __enter__(self):
+        self._own_tracemalloc = not tracemalloc.is_tracing()
+        if self._own_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        self.profiler = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.disable()
+        seconds = time.perf_counter() - self.started
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+        try:
+            self.summary = self.save(snapshot, seconds, peak)
+        except Exception as e:
+            print(f"保存性能分析结果失败: {e}")
+        return False
+
+    def save(self, snapshot, seconds, peak_bytes):
+        directory = os.path.join(profiles_dir(), f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.name}")
+        os.makedirs(directory, exist_ok=True)
+        self.profiler.dump_stats(os.path.join(directory, 'run.prof'))
+        snapshot.dump(os.path.join(directory, 'memory.snapshot'))
+
+        report = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=report)
+        stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS * 2)
+        with open(os.path.join(directory, 'report.txt'), 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+
+        # 快照为结束时仍未释放的内存（峰值见 peak_memory），不统计分析工具本身的分配
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        allocations = [{'location': str(stat.traceback[0]), 'size': stat.size, 'count': stat.count}
+                       for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]]
+
+        summary = {
+            'name': self.name,
+            'directory': directory,
+            'seconds': seconds,
+            'peak_memory': peak_bytes,
+            'hotspots': function_rows(stats, 'tottime'),
+            'cumulative': function_rows(stats, 'cumtime'),
+            'allocations': allocations,
+        }
+        with open(os.path.join(directory, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
+
+
+def profile_if(name):
+    """name 为空时不做分析，返回的上下文对象为 None"""
+    return ProfileCapture(name) if name else contextlib.nullcontext()
+
+
+def link_history_record(summary, record_id, env_type):
+    """在分析目录中记录对应的历史记录"""
+    try:
+        with open(os.path.join(summary['directory'], 'record.json'), 'w', encoding='utf-8') as f:
+            json.dump({'record_id': record_id, 'env_type': env_type}, f)
+    except OSError as e:
+        print(f"保存性能分析结果失败: {e}")
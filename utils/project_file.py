@@ -0,0 +1,293 @@
+# utils/project_file.py
+# .sim 项目文件：zip 容器，project.json 保存参数/设置/任务等 JSON 数据，
+# 数组以不压缩的 .npy 成员保存。打开时只读取目录和 JSON，数组在首次访问时
+# 以内存映射方式直接映射 zip 中的数据区，绘图或导出用到时才真正读入。
+import json
+import os
+import struct
+import threading
+import time
+import zipfile
+from collections.abc import MutableMapping
+from datetime import datetime
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.version import __version__
+
+PROJECT_FORMAT = 'AtmScattSim project'
+PROJECT_FORMAT_VERSION = 1
+PROJECT_MANIFEST = 'project.json'
+
+# zip 本地文件头的固定长度和签名
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+
+def split_results(results):
+    """把结果拆成可 JSON 序列化的标量和数组两部分"""
+    scalars, arrays = {}, {}
+    for key, value in results.items():
+        array = np.asarray(value) if isinstance(value, (np.ndarray, list, tuple)) else None
+        if array is not None and array.ndim > 0 and not array.dtype.hasobject:
+            arrays[key] = array
+        elif isinstance(value, np.generic):
+            scalars[key] = value.item()
+        else:
+            scalars[key] = value
+    return scalars, arrays
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class LazyResults(MutableMapping):
+    """延迟加载的结果字典：数组在第一次访问时才从项目文件中映射"""
+
+    def __init__(self, project, prefix, array_names, scalars):
+        self.project = project
+        self.prefix = prefix
+        self.array_names = set(array_names)
+        self.values = dict(scalars)
+
+    def __getitem__(self, key):
+        if key not in self.values:
+            if key not in self.array_names:
+                raise KeyError(key)
+            self.values[key] = self.project.array(f"{self.prefix}/{key}")
+        return self.values[key]
+
+    def __setitem__(self, key, value):
+        self.values[key] = value
+
+    def __delitem__(self, key):
+        if key not in self.values and key not in self.array_names:
+            raise KeyError(key)
+        self.values.pop(key, None)
+        self.array_names.discard(key)
+
+    def __contains__(self, key):
+        return key in self.values or key in self.array_names
+
+    def __iter__(self):
+        yield from self.values
+        for key in self.array_names:
+            if key not in self.values:
+                yield key
+
+    def __len__(self):
+        return len(self.array_names | set(self.values))
+
+    def materialize(self):
+        """把全部数组读入内存，不再引用项目文件（保存回原文件前调用）"""
+        for key in self.array_names:
+            value = self.values[key] if key in self.values else self.project.array(f"{self.prefix}/{key}")
+            if isinstance(value, np.memmap) or key not in self.values:
+                self.values[key] = np.array(value)
+        self.array_names = set()
+
+
+class ProjectFile:
+    """已打开的 .sim 项目（只读）"""
+
+    def __init__(self, path):
+        self.path = path
+        with zipfile.ZipFile(path, 'r') as zf:
+            self.members = {info.filename: info for info in zf.infolist()}
+            manifest = json.loads(zf.read(PROJECT_MANIFEST).decode('utf-8'))
+        if manifest.get('format') != PROJECT_FORMAT:
+            raise ValueError('不是有效的仿真项目文件')
+        if manifest.get('format_version', 0) > PROJECT_FORMAT_VERSION:
+            raise ValueError('项目文件由更高版本的程序创建，请先升级')
+        self.manifest = manifest
+        self.lock = threading.Lock()
+
+    @property
+    def env_type(self):
+        return self.manifest.get('env_type', 'rain')
+
+    @property
+    def params(self):
+        return self.manifest.get('params', {})
+
+    @property
+    def settings(self):
+        return self.manifest.get('settings', {})
+
+    def results(self):
+        """当前结果，没有时返回 None"""
+        entry = self.manifest.get('result')
+        if entry is None:
+            return None
+        return LazyResults(self, 'result', entry['arrays'], entry['scalars'])
+
+    def batch(self):
+        """批处理任务和结果：(任务列表, {任务序号: 结果})"""
+        entry = self.manifest.get('batch')
+        if entry is None:
+            return [], {}
+        task_results = {int(index): LazyResults(self, f"batch/{index}", item['arrays'], item['scalars'])
+                        for index, item in entry['results'].items()}
+        return entry['tasks'], task_results
+
+    def array(self, name):
+        """按名称取数组；未压缩的成员直接内存映射，否则读入内存"""
+        info = self.members[f"{name}.npy"]
+        if info.compress_type != zipfile.ZIP_STORED:
+            with zipfile.ZipFile(self.path, 'r') as zf, zf.open(info) as f:
+                return np.lib.format.read_array(f, allow_pickle=False)
+
+        with self.lock, open(self.path, 'rb') as f:
+            f.seek(info.header_offset)
+            header = f.read(_LOCAL_HEADER_SIZE)
+            if header[:4] != _LOCAL_HEADER_SIGNATURE:
+                raise ValueError(f"项目文件已损坏: {name}")
+            name_length, extra_length = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+
+        if dtype.hasobject:
+            raise ValueError(f"项目文件包含不支持的数组类型: {name}")
+        if not shape or 0 in shape:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                         order='F' if fortran_order else 'C')
+
+
+def open_project_file(path):
+    return ProjectFile(path)
+
+
+def build_project(env_type, params, results=None, batch_tasks=None, batch_results=None, settings=None):
+    """整理要保存的项目内容"""
+    return {
+        'env_type': env_type,
+        'params': dict(params),
+        'settings': settings or {},
+        'results': results,
+        'batch_tasks': batch_tasks or [],
+        'batch_results': batch_results or {},
+    }
+
+
+def _project_arrays(project):
+    """(成员名, 数组) 列表和写入 project.json 的清单"""
+    arrays = []
+    manifest = {
+        'format': PROJECT_FORMAT,
+        'format_version': PROJECT_FORMAT_VERSION,
+        'app_version': __version__,
+        'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'env_type': project['env_type'],
+        'params': project['params'],
+        'settings': project['settings'],
+        'result': None,
+        'batch': None,
+    }
+
+    def add_results(prefix, results):
+        scalars, result_arrays = split_results(results)
+        arrays.extend((f"{prefix}/{key}", value) for key, value in result_arrays.items())
+        return {'scalars': scalars, 'arrays': sorted(result_arrays)}
+
+    if project['results'] is not None:
+        manifest['result'] = add_results('result', project['results'])
+    if project['batch_tasks'] or project['batch_results']:
+        tasks = [{key: value for key, value in task.items() if key != 'cached'}
+                 for task in project['batch_tasks']]
+        manifest['batch'] = {
+            'tasks': tasks,
+            'results': {str(index): add_results(f"batch/{index}", results)
+                        for index, results in sorted(project['batch_results'].items())},
+        }
+    return manifest, arrays
+
+
+def _release_mappings(path, project):
+    """保存到打开时的同一文件前，把映射该文件的数组读入内存
+
+    否则替换文件时映射仍然存在（Windows 上替换会失败），
+    之后延迟读取的数组也会按旧的偏移读取新文件。
+    """
+    if not os.path.exists(path):
+        return
+    for results in [project['results'], *project['batch_results'].values()]:
+        if isinstance(results, LazyResults) and os.path.samefile(results.project.path, path):
+            results.materialize()
+
+
+def save_project_file(path, project, cancel_event=None, on_progress=None):
+    """保存项目：先写临时文件，完成后替换目标文件；取消时返回 False"""
+    _release_mappings(path, project)
+    manifest, arrays = _project_arrays(project)
+    tmp_path = f"{path}.part"
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for i, (name, array) in enumerate(arrays):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                # 数组不压缩，打开项目时才能直接内存映射
+                with zf.open(f"{name}.npy", 'w', force_zip64=True) as f:
+                    np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+                if on_progress is not None:
+                    on_progress(i + 1, len(arrays) + 1)
+            else:
+                zf.writestr(zipfile.ZipInfo(PROJECT_MANIFEST, time.localtime()[:6]),
+                            json.dumps(manifest, ensure_ascii=False, indent=2, default=_json_default),
+                            compress_type=zipfile.ZIP_DEFLATED)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    if cancel_event is not None and cancel_event.is_set():
+        _remove_quietly(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    if on_progress is not None:
+        on_progress(len(arrays) + 1, len(arrays) + 1)
+    return True
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ProjectSaveWorker(QThread):
+    """在后台保存项目，接口与导出线程一致"""
+    progress = pyqtSignal(int, int)
+    export_finished = pyqtSignal(list, list)
+
+    def __init__(self, path, project):
+        super().__init__()
+        self.path = path
+        self.project = project
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self):
+        try:
+            saved = save_project_file(self.path, self.project, self.cancel_event,
+                                      lambda done, total: self.progress.emit(done, total))
+            self.export_finished.emit([self.path] if saved else [], [])
+        except Exception as e:
+            print(f"保存项目失败: {e}")
+            self.export_finished.emit([], [f"{self.path}: {e}"])
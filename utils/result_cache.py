@@ -0,0 +1,460 @@
+# utils/result_cache.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.settings_manager import SettingsManager, get_data_dir
+from utils.version import __version__
+
+# 缓存格式版本，结果字典结构或物理模型改变时需要递增
+CACHE_SCHEMA = 1
+
+# 由其他参数推导出的键，不参与缓存键计算
+DERIVED_PARAM_KEYS = ('env_type', 'sensitivity_watts')
+
+# 近似复用时插值的微物理量（雷达信号由调用方按当前系统参数重新计算）
+MICROPHYSICS_FIELDS = ('alpha', 'beta', 'radii', 'size_distribution', 'theta', 'phase_func')
+
+# 只属于某一次计算的元数据（耗时统计、插值误差），不写入缓存
+RUN_METADATA_KEYS = ('perf', 'interp_error')
+
+# 近似复用时最多参与插值的近邻数
+APPROX_NEIGHBOURS = 2
+
+
+_LIBRARY_VERSIONS = None
+
+
+def _library_versions():
+    """参与缓存键计算的依赖库版本（只查询一次）"""
+    global _LIBRARY_VERSIONS
+    if _LIBRARY_VERSIONS is None:
+        versions = {'numpy': np.__version__}
+        try:
+            from importlib.metadata import version
+            versions['PyMieScatt'] = version('PyMieScatt')
+        except Exception:
+            versions['PyMieScatt'] = 'unknown'
+        _LIBRARY_VERSIONS = versions
+    return _LIBRARY_VERSIONS
+
+
+def normalize_params(params):
+    """规范化参数：去掉推导量，数值统一为浮点并保留 12 位有效数字"""
+    normalized = {}
+    for key, value in params.items():
+        if key in DERIVED_PARAM_KEYS:
+            continue
+        if isinstance(value, (bool, np.bool_)):
+            normalized[key] = bool(value)
+        elif isinstance(value, (int, float, np.integer, np.floating)):
+            normalized[key] = format(float(value), '.12g')
+        else:
+            normalized[key] = str(value)
+    return normalized
+
+
+def make_cache_key(params, env_type):
+    """根据规范化参数、环境类型和代码/库版本计算内容哈希"""
+    payload = {
+        'schema': CACHE_SCHEMA,
+        'version': __version__,
+        'libs': _library_versions(),
+        'env_type': env_type,
+        'params': normalize_params(params),
+    }
+    text = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """仿真结果缓存（全局单例）
+
+    结果以 npz 文件按内容哈希存放在 data/result_cache 下，按总大小做 LRU 淘汰；
+    最近使用的结果同时保存在内存中，重复参数可以直接返回。
+    catalog.jsonl 记录每个缓存项的参数，用于近似模式下查找参数相近的结果。
+    """
+    MEMORY_ENTRIES = 64
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        # 可能同时被多个工作线程首次调用
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(get_data_dir(), 'result_cache')
+        self.settings = SettingsManager.instance()
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> 结果字典
+        self._index = OrderedDict()   # key -> 文件字节数，按最近使用排序
+        self._total_bytes = 0
+        self._catalog = {}            # key -> (env_type, 数值参数)
+        self._dir_mtime = None        # 上次扫描时缓存目录的修改时间
+        self.hits = 0
+        self.approx_hits = 0
+        self.misses = 0
+        self._load_index()
+        self._load_catalog()
+
+    @property
+    def enabled(self):
+        return bool(self.settings.get('cache', 'enabled'))
+
+    @property
+    def approximate_enabled(self):
+        return self.enabled and bool(self.settings.get('cache', 'approximate'))
+
+    @property
+    def catalog_file(self):
+        return os.path.join(self.cache_dir, 'catalog.jsonl')
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def _scan_dir(self):
+        """返回缓存目录中的 [(修改时间, key, 字节数), ...]"""
+        entries = []
+        try:
+            if os.path.isdir(self.cache_dir):
+                self._dir_mtime = os.stat(self.cache_dir).st_mtime_ns
+                for entry in os.scandir(self.cache_dir):
+                    # 跳过写入中断留下的临时文件
+                    if entry.is_file() and entry.name.endswith('.npz') and '.tmp' not in entry.name:
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        except Exception as e:
+            print(f"读取结果缓存目录失败: {e}")
+        return entries
+
+    def _load_index(self):
+        """扫描缓存目录，按修改时间恢复 LRU 顺序"""
+        for _, key, size in sorted(self._scan_dir()):
+            self._index[key] = size
+            self._total_bytes += size
+
+    def refresh(self):
+        """同步其他进程（命令行、本地服务的进程池）写入或删除的缓存文件，返回 status()
+
+        只在缓存目录的修改时间变化时扫描目录，不读取目录文件 (catalog)，也不重写。
+        """
+        try:
+            mtime = os.stat(self.cache_dir).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime != self._dir_mtime:
+            sizes = {key: size for _, key, size in sorted(self._scan_dir())}
+            with self._lock:
+                # 扫描之后本进程刚写入的文件不在 sizes 中，以文件是否存在为准
+                removed = [key for key in self._index
+                           if key not in sizes and not os.path.exists(self._path(key))]
+                for key in removed:
+                    self._total_bytes -= self._index.pop(key)
+                    self._memory.pop(key, None)
+                    self._catalog.pop(key, None)
+                for key, size in sizes.items():
+                    if key not in self._index:
+                        self._index[key] = size
+                        self._total_bytes += size
+        return self.status()
+
+    def _load_catalog(self):
+        stale = 0
+        try:
+            if os.path.exists(self.catalog_file):
+                with open(self.catalog_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            stale += 1
+                            continue
+                        if entry['key'] in self._index:
+                            self._catalog[entry['key']] = (entry['env_type'], entry['params'])
+                        else:
+                            stale += 1
+        except Exception as e:
+            print(f"读取结果缓存目录失败: {e}")
+        # 已淘汰的条目较多时重写目录文件
+        if stale > len(self._catalog):
+            self._rewrite_catalog()
+
+    def _rewrite_catalog(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = self.catalog_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for key, (env_type, params) in self._catalog.items():
+                    f.write(json.dumps({'key': key, 'env_type': env_type, 'params': params}) + '\n')
+            os.replace(tmp_file, self.catalog_file)
+        except Exception as e:
+            print(f"写入结果缓存目录失败: {e}")
+
+    def _append_catalog(self, key, env_type, params):
+        numeric = {}
+        for name, value in params.items():
+            if name in DERIVED_PARAM_KEYS or isinstance(value, (bool, np.bool_)):
+                continue
+            if isinstance(value, (int, float, np.integer, np.floating)):
+                numeric[name] = float(value)
+        self._catalog[key] = (env_type, numeric)
+        try:
+            with open(self.catalog_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'key': key, 'env_type': env_type, 'params': numeric}) + '\n')
+        except Exception as e:
+            print(f"写入结果缓存目录失败: {e}")
+
+    def get(self, params, env_type):
+        """查询缓存，未命中返回 None"""
+        if not self.enabled:
+            return None
+        key = make_cache_key(params, env_type)
+        with self._lock:
+            results = self._memory.get(key)
+            if results is not None:
+                self._memory.move_to_end(key)
+                if key in self._index:
+                    self._index.move_to_end(key)
+                self.hits += 1
+                return dict(results)
+            indexed = key in self._index
+
+        # 不在索引中的文件可能是其他进程（命令行、本地服务的进程池）写入的
+        if not indexed and not os.path.isfile(self._path(key)):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        results = self._read(key)
+        with self._lock:
+            if results is None:
+                self._discard(key)
+                self.misses += 1
+                return None
+            if key not in self._index:
+                try:
+                    size = os.path.getsize(self._path(key))
+                except OSError:
+                    size = 0
+                self._index[key] = size
+                self._total_bytes += size
+            self._index.move_to_end(key)
+            self._remember(key, results)
+            self.hits += 1
+        try:
+            # 更新修改时间，下次启动时保持 LRU 顺序
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        return dict(results)
+
+    def put(self, params, env_type, results):
+        """写入缓存（在工作线程中调用）"""
+        if not self.enabled:
+            return
+        key = make_cache_key(params, env_type)
+        frozen = self._freeze({name: value for name, value in results.items() if name not in RUN_METADATA_KEYS})
+        path = self._path(key)
+        tmp_path = path + '.tmp.npz'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 不压缩，读取时无需解压
+            np.savez(tmp_path, **frozen)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except Exception as e:
+            print(f"写入结果缓存失败: {e}")
+            return
+
+        with self._lock:
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            self._index[key] = size
+            self._total_bytes += size
+            self._remember(key, frozen)
+            if key not in self._catalog:
+                self._append_catalog(key, env_type, params)
+            self._evict()
+
+    def get_approximate(self, params, env_type, microphysics_params):
+        """近似模式：在容差范围内查找参数相近的缓存结果并插值微物理量
+
+        microphysics_params 为决定微物理量的参数名；容差为 0 的参数必须完全相同。
+        其余参数（发射功率、脉宽等）不影响微物理量，可以任意不同。
+        返回 (微物理量字典, 误差估计字典)，找不到近邻时返回 None。
+        误差估计为插值结果与最近邻结果的相对偏差，只有一个近邻时无法估计，记为 nan。
+        """
+        if not self.approximate_enabled:
+            return None
+        tolerances = self.settings.get('cache', 'approx_tolerances') or {}
+        query = {name: float(params[name]) for name in microphysics_params}
+
+        with self._lock:
+            candidates = [(key, entry_params) for key, (entry_env, entry_params) in self._catalog.items()
+                          if entry_env == env_type]
+
+        neighbours = []
+        for key, entry_params in candidates:
+            distance = 0.0
+            for name, value in query.items():
+                if name not in entry_params:
+                    break
+                diff = abs(entry_params[name] - value)
+                tol = float(tolerances.get(name, 0) or 0)
+                if tol <= 0:
+                    if diff > 1e-9 * max(1.0, abs(value)):
+                        break
+                elif diff > tol:
+                    break
+                else:
+                    distance += (diff / tol) ** 2
+            else:
+                neighbours.append((np.sqrt(distance), key))
+
+        if not neighbours:
+            with self._lock:
+                self.misses += 1
+            return None
+        neighbours.sort()
+
+        fields_list, distances = [], []
+        for distance, key in neighbours:
+            fields = self._load_fields(key)
+            if fields is None:
+                continue
+            # 相函数角度网格不同时无法逐点插值
+            if fields_list and fields['phase_func'].shape != fields_list[0]['phase_func'].shape:
+                continue
+            fields_list.append(fields)
+            distances.append(distance)
+            if distance == 0 or len(fields_list) >= APPROX_NEIGHBOURS:
+                break
+        if not fields_list:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        nearest = fields_list[0]
+        if distances[0] == 0:
+            # 微物理参数完全相同，只是系统参数不同，可直接复用
+            with self._lock:
+                self.approx_hits += 1
+            return dict(nearest), {'alpha': 0.0, 'beta': 0.0, 'phase_func': 0.0}
+
+        # 反距离加权；两个近邻位于查询点两侧时即为线性插值
+        weights = 1.0 / np.array(distances)
+        weights /= weights.sum()
+        interpolated = {}
+        for name in MICROPHYSICS_FIELDS:
+            values = [np.asarray(f[name], dtype=float) for f in fields_list]
+            interpolated[name] = sum(w * v for w, v in zip(weights, values))
+        for name in ('alpha', 'beta'):
+            interpolated[name] = float(interpolated[name])
+        # 网格本身取最近邻，避免插值造成的微小偏移
+        interpolated['radii'] = nearest['radii']
+        interpolated['theta'] = nearest['theta']
+
+        if len(fields_list) < 2:
+            error = {'alpha': float('nan'), 'beta': float('nan'), 'phase_func': float('nan')}
+        else:
+            error = {}
+            for name in ('alpha', 'beta', 'phase_func'):
+                value = np.asarray(interpolated[name], dtype=float)
+                deviation = np.abs(value - np.asarray(nearest[name], dtype=float))
+                scale = np.maximum(np.abs(value), np.finfo(float).tiny)
+                error[name] = float(np.max(deviation / scale))
+
+        with self._lock:
+            self.approx_hits += 1
+        return interpolated, error
+
+    def _load_fields(self, key):
+        with self._lock:
+            results = self._memory.get(key)
+        if results is None:
+            results = self._read(key)
+            if results is None:
+                return None
+            with self._lock:
+                self._remember(key, results)
+        if not all(name in results for name in MICROPHYSICS_FIELDS):
+            return None
+        return results
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._discard(key)
+            self._memory.clear()
+            self._rewrite_catalog()
+
+    def status(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._index),
+                'size_bytes': self._total_bytes,
+                'hits': self.hits,
+                'approx_hits': self.approx_hits,
+                'misses': self.misses,
+            }
+
+    def _freeze(self, results):
+        """转换为只读数组，避免调用方修改缓存中的数据"""
+        frozen = {}
+        for name, value in results.items():
+            if isinstance(value, np.ndarray):
+                value = value.copy()
+                value.flags.writeable = False
+            frozen[name] = value
+        return frozen
+
+    def _read(self, key):
+        try:
+            with np.load(self._path(key), allow_pickle=False) as data:
+                results = {}
+                for name in data.files:
+                    value = data[name]
+                    if value.ndim == 0:
+                        value = value.item()
+                    else:
+                        value.flags.writeable = False
+                    results[name] = value
+                return results
+        except Exception as e:
+            print(f"读取结果缓存失败: {e}")
+            return None
+
+    def _remember(self, key, results):
+        self._memory[key] = results
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def _discard(self, key):
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+        self._memory.pop(key, None)
+        self._catalog.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        max_bytes = int(float(self.settings.get('cache', 'max_size_mb') or 0) * 1024 * 1024)
+        if max_bytes <= 0:
+            return
+        while self._total_bytes > max_bytes and len(self._index) > 1:
+            oldest = next(iter(self._index))
+            self._discard(oldest)
@@ -0,0 +1,114 @@
+# utils/settings_manager.py
+import copy
+import json
+import os
+import sys
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+# 默认设置，按功能分组
+DEFAULT_SETTINGS = {
+    'history': {
+        # 默认不限制，升级后已有的历史记录不会被自动清理，需要时在设置中开启
+        'max_records': 0,        # 最多保留的记录数，0 表示不限制
+        'max_size_mb': 0.0,      # 历史文件最大体积 (MB)，0 表示不限制
+        'max_age_days': 0,       # 记录最长保留天数，0 表示不限制
+    },
+    'cache': {
+        'enabled': True,         # 相同参数直接返回缓存结果
+        'max_size_mb': 500.0,    # 结果缓存目录最大体积 (MB)
+        'approximate': False,    # 近似模式：参数在容差内时插值相近的缓存结果
+        'approx_tolerances': {   # 各微物理参数的容差，0 表示必须完全相同
+            'rain_rate': 0.5,    # mm/h
+            'temperature': 1.0,  # K
+            'visibility': 0.1,   # km
+            'ref_real': 0.01,
+            'ref_imag': 0.001,
+            'frequency': 0.0,
+        },
+    },
+    'plot': {
+        'backend': 'matplotlib',  # 结果图表后端：matplotlib / pyqtgraph，重新打开窗口后生效
+        'compare_mode': 'auto',  # 对比方式：auto / overlay 逐条叠加 / band 统计分位带
+        'band_threshold': 6,     # auto 模式下超过该记录数改用统计分位带
+    },
+    'update': {
+        'check_on_start': True,      # 启动后在后台检查更新
+        'check_interval_hours': 24,  # 两次联网检查的最小间隔，间隔内使用缓存的响应
+        'source': 'github',          # 更新源：github / 自定义服务器
+        'server_url': '',            # 更新地址，留空使用默认地址（可指向本地测试服务器）
+    },
+    'api': {
+        'host': '127.0.0.1',     # 本地仿真服务监听地址，默认只允许本机访问
+        'port': 8765,
+        'workers': 2,            # 计算进程数
+        'max_concurrent': 4,     # 同时计算的仿真数上限，超出的请求排队
+        'max_batch': 64,         # 单个批量请求最多包含的调用数
+    },
+}
+
+
+def get_data_dir():
+    """获取可写的数据目录
+
+    打包后 sys._MEIPASS 是只读的临时目录，数据需要放在可执行文件旁边。
+    """
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(os.path.abspath(sys.executable))
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, 'data')
+
+
+class SettingsManager(QObject):
+    """应用设置管理器（全局单例，所有窗口共享）"""
+    settings_changed = pyqtSignal(str)  # 发生变化的设置分组
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, settings_file=None):
+        super().__init__()
+        self.settings_file = settings_file or os.path.join(get_data_dir(), 'settings.json')
+        self.settings = copy.deepcopy(DEFAULT_SETTINGS)
+        self.load_settings()
+
+    def get(self, section, key=None):
+        values = self.settings.get(section, {})
+        if key is None:
+            return dict(values)
+        return values.get(key, DEFAULT_SETTINGS.get(section, {}).get(key))
+
+    def set(self, section, key, value):
+        self.settings.setdefault(section, {})[key] = value
+
+    def update_section(self, section, values):
+        """批量更新一个分组并保存"""
+        self.settings.setdefault(section, {}).update(values)
+        self.save_settings()
+        self.settings_changed.emit(section)
+
+    def load_settings(self):
+        try:
+            if os.path.exists(self.settings_file):
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                # 按分组合并保存的值，缺失的键保持默认
+                for section, values in stored.items():
+                    if isinstance(values, dict):
+                        self.settings.setdefault(section, {}).update(values)
+        except Exception as e:
+            print(f"加载设置失败: {e}")
+
+    def save_settings(self):
+        try:
+            os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
+            with open(self.settings_file, 'w', encoding='utf-8') as f:
+                json.dump(self.settings, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存设置失败: {e}")
@@ -0,0 +1,81 @@
+# utils/startup.py
+# 启动计时和后台预加载：记录首个窗口显示、仿真窗口可交互的耗时，
+# 用户选择仿真环境期间在后台线程预先导入较重的模块
+import importlib
+import threading
+import time
+
+# main.py 最先导入本模块，以此作为启动时间起点
+PROCESS_START = time.perf_counter()
+
+# 打开仿真窗口需要的模块；PyMieScatt 不在其中，第一次仿真时才导入
+PRELOAD_MODULES = (
+    'numpy',
+    'matplotlib',
+    'matplotlib.pyplot',
+    'matplotlib.font_manager',
+    'matplotlib.backends.backend_qt5agg',
+    'gui.right_panel',
+    'gui.history_panel',
+    'gui.menu_bar',
+    'gui.rain_window',
+    'gui.haze_window',
+)
+
+# 基准测试中关闭预加载，使窗口构造耗时不受后台线程进度影响
+PRELOAD_ENABLED = True
+
+_marks = {}
+_preload_thread = None
+
+
+def mark(name):
+    """记录从启动到现在的耗时 (秒)，同名只记录第一次"""
+    return _marks.setdefault(name, time.perf_counter() - PROCESS_START)
+
+
+def startup_marks():
+    return dict(_marks)
+
+
+def preload_modules(modules=PRELOAD_MODULES):
+    started = time.perf_counter()
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"预加载模块 {name} 失败: {e}")
+    mark('preload_done')
+    print(f"启动计时: 后台预加载完成，用时 {time.perf_counter() - started:.2f} s")
+
+
+def start_preload():
+    """启动后台预加载线程（只启动一次）"""
+    global _preload_thread
+    if _preload_thread is None and PRELOAD_ENABLED:
+        _preload_thread = threading.Thread(target=preload_modules, name='ModulePreloader', daemon=True)
+        _preload_thread.start()
+    return _preload_thread
+
+
+def report_window_ready(window, env_type, clicked_at):
+    """窗口显示后事件循环第一次空闲时记录可交互耗时，显示在状态栏"""
+    from PyQt5.QtCore import QTimer
+
+    def on_ready():
+        opened = time.perf_counter() - clicked_at
+        total = mark(f"{env_type}_interactive")
+        print(f"启动计时: {env_type} 仿真窗口可交互，点击后 {opened:.2f} s（启动后 {total:.2f} s）")
+        if hasattr(window, 'status_label'):
+            window.status_label.setText(f"就绪（窗口打开用时 {opened:.2f} s）")
+
+        history = getattr(window, 'history_manager', None)
+        if history is not None:
+            def on_history_loaded():
+                print(f"启动计时: 历史记录加载完成，用时 {history.load_seconds:.2f} s")
+            if history.loaded:
+                on_history_loaded()
+            else:
+                history.history_loaded.connect(on_history_loaded)
+
+    QTimer.singleShot(0, on_ready)
@@ -1,9 +1,14 @@
 import os
 import json
+import hashlib
 import requests
 import tempfile
 import shutil
+import threading
+import time
+import urllib.parse
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtWidgets import QMessageBox
 
@@ -41,232 +46,658 @@ def get_current_version():
         print(f"读取 version.py 失败: {e}")
         return "1.0.0"
 
+# 默认更新源
+DEFAULT_REPO_OWNER = "dzl123321"
+DEFAULT_REPO_NAME = "SimofAtmScatt"
+
+
+def update_cache_file():
+    """上次检查更新的响应缓存文件"""
+    from utils.settings_manager import get_data_dir
+    return os.path.join(get_data_dir(), "update_check.json")
+
+
 class UpdateManager:
-    def __init__(self, current_version, update_source="github", repo_owner="yourusername", repo_name="yourrepository"):
+    def __init__(self, current_version, update_source="github", repo_owner="yourusername", repo_name="yourrepository",
+                 update_server_url=None, cache_file=None, min_check_interval=0):
+        """
+        update_server_url: 指定更新地址时使用该地址（如本地测试服务器），否则按更新源生成
+        cache_file: 响应缓存文件，为 None 时不缓存
+        min_check_interval: 两次联网检查的最小间隔 (秒)，间隔内直接使用缓存的响应
+        """
         self.current_version = current_version
         self.update_source = update_source
         self.repo_owner = repo_owner
         self.repo_name = repo_name
-        
-        if update_source == "github":
+        self.cache_file = cache_file
+        self.min_check_interval = min_check_interval
+
+        if update_server_url:
+            self.update_server_url = update_server_url.rstrip("/")
+        elif update_source == "github":
             self.update_server_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/releases/latest"
         else:
             self.update_server_url = "https://your-update-server.com/api"
-        
-    def check_for_updates(self):
+
+    @property
+    def request_url(self):
+        if self.update_source == "github":
+            return self.update_server_url
+        return f"{self.update_server_url}/version"
+
+    def load_cache(self):
+        """读取缓存的响应，地址不同或读取失败时返回空字典"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except Exception as e:
+            print(f"读取更新缓存失败: {e}")
+            return {}
+        if cache.get("url") != self.request_url:
+            return {}
+        return cache
+
+    def save_cache(self, cache):
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_path = f"{self.cache_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            print(f"保存更新缓存失败: {e}")
+
+    def fetch_release_info(self, force=False):
+        """获取最新版本信息
+
+        间隔内直接返回缓存；否则带 If-None-Match 请求，304 时沿用缓存的内容。
+        force 为 True 时忽略检查间隔（仍发送条件请求）。
+        """
+        cache = self.load_cache()
+        now = time.time()
+        if (not force and cache.get("body") is not None
+                and now - cache.get("checked_at", 0) < self.min_check_interval):
+            return cache["body"]
+
+        headers = {}
+        if cache.get("etag") and cache.get("body") is not None:
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified") and cache.get("body") is not None:
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+        response = requests.get(self.request_url, headers=headers, timeout=10)
+        if response.status_code == 304:
+            cache["checked_at"] = now
+            self.save_cache(cache)
+            return cache["body"]
+        response.raise_for_status()
+
+        body = response.json()
+        self.save_cache({
+            "url": self.request_url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "checked_at": now,
+            "body": body,
+        })
+        return body
+
+    def parse_release_info(self, release_info):
+        """把服务器返回的内容整理为检查结果"""
+        # 使用 version.py 中的 compare_versions 函数
+        from utils.version import compare_versions
+        if self.update_source == "github":
+            latest_version = release_info.get("tag_name", "").lstrip("v")
+            release_notes = release_info.get("body", "")
+
+            # 找到 Windows 可执行文件的下载链接
+            assets = release_info.get("assets", [])
+            download_asset = None
+            for asset in assets:
+                if asset.get("name").endswith(".exe") or asset.get("name").endswith(".zip"):
+                    download_asset = asset
+                    break
+
+            if latest_version and compare_versions(self.current_version, latest_version) < 0 and download_asset:
+                return {
+                    "available": True,
+                    "version": latest_version,
+                    "release_notes": release_notes,
+                    "download_url": download_asset.get("browser_download_url"),
+                    "size": download_asset.get("size"),
+                    "sha256": asset_sha256(download_asset),
+                    "checksum_url": checksum_asset_url(assets, download_asset.get("name")),
+                    "manifest_url": manifest_asset_url(assets)
+                }
+        else:
+            # 自定义服务器返回的版本信息
+            latest_version = release_info.get("version")
+            if latest_version and compare_versions(self.current_version, latest_version) < 0:
+                return {
+                    "available": True,
+                    "version": latest_version,
+                    "release_notes": release_info.get("release_notes", ""),
+                    "download_url": release_info.get("download_url"),
+                    "size": release_info.get("size"),
+                    "sha256": release_info.get("sha256"),
+                    "checksum_url": release_info.get("checksum_url"),
+                    "manifest_url": release_info.get("manifest_url")
+                }
+        return {"available": False}
+
+    def check_for_updates(self, force=False):
         """检查是否有可用更新"""
         try:
-            if self.update_source == "github":
-                # 使用 GitHub Releases API
-                response = requests.get(self.update_server_url, timeout=10)
-                if response.status_code == 200:
-                    release_info = response.json()
-                    latest_version = release_info.get("tag_name", "").lstrip("v")
-                    release_notes = release_info.get("body", "")
-                    
-                    # 找到 Windows 可执行文件的下载链接
-                    download_url = None
-                    for asset in release_info.get("assets", []):
-                        if asset.get("name").endswith(".exe") or asset.get("name").endswith(".zip"):
-                            download_url = asset.get("browser_download_url")
-                            break
-                    
-                    # 使用 version.py 中的 compare_versions 函数
-                    from utils.version import compare_versions
-                    if compare_versions(self.current_version, latest_version) < 0 and download_url:
-                        return {
-                            "available": True,
-                            "version": latest_version,
-                            "release_notes": release_notes,
-                            "download_url": download_url
-                        }
-            else:
-                # 从自定义服务器获取最新版本信息
-                response = requests.get(f"{self.update_server_url}/version", timeout=10)
-                if response.status_code == 200:
-                    latest_version_info = response.json()
-                    latest_version = latest_version_info.get("version")
-                    
-                    # 使用 version.py 中的 compare_versions 函数
-                    from utils.version import compare_versions
-                    if compare_versions(self.current_version, latest_version) < 0:
-                        return {
-                            "available": True,
-                            "version": latest_version,
-                            "release_notes": latest_version_info.get("release_notes", ""),
-                            "download_url": latest_version_info.get("download_url")
-                        }
-            return {"available": False}
+            return self.parse_release_info(self.fetch_release_info(force))
         except Exception as e:
             print(f"检查更新失败: {e}")
             return {"available": False, "error": str(e)}
 
+
+def create_update_manager():
+    """按设置创建更新管理器"""
+    from utils.settings_manager import SettingsManager
+    settings = SettingsManager.instance().get('update')
+    return UpdateManager(
+        get_current_version(),
+        update_source=settings.get('source', 'github'),
+        repo_owner=DEFAULT_REPO_OWNER,
+        repo_name=DEFAULT_REPO_NAME,
+        update_server_url=settings.get('server_url') or None,
+        cache_file=update_cache_file(),
+        min_check_interval=float(settings.get('check_interval_hours', 24)) * 3600
+    )
+
+
+class UpdateCheckWorker(QThread):
+    """后台检查更新，结果通过信号返回界面线程"""
+    check_finished = pyqtSignal(dict)
+
+    def __init__(self, update_manager, force=False):
+        super().__init__()
+        self.update_manager = update_manager
+        self.force = force
+
+    def run(self):
+        self.check_finished.emit(self.update_manager.check_for_updates(self.force))
+
+
+# 下载参数
+DOWNLOAD_MIN_CHUNK = 64 * 1024                   # 自适应块大小的下限
+DOWNLOAD_MAX_CHUNK = 4 * 1024 * 1024             # 自适应块大小的上限
+DOWNLOAD_READ_SECONDS = 0.5                      # 每次读取的目标耗时，据此调整块大小
+PARALLEL_DOWNLOAD_THRESHOLD = 32 * 1024 * 1024   # 超过该大小且服务器支持 Range 时分段并行下载
+DOWNLOAD_SEGMENTS = 4                            # 并行分段数
+DOWNLOAD_RETRIES = 5                             # 连接中断后每段的最大重试次数
+STATE_SAVE_INTERVAL = 1.0                        # 续传状态的保存间隔 (秒)
+
+# 发布中常见的校验文件名
+CHECKSUM_FILE_NAMES = ("SHA256SUMS", "SHA256SUMS.txt", "sha256sums.txt", "checksums.txt")
+# 增量更新的文件清单名，见 utils/delta_update.py
+UPDATE_MANIFEST_NAME = "update_manifest.json"
+
+
+def asset_sha256(asset):
+    """GitHub 为发布文件提供的 digest 字段，如 "sha256:..." """
+    digest = asset.get("digest") or ""
+    if digest.startswith("sha256:"):
+        return digest[len("sha256:"):].lower()
+    return None
+
+
+def checksum_asset_url(assets, file_name):
+    """查找与下载文件对应的校验文件（<文件名>.sha256 或 SHA256SUMS）"""
+    names = {asset.get("name"): asset.get("browser_download_url") for asset in assets}
+    for name in (f"{file_name}.sha256", *CHECKSUM_FILE_NAMES):
+        if names.get(name):
+            return names[name]
+    return None
+
+
+def manifest_asset_url(assets):
+    """增量更新的文件清单"""
+    for asset in assets:
+        if asset.get("name") == UPDATE_MANIFEST_NAME:
+            return asset.get("browser_download_url")
+    return None
+
+
+def parse_checksum(text, file_name=None):
+    """从校验文件内容中取出 SHA-256，支持 sha256sum 输出格式"""
+    candidates = []
+    for line in text.splitlines():
+        parts = line.strip().split()
+        if not parts:
+            continue
+        digest = parts[0].lower()
+        if digest.startswith("sha256:"):
+            digest = digest[len("sha256:"):]
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            continue
+        name = parts[-1].lstrip("*") if len(parts) > 1 else None
+        if file_name and name == file_name:
+            return digest
+        candidates.append(digest)
+    # 只有一个校验值时认为就是该文件的
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def adapt_chunk_size(chunk_size, elapsed):
+    """按上一次读取的耗时调整块大小：读得快就加倍，读得慢就减半"""
+    if elapsed < DOWNLOAD_READ_SECONDS / 2:
+        return min(chunk_size * 2, DOWNLOAD_MAX_CHUNK)
+    if elapsed > DOWNLOAD_READ_SECONDS * 2:
+        return max(chunk_size // 2, DOWNLOAD_MIN_CHUNK)
+    return chunk_size
+
+
+def download_target_path(download_url):
+    """更新文件保存在数据目录下，临时目录被清理后仍可续传"""
+    from utils.settings_manager import get_data_dir
+    file_name = os.path.basename(urllib.parse.urlparse(download_url).path) or "update.zip"
+    return os.path.join(get_data_dir(), "updates", file_name)
+
+
+class ResumableDownload:
+    """可续传的单文件下载
+
+    未完成的数据写入 <目标>.part，进度记录在 <目标>.part.json，取消或断网后再次下载
+    时用 HTTP Range 从断点继续。大文件按分段并行下载，完成后校验 SHA-256 再改名为目标文件。
+    on_progress(已下载字节数, 总字节数) 在下载线程中调用，总大小未知时为 None。
+    """
+
+    def __init__(self, download_url, target_path, sha256=None, checksum_url=None, segments=DOWNLOAD_SEGMENTS,
+                 on_progress=None):
+        self.download_url = download_url
+        self.target_path = target_path
+        self.sha256 = sha256.lower() if sha256 else None
+        self.checksum_url = checksum_url
+        self.max_segments = max(1, segments)
+        self.on_progress = on_progress
+        self.part_path = f"{target_path}.part"
+        self.state_path = f"{target_path}.part.json"
+        self.is_cancelled = False
+        self.failed = False
+        self.lock = threading.Lock()
+        self.state = None
+        self.accept_ranges = False
+        self.last_percent = -1
+        self.last_saved = 0.0
+
+    def cancel(self):
+        """取消下载，已下载的部分保留用于续传"""
+        self.is_cancelled = True
+
+    @property
+    def stopping(self):
+        return self.is_cancelled or self.failed
+
+    def download(self):
+        """下载并校验，完成返回 True，取消返回 False，出错时抛出异常"""
+        os.makedirs(os.path.dirname(self.target_path), exist_ok=True)
+        expected = self.sha256 or self.fetch_checksum()
+        if expected and os.path.exists(self.target_path) and file_sha256(self.target_path) == expected:
+            # 之前已下载完成
+            size = os.path.getsize(self.target_path)
+            if self.on_progress is not None:
+                self.on_progress(size, size)
+            return True
+
+        try:
+            self.prepare()
+            segments = self.state["segments"]
+            self.report_progress(force=True)
+            if len(segments) > 1:
+                digest = None
+                with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+                    futures = [executor.submit(self.download_segment, segment) for segment in segments]
+                    try:
+                        for future in futures:
+                            future.result()
+                    except Exception:
+                        # 一段失败时停止其余分段，已下载的部分留待续传
+                        self.failed = True
+                        raise
+            else:
+                digest = self.download_segment(segments[0], self.prefix_digest(segments[0]))
+        except Exception:
+            self.save_state(force=True)
+            if self.is_cancelled:
+                return False
+            raise
+
+        if self.is_cancelled:
+            self.save_state(force=True)
+            return False
+
+        if expected:
+            # 单段下载边写边算，分段下载完成后顺序读一遍
+            actual = digest.hexdigest() if digest is not None else file_sha256(self.part_path)
+            if actual != expected:
+                self.discard_partial()
+                raise DownloadError("更新文件 SHA-256 校验失败，文件可能已损坏，请重新下载")
+        else:
+            print("发布中没有找到校验值，跳过 SHA-256 校验")
+
+        os.replace(self.part_path, self.target_path)
+        self.remove_state()
+        return True
+
+    def fetch_checksum(self):
+        if not self.checksum_url:
+            return None
+        response = requests.get(self.checksum_url, timeout=10)
+        response.raise_for_status()
+        digest = parse_checksum(response.text, os.path.basename(self.target_path))
+        if digest is None:
+            raise DownloadError("无法从校验文件中读取 SHA-256")
+        return digest
+
+    def probe(self):
+        """请求第一个字节，获取文件大小、ETag 和服务器是否支持 Range"""
+        with requests.get(self.download_url, headers={"Range": "bytes=0-0"}, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            etag = response.headers.get("ETag")
+            if response.status_code == 206:
+                content_range = response.headers.get("Content-Range", "")
+                total = content_range.rpartition("/")[2]
+                return (int(total) if total.isdigit() else None), True, etag
+            size = response.headers.get("content-length")
+            return (int(size) if size else None), False, etag
+
+    def prepare(self):
+        """读取续传状态，服务器上的文件变化或没有状态时重新划分分段"""
+        size, self.accept_ranges, etag = self.probe()
+        state = self.load_state()
+        if (state and self.accept_ranges and os.path.exists(self.part_path)
+                and state.get("url") == self.download_url
+                and state.get("size") == size and state.get("etag") == etag):
+            self.state = state
+            return
+
+        if size and self.accept_ranges and size >= PARALLEL_DOWNLOAD_THRESHOLD:
+            count = self.max_segments
+        else:
+            count = 1
+        bounds = [size * i // count for i in range(count + 1)] if size else [0, None]
+        self.state = {
+            "url": self.download_url,
+            "size": size,
+            "etag": etag,
+            "segments": [[bounds[i], bounds[i + 1], bounds[i]] for i in range(count)],
+        }
+        with open(self.part_path, 'wb') as f:
+            if size:
+                f.truncate(size)
+        self.save_state(force=True)
+
+    def prefix_digest(self, segment):
+        """单段续传时先对已下载的部分计算哈希，之后边下载边更新"""
+        digest = hashlib.sha256()
+        remaining = segment[2]
+        with open(self.part_path, 'rb') as f:
+            while remaining > 0:
+                block = f.read(min(remaining, 1024 * 1024))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+        return digest
+
+    def download_segment(self, segment, digest=None):
+        """下载一个分段 [start, end)，连接中断时从已下载的位置重试"""
+        start, end, _ = segment
+        retries = 0
+        while not self.stopping:
+            position = segment[2]
+            if end is not None and position >= end:
+                break
+            headers = {}
+            if position > start or end is not None and self.accept_ranges and len(self.state["segments"]) > 1:
+                headers["Range"] = f"bytes={position}-{end - 1}" if end is not None else f"bytes={position}-"
+            try:
+                with requests.get(self.download_url, headers=headers, stream=True, timeout=30) as response:
+                    response.raise_for_status()
+                    if "Range" in headers and response.status_code != 206:
+                        if len(self.state["segments"]) > 1:
+                            raise DownloadError("服务器不支持分段下载")
+                        # 服务器忽略了 Range，只能从头下载
+                        position = segment[2] = 0
+                        digest = hashlib.sha256() if digest is not None else None
+                        open(self.part_path, 'wb').close()
+                    received = self.read_response(response, segment, position, digest)
+                if received:
+                    retries = 0
+                if end is None or segment[2] >= end or self.stopping:
+                    break
+                raise IOError("连接提前断开")
+            except DownloadError:
+                raise
+            except Exception as e:
+                if self.stopping:
+                    break
+                retries += 1
+                if retries > DOWNLOAD_RETRIES:
+                    raise
+                print(f"下载中断，{min(2 ** retries, 30)} 秒后重试 ({retries}/{DOWNLOAD_RETRIES}): {e}")
+                time.sleep(min(2 ** retries, 30))
+        return digest
+
+    def read_response(self, response, segment, position, digest):
+        """把响应写入 .part 文件的对应位置，返回写入的字节数"""
+        end = segment[1]
+        received = 0
+        chunk_size = DOWNLOAD_MIN_CHUNK
+        with open(self.part_path, 'r+b') as f:
+            f.seek(position)
+            while not self.stopping:
+                started = time.monotonic()
+                chunk = response.raw.read(chunk_size, decode_content=True)
+                if not chunk:
+                    break
+                if end is not None:
+                    chunk = chunk[:end - segment[2]]
+                f.write(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+                received += len(chunk)
+                with self.lock:
+                    segment[2] += len(chunk)
+                self.report_progress()
+                chunk_size = adapt_chunk_size(chunk_size, time.monotonic() - started)
+                if end is not None and segment[2] >= end:
+                    break
+        return received
+
+    def report_progress(self, force=False):
+        size = self.state.get("size")
+        with self.lock:
+            downloaded = sum(position - start for start, _, position in self.state["segments"])
+        # 按百分比变化通知，避免每块都触发界面更新
+        percent = int(downloaded * 100 / size) if size else downloaded // DOWNLOAD_MAX_CHUNK
+        if self.on_progress is not None and (percent != self.last_percent or force):
+            self.last_percent = percent
+            self.on_progress(downloaded, size)
+        self.save_state(force)
+
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"读取下载进度失败: {e}")
+            return None
+
+    def save_state(self, force=False):
+        if self.state is None:
+            return
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_saved < STATE_SAVE_INTERVAL:
+                return
+            self.last_saved = now
+            try:
+                tmp_path = f"{self.state_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.state, f)
+                os.replace(tmp_path, self.state_path)
+            except Exception as e:
+                print(f"保存下载进度失败: {e}")
+
+    def remove_state(self):
+        self.state = None
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def discard_partial(self):
+        self.remove_state()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+
+class DownloadError(Exception):
+    """无法通过重试解决的下载错误"""
+
+
 class UpdateDownloader(QThread):
-    """更新下载线程"""
+    """更新下载线程，下载过程见 ResumableDownload"""
     progress = pyqtSignal(int)
     finished = pyqtSignal(bool, str)
     cancelled = pyqtSignal()
-    
-    def __init__(self, download_url, target_path):
+
+    def __init__(self, download_url, target_path, sha256=None, checksum_url=None, segments=DOWNLOAD_SEGMENTS):
         super().__init__()
         self.download_url = download_url
         self.target_path = target_path
         self.is_cancelled = False
-    
+        self.download = ResumableDownload(download_url, target_path, sha256, checksum_url, segments,
+                                          on_progress=self.on_progress)
+
     def cancel(self):
-        """取消下载"""
+        """取消下载，已下载的部分保留用于续传"""
         self.is_cancelled = True
-    
+        self.download.cancel()
+
+    def on_progress(self, downloaded, total):
+        if total:
+            self.progress.emit(int(downloaded * 100 / total))
+
     def run(self):
         try:
-            # 下载更新文件
-            response = requests.get(self.download_url, stream=True, timeout=30)
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded_size = 0
-            
-            with open(self.target_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if self.is_cancelled:
-                        # 用户取消下载
-                        f.close()
-                        if os.path.exists(self.target_path):
-                            os.remove(self.target_path)
-                        self.cancelled.emit()
-                        return
-                    
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-                        if total_size > 0:
-                            progress = int((downloaded_size / total_size) * 100)
-                            self.progress.emit(progress)
-            
-            if not self.is_cancelled:
+            if self.download.download():
+                self.progress.emit(100)
                 self.finished.emit(True, "")
+            else:
+                self.cancelled.emit()
         except Exception as e:
-            if not self.is_cancelled:
+            if self.is_cancelled:
+                self.cancelled.emit()
+            else:
                 self.finished.emit(False, str(e))
 
+
 def install_update(update_file, current_exe_path):
-    """安装更新"""
+    """安装完整更新包
+
+    更新包是打包输出目录（可执行文件和 _internal/ 等）的 zip，整个安装目录按新版本替换：
+    逐个替换文件并删除上一版本发布、新版本中已没有的文件，原文件保留为 .bak，任一文件失败时全部还原。
+    只支持打包后的程序，开发环境下 sys.executable 是 Python 解释器，拒绝安装。
+    """
+    from utils import delta_update
+
+    install_dir = delta_update.install_root()
+    if install_dir is None:
+        print("安装更新失败: 开发环境下不能安装打包的更新")
+        return False
+
+    temp_dir = tempfile.mkdtemp()
     try:
         # 解压更新文件
-        temp_dir = tempfile.mkdtemp()
-        
         with zipfile.ZipFile(update_file, 'r') as zip_ref:
             zip_ref.extractall(temp_dir)
-        
-        # 找到新的可执行文件
+
+        # 找到新的可执行文件，所在目录即新版本的安装目录
+        exe_name = os.path.basename(current_exe_path)
         new_exe = None
         for root, dirs, files in os.walk(temp_dir):
-            for file in files:
-                if file.endswith('.exe'):
-                    new_exe = os.path.join(root, file)
-                    break
-            if new_exe:
+            dirs.sort()
+            if exe_name in files:
+                new_exe = os.path.join(root, exe_name)
                 break
-        
+            if new_exe is None:
+                new_exe = next((os.path.join(root, file) for file in sorted(files) if file.endswith('.exe')), None)
+
         if not new_exe:
             raise Exception("未找到新的可执行文件")
-        
-        # 备份当前可执行文件
-        backup_exe = current_exe_path + ".bak"
-        shutil.copy2(current_exe_path, backup_exe)
-        
-        # 替换可执行文件
-        shutil.copy2(new_exe, current_exe_path)
-        
-        # 清理临时文件
-        shutil.rmtree(temp_dir)
+
+        bundle_root = os.path.dirname(new_exe)
+        rel_paths = delta_update.release_paths(bundle_root)
+        if not delta_update.install_delta_update(bundle_root, install_dir, rel_paths,
+                                                 delta_update.stale_files(install_dir, rel_paths),
+                                                 release=rel_paths):
+            return False
+
         os.remove(update_file)
-        
         return True
     except Exception as e:
         print(f"安装更新失败: {e}")
         return False
+    finally:
+        # 清理临时文件
+        shutil.rmtree(temp_dir, ignore_errors=True)
 
-def check_updates_on_start(app):
-    """启动时检查更新"""
-    # 使用统一的版本获取函数
-    current_version = get_current_version()
-    
-    # 检查更新
-    # 这里使用 GitHub 作为更新源，需要替换为实际的用户名和仓库名
-    update_manager = UpdateManager(
-        current_version,
-        update_source="github",
-        repo_owner="dzl123321",  # 替换为实际的 GitHub 用户名
-        repo_name="SimofAtmScatt"  # 替换为实际的 GitHub 仓库名
-    )
-    update_info = update_manager.check_for_updates()
-    
-    if update_info.get("available"):
+
+# 正在进行的启动检查，保持引用避免线程对象被回收
+_startup_check = None
+
+
+def check_updates_on_start(parent_widget=None):
+    """启动时在后台检查更新，窗口显示后调用，发现新版本时再提示"""
+    global _startup_check
+    from utils.settings_manager import SettingsManager
+    if not SettingsManager.instance().get('update', 'check_on_start') or _startup_check is not None:
+        return None
+
+    update_manager = create_update_manager()
+    worker = UpdateCheckWorker(update_manager)
+
+    def handle_check_result(result):
+        global _startup_check
+        _startup_check = None
+        if not result.get("available"):
+            # 启动检查失败时不打扰用户
+            return
+        # 启动窗口可能已被仿真窗口替代，提示显示在当前活动窗口上
+        from PyQt5.QtWidgets import QApplication
+        parent = QApplication.activeWindow() or parent_widget
         reply = QMessageBox.question(
-            None,
+            parent,
             "发现新版本",
-            f"发现新版本 {update_info['version']}\n\n更新内容:\n{update_info['release_notes']}\n\n是否下载并安装更新？",
+            f"发现新版本 {result['version']}\n\n更新内容:\n{result['release_notes']}\n\n是否下载并安装更新？",
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.Yes
         )
-        
         if reply == QMessageBox.Yes:
-            # 下载并安装更新
-            temp_update_file = os.path.join(tempfile.gettempdir(), "update.zip")
-            downloader = UpdateDownloader(update_info["download_url"], temp_update_file)
-            
-            # 显示下载进度对话框
-            from PyQt5.QtWidgets import QProgressDialog
-            progress_dialog = QProgressDialog("正在下载更新...", "取消", 0, 100)
-            progress_dialog.setWindowTitle("下载更新")
-            progress_dialog.setModal(True)
-            
-            def update_progress(value):
-                progress_dialog.setValue(value)
-            
-            def on_download_finished(success, error):
-                progress_dialog.close()
-                if success:
-                    # 安装更新
-                    current_exe = os.path.abspath(sys.executable)
-                    if install_update(temp_update_file, current_exe):
-                        QMessageBox.information(
-                            None,
-                            "更新成功",
-                            "更新已成功安装，请重启应用程序。",
-                            QMessageBox.Ok
-                        )
-                        # 重启应用
-                        os.execl(sys.executable, sys.executable, *sys.argv)
-                    else:
-                        QMessageBox.critical(
-                            None,
-                            "更新失败",
-                            "安装更新时发生错误，请手动下载并安装更新。",
-                            QMessageBox.Ok
-                        )
-                else:
-                    QMessageBox.critical(
-                        None,
-                        "下载失败",
-                        f"下载更新时发生错误: {error}",
-                        QMessageBox.Ok
-                    )
-            
-            def on_download_cancelled():
-                progress_dialog.close()
-                QMessageBox.information(
-                    None,
-                    "更新已取消",
-                    "更新已被取消，您可以稍后手动更新。",
-                    QMessageBox.Ok
-                )
-            
-            downloader.progress.connect(update_progress)
-            downloader.finished.connect(on_download_finished)
-            downloader.cancelled.connect(on_download_cancelled)
-            downloader.start()
-            progress_dialog.canceled.connect(downloader.cancel)
-            progress_dialog.exec_()
+            download_and_install_update(parent, result)
+
+    worker.check_finished.connect(handle_check_result)
+    _startup_check = worker
+    worker.start()
+    return worker
 
 def check_updates_manual(parent_widget):
     """手动检查更新（从菜单栏调用）"""
@@ -276,12 +707,7 @@ def check_updates_manual(parent_widget):
     current_version = get_current_version()
     
     # 创建更新管理器
-    update_manager = UpdateManager(
-        current_version,
-        update_source="github",
-        repo_owner="dzl123321",  # 替换为实际的 GitHub 用户名
-        repo_name="SimofAtmScatt"  # 替换为实际的 GitHub 仓库名
-    )
+    update_manager = create_update_manager()
     
     # 显示检查进度对话框
     progress = QProgressDialog("正在检查更新...", "取消", 0, 0, parent_widget)
@@ -289,19 +715,8 @@ def check_updates_manual(parent_widget):
     progress.setWindowModality(Qt.WindowModal)
     progress.show()
     
-    # 创建检查线程
-    class UpdateCheckThread(QThread):
-        finished = pyqtSignal(dict)
-        
-        def __init__(self, update_manager):
-            super().__init__()
-            self.update_manager = update_manager
-        
-        def run(self):
-            result = self.update_manager.check_for_updates()
-            self.finished.emit(result)
-    
-    check_thread = UpdateCheckThread(update_manager)
+    # 创建检查线程，手动检查忽略检查间隔
+    check_thread = UpdateCheckWorker(update_manager, force=True)
     
     def handle_check_result(result):
         progress.close()
@@ -319,7 +734,7 @@ def check_updates_manual(parent_widget):
             )
             
             if reply == QMessageBox.Yes:
-                download_and_install_update(parent_widget, result["download_url"])
+                download_and_install_update(parent_widget, result)
         elif result.get("error"):
             QMessageBox.warning(
                 parent_widget,
@@ -334,16 +749,40 @@ def check_updates_manual(parent_widget):
                 f"当前已是最新版本\n\n当前版本: {current_version}"
             )
     
-    check_thread.finished.connect(handle_check_result)
+    check_thread.check_finished.connect(handle_check_result)
     check_thread.start()
     progress.exec_()
 
-def download_and_install_update(parent_widget, download_url):
-    """下载并安装更新"""
+def download_and_install_update(parent_widget, update_info, allow_delta=True):
+    """下载并安装更新，下载完成并通过校验后才安装
+
+    发布提供文件清单且程序以目录形式安装时只下载变化的文件，增量更新失败时改为下载完整更新包。
+    """
     from PyQt5.QtWidgets import QProgressDialog
-    
-    temp_update_file = os.path.join(tempfile.gettempdir(), "update.zip")
-    downloader = UpdateDownloader(download_url, temp_update_file)
+    from utils import delta_update
+
+    root = delta_update.install_root()
+    if allow_delta and update_info.get("manifest_url") and root:
+        downloader = delta_update.DeltaUpdateDownloader(update_info["manifest_url"], root,
+                                                        update_info.get("version", "latest"))
+
+        def install():
+            return delta_update.install_delta_update(downloader.staging_dir, root,
+                                                     [rel_path for rel_path, _ in downloader.changed],
+                                                     downloader.removed, release=downloader.release)
+
+        def fallback(error):
+            print(f"增量更新失败，改为下载完整更新包: {error}")
+            download_and_install_update(parent_widget, update_info, allow_delta=False)
+    else:
+        temp_update_file = download_target_path(update_info["download_url"])
+        downloader = UpdateDownloader(update_info["download_url"], temp_update_file,
+                                      update_info.get("sha256"), update_info.get("checksum_url"))
+
+        def install():
+            return install_update(temp_update_file, os.path.abspath(sys.executable))
+
+        fallback = None
     
     # 显示下载进度对话框
     progress_dialog = QProgressDialog("正在下载更新...", "取消", 0, 100, parent_widget)
@@ -357,8 +796,7 @@ def download_and_install_update(parent_widget, download_url):
         progress_dialog.close()
         if success:
             # 安装更新
-            current_exe = os.path.abspath(sys.executable)
-            if install_update(temp_update_file, current_exe):
+            if install():
                 QMessageBox.information(
                     parent_widget,
                     "更新成功",
@@ -374,6 +812,8 @@ def download_and_install_update(parent_widget, download_url):
                     "安装更新时发生错误，请手动下载并安装更新。",
                     QMessageBox.Ok
                 )
+        elif fallback is not None:
+            fallback(error)
         else:
             QMessageBox.critical(
                 parent_widget,
@@ -387,7 +827,7 @@ def download_and_install_update(parent_widget, download_url):
         QMessageBox.information(
             parent_widget,
             "更新已取消",
-            "更新已被取消，您可以稍后手动更新。",
+            "更新已被取消，已下载的部分会保留，再次更新时将从断点继续。",
             QMessageBox.Ok
         )
     